@@ -0,0 +1,125 @@
+import hmac
+import json
+import os
+from functools import wraps
+
+import numpy as np
+import pandas as pd
+from flask import jsonify, request
+
+from categories import INDICATOR_COLUMNS
+from dataset import Hierarchy
+
+
+# 관리자용 지표 수정 (한 지역의 원본 지표 값을 바꾸고 영향받는 부분만 다시 계산)
+#
+# 원본 값은 RAW_DATA_DIR 이 있으면 ingest.py 의 정규화 전 집계 값, 없으면 final_df.csv 값 자체
+# (이미 0~1 이므로 정규화 범위 0~1 에서 시작). 수정으로 열의 최솟값 / 최댓값이 바뀌면 그 열 전체를
+# 다시 min-max 정규화하고, 아니면 수정한 칸만 정규화한다.
+# 수정 내역은 ADMIN_PATCH_LOG 에 남기고 재시작 시 다시 적용 (원본 데이터를 갱신해 final_df.csv 를
+# 다시 만들었다면 이 파일은 지워야 함). 수정은 요청을 받은 프로세스에만 반영되므로 worker 는 하나로 운영
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+RAW_DATA_DIR = os.getenv("RAW_DATA_DIR")
+PATCH_LOG_PATH = os.getenv("ADMIN_PATCH_LOG", "admin_patches.jsonl")
+
+
+def require_token(view):
+    # Authorization: Bearer <ADMIN_TOKEN>. 토큰이 설정되지 않았으면 관리자 API 자체를 막음
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not ADMIN_TOKEN:
+            return jsonify({"error": "관리자 API 가 설정되지 않았습니다."}), 404
+        header = request.headers.get("Authorization", "")
+        token = header[len("Bearer "):] if header.startswith("Bearer ") else ""
+        if not hmac.compare_digest(token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+            return jsonify({"error": "인증이 필요합니다."}), 401
+        return view(*args, **kwargs)
+
+    return wrapper
+
+
+def min_max_column(values, lo, hi):
+    # ingest.min_max 와 같은 식 (범위가 0 이면 0)
+    if not np.isfinite(hi - lo) or hi == lo:
+        return values * 0.0
+    return (values - lo) / (hi - lo)
+
+
+class RawState:
+    # 최하위 레벨 행 × 지표의 원본 값과 열별 정규화 범위(lo, hi), 정규화된 값
+    def __init__(self, raw, lo, hi, normalized=None):
+        self.raw = raw
+        self.lo = lo
+        self.hi = hi
+        if normalized is None:
+            normalized = np.column_stack([
+                min_max_column(raw[:, k], lo[k], hi[k]) for k in range(raw.shape[1])
+            ])
+        self.normalized = normalized
+
+    def apply(self, pos, values):
+        # values: {지표 위치: 새 원본 값} → (새 상태, 바뀐 정규화 열 {k: (N,)}, 다시 정규화한 열 목록)
+        raw, lo, hi = self.raw.copy(), self.lo.copy(), self.hi.copy()
+        normalized = self.normalized.copy()
+        renormalized = []
+        for k, value in values.items():
+            before = (np.nanmin(raw[:, k]), np.nanmax(raw[:, k]))
+            raw[pos, k] = value
+            after = (np.nanmin(raw[:, k]), np.nanmax(raw[:, k]))
+            if after != before:
+                lo[k], hi[k] = after
+                normalized[:, k] = min_max_column(raw[:, k], lo[k], hi[k])
+                renormalized.append(k)
+            else:
+                normalized[pos, k] = min_max_column(raw[pos:pos + 1, k], lo[k], hi[k])[0]
+        updates = {k: normalized[:, k].copy() for k in values}
+        return RawState(raw, lo, hi, normalized), updates, renormalized
+
+
+def load_raw_state(hierarchy, raw_dir=RAW_DATA_DIR):
+    leaf = hierarchy.level(hierarchy.leaf)
+    if raw_dir and hierarchy.leaf == "district":
+        import ingest
+
+        table = ingest.raw_table(raw_dir, verbose=False).reindex(leaf.names)
+        raw = table[INDICATOR_COLUMNS].to_numpy(dtype=float)
+        return RawState(raw, np.nanmin(raw, axis=0), np.nanmax(raw, axis=0)), True
+
+    raw = leaf.frame[INDICATOR_COLUMNS].to_numpy(dtype=float)
+    k = len(INDICATOR_COLUMNS)
+    return RawState(raw, np.zeros(k), np.ones(k), raw.copy()), False
+
+
+def rebuild(hierarchy, state):
+    # 정규화된 값으로 계층 전체를 처음부터 다시 만듦 (시작 시 / 검증용)
+    frame = hierarchy.level(hierarchy.leaf).frame.copy()
+    frame[INDICATOR_COLUMNS] = pd.DataFrame(state.normalized, columns=INDICATOR_COLUMNS, index=frame.index)
+    return Hierarchy(hierarchy.leaf, frame, hierarchy.city_name)
+
+
+def log_patch(name, values, path=PATCH_LOG_PATH):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"district": name, "values": values}, ensure_ascii=False) + "\n")
+
+
+def load(hierarchy, patch_log=PATCH_LOG_PATH, raw_dir=RAW_DATA_DIR):
+    # 시작 시: 원본 값 + 이전 수정 내역을 적용한 상태와 그 상태로 만든 계층
+    state, from_ingest = load_raw_state(hierarchy, raw_dir)
+    patched = False
+    if os.path.exists(patch_log):
+        leaf = hierarchy.level(hierarchy.leaf)
+        with open(patch_log, encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                pos = leaf.positions.get(entry["district"])
+                if pos is None:
+                    continue
+                values = {INDICATOR_COLUMNS.index(col): float(v) for col, v in entry["values"].items()}
+                state = state.apply(pos, values)[0]
+                patched = True
+    if from_ingest or patched:
+        hierarchy = rebuild(hierarchy, state)
+    return hierarchy, state
@@ -0,0 +1,166 @@
+import math
+import os
+import threading
+import time
+from functools import wraps
+
+from flask import jsonify, make_response
+
+
+# 라우트별 동시 처리 한도 / 대기열 길이 / 대기 허용 시간(초)
+# 환경변수 ADMISSION_<이름>_CONCURRENCY, _QUEUE, _DEADLINE 으로 덮어쓸 수 있음
+# (이름은 대문자, '-' 는 '_' 로 바꿔서 사용. 예: ADMISSION_DISTRICT_TOP5_QUEUE)
+ROUTE_LIMITS = {
+    "recommend": {"concurrency": 4, "queue": 16, "deadline": 2.0},
+    "district-top5": {"concurrency": 4, "queue": 16, "deadline": 2.0},
+    "district-summary": {"concurrency": 8, "queue": 32, "deadline": 1.0},
+    "district-features": {"concurrency": 8, "queue": 32, "deadline": 1.0},
+    "district-compare": {"concurrency": 4, "queue": 16, "deadline": 1.0},
+    # 미리 계산된 가벼운 라우트(*-priority)는 별도의 빠른 차선을 공유
+    "fast": {"concurrency": 32, "queue": 64, "deadline": 0.5},
+}
+
+
+def _env_limit(name, key, default):
+    env_key = f"ADMISSION_{name.upper().replace('-', '_')}_{key.upper()}"
+    value = os.getenv(env_key)
+    if value is None:
+        return default
+    return type(default)(value)
+
+
+class Shed(Exception):
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Lane:
+    def __init__(self, name, concurrency, queue, deadline):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = queue
+        self.deadline = deadline
+
+        self._cond = threading.Condition()
+        self.active = 0
+        self.waiting = 0
+        # 처리 시간 이동평균 (초). 첫 요청 전에는 보수적으로 50ms 로 가정
+        self.avg_service = 0.05
+
+        self.admitted = 0
+        self.queued = 0
+        self.shed = {"queue_full": 0, "deadline": 0, "timeout": 0}
+
+    def _expected_wait(self, position):
+        # 내 앞에 position 개의 요청이 있을 때 예상 대기 시간
+        return position * self.avg_service / self.concurrency
+
+    def _retry_after(self):
+        return max(1, math.ceil(self._expected_wait(self.waiting + 1)))
+
+    def acquire(self):
+        with self._cond:
+            if self.active < self.concurrency and self.waiting == 0:
+                self.active += 1
+                self.admitted += 1
+                return
+
+            if self.waiting >= self.max_queue:
+                self.shed["queue_full"] += 1
+                raise Shed("queue_full", self._retry_after())
+
+            if self._expected_wait(self.waiting + 1) > self.deadline:
+                self.shed["deadline"] += 1
+                raise Shed("deadline", self._retry_after())
+
+            self.waiting += 1
+            self.queued += 1
+            give_up_at = time.monotonic() + self.deadline
+            try:
+                while self.active >= self.concurrency:
+                    remaining = give_up_at - time.monotonic()
+                    if remaining <= 0:
+                        self.shed["timeout"] += 1
+                        raise Shed("timeout", self._retry_after())
+                    self._cond.wait(remaining)
+                self.active += 1
+                self.admitted += 1
+            finally:
+                self.waiting -= 1
+
+    def release(self, elapsed):
+        with self._cond:
+            self.active -= 1
+            self.avg_service = 0.8 * self.avg_service + 0.2 * elapsed
+            self._cond.notify()
+
+    def stats(self):
+        with self._cond:
+            return {
+                "concurrency": self.concurrency,
+                "max_queue": self.max_queue,
+                "deadline": self.deadline,
+                "active": self.active,
+                "queue_depth": self.waiting,
+                "avg_service_ms": round(self.avg_service * 1000, 2),
+                "admitted": self.admitted,
+                "queued": self.queued,
+                "shed": dict(self.shed),
+                "shed_total": sum(self.shed.values()),
+            }
+
+
+_lanes = {}
+_lanes_lock = threading.Lock()
+
+
+def get_lane(name):
+    with _lanes_lock:
+        lane = _lanes.get(name)
+        if lane is None:
+            conf = ROUTE_LIMITS.get(name, ROUTE_LIMITS["fast"])
+            lane = Lane(
+                name,
+                concurrency=_env_limit(name, "concurrency", conf["concurrency"]),
+                queue=_env_limit(name, "queue", conf["queue"]),
+                deadline=_env_limit(name, "deadline", conf["deadline"]),
+            )
+            _lanes[name] = lane
+        return lane
+
+
+def limit(name):
+    # 라우트 함수에 붙이는 데코레이터. 대기열이 꽉 찼거나 예상 대기시간이
+    # deadline 을 넘으면 기다리지 않고 바로 503 + Retry-After 로 응답
+    lane = get_lane(name)
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                lane.acquire()
+            except Shed as e:
+                response = make_response(jsonify({
+                    "error": "요청이 많아 잠시 후 다시 시도해주세요.",
+                    "reason": e.reason
+                }), 503)
+                response.headers["Retry-After"] = str(e.retry_after)
+                return response
+
+            started = time.monotonic()
+            try:
+                return view(*args, **kwargs)
+            finally:
+                lane.release(time.monotonic() - started)
+
+        return wrapper
+
+    return decorator
+
+
+def stats():
+    with _lanes_lock:
+        lanes = list(_lanes.values())
+    return {lane.name: lane.stats() for lane in lanes}
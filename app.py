@@ -1,13 +1,30 @@
 
 import os
+import threading
+from datetime import datetime, timezone
 
-from flask import Flask, request, jsonify, make_response, render_template
+from flask import Flask, Response, g, request, jsonify, make_response, render_template
+import numpy as np
 import pandas as pd
 import pymysql
 from flask_cors import CORS
 import mysql.connector
 from sqlalchemy import create_engine
 
+import admin
+import admission
+import clusters
+import dataset
+import http_cache
+import live
+import partitions
+import profiles
+import querylog
+import views
+import warmup
+from categories import INDICATOR_COLUMNS, PLAN
+from topk import top_k
+
 # #SQLAlchemy 방식
 # engine = create_engine(
 #     f"mysql+pymysql://{db_config['user']}:{db_config['password']}@{db_config['host']}/{db_config['database']}"
@@ -17,15 +34,19 @@ from sqlalchemy import create_engine
 from dotenv import load_dotenv
 load_dotenv(dotenv_path="./.env")  # 로컬에서만 자동 돌아가는 함수
 # local 에서는 .env 파일 참조, cloud에서는 railway 환경변수 자동 참조
-conn = pymysql.connect(
-    host=os.getenv("MYSQLHOST"),
-    port=int(os.getenv("MYSQLPORT")),
-    user=os.getenv("MYSQLUSER"),
-    password=os.getenv("MYSQLPASSWORD"),
-    db=os.getenv("MYSQL_DATABASE"),
-    charset='utf8mb4',
-    cursorclass=pymysql.cursors.DictCursor
-)
+def db_connect():
+    return pymysql.connect(
+        host=os.getenv("MYSQLHOST"),
+        port=int(os.getenv("MYSQLPORT")),
+        user=os.getenv("MYSQLUSER"),
+        password=os.getenv("MYSQLPASSWORD"),
+        db=os.getenv("MYSQL_DATABASE"),
+        charset='utf8mb4',
+        cursorclass=pymysql.cursors.DictCursor
+    )
+
+
+conn = db_connect()
 
 # # mysql.connector 방식
 # def get_connection():
@@ -37,54 +58,155 @@ app = Flask(__name__)
 CORS(app)
 
 # 데이터 로딩
-
-df = pd.read_csv('final_df.csv', encoding='utf-8')  # 자치구별 노인친화 지표
-#df = df.iloc[2:].reset_index(drop=True)  # 데이터 시작 행 정리
-df["자치구"] = df["district"]  # 자치구 이름 정리
+# 도시별 지표 테이블(final_df.csv), 행정동 → 자치구 → 시 계층, 연도별 지표, 관리자 수정 상태는
+# partitions.py 에서 도시마다 따로 읽고 LRU 로 관리. 기본 도시는 시작할 때 읽어 둠
+partitions.cache.get()
 
 #df.to_sql(name = 'district_data', con=engine, if_exists="append", index=False)
 
-# 카테고리와 실제 컬럼 매핑
-CATEGORY_COLUMNS = {
-    "safety": ["crime_rate"],
-    "walk": ["senior_pedestrian_accidents", "steep_slope_count"],
-    "relation": ["senior_center"],
-    "welfare": ["sports_center", "welfare_facilities"],
-    "culture": ["cultural_facilities"],
-    "transport": ["subway_station_count", "bus_stop_density"],
-    "medical": ["medical_corporations_count", "emergency_room_count"],
-    "social": ["employ"],
-    "nature": ["green_space_per_capita"],
-    "air": ["pm2_5_level"]
-}
-
-#안전:'crime_rate'
-#보행환경:'senior_pedestrian_accidents','steep_slope_count'
-#관계:'senior_center'
-#복지:'sports_center','welfare_facilities'
-#문화:'cultural_facilities'
-#대중교통:'subway_station_count','bus_stop_density'
-#의료:'medical_corporations_count','emergency_room_count'
-#사회참여:'employ'
-#자연:'green_space_per_capita'
-#대기환경:'pm2.5_level'
-
-
-# 점수 계산 함수
-def calculate_scores(weights,byNum ):
-    features = list(weights.keys())
-    weights_series = pd.Series(weights)
-
-
-    # 선택한 지표만 추출
-    df_selected = df[features]
-
-    # 가중치 곱한 후 점수 계산
-    df["score"] = df_selected.mul(weights_series).sum(axis=1)
-
-    # 상위 n개 구 반환
-    result = df[["자치구", "score"]].sort_values(by="score", ascending=False).head(byNum)
-    return result.to_dict(orient="records")
+# 카테고리 ↔ 지표 매핑과 반전 규칙은 categories.py 의 레지스트리(PLAN)에서 관리
+
+
+# city= (또는 region=) 파라미터의 도시 파티션. 처음 요청된 도시는 여기서 읽음
+@app.before_request
+def resolve_partition():
+    try:
+        g.partition = partitions.cache.get(request.args.get("city") or request.args.get("region"))
+    except dataset.DatasetLookupError as e:
+        return jsonify({"error": str(e)}), 400
+
+
+def partition():
+    return g.partition
+
+
+def recommend_columns():
+    weights, _ = parse_weights(request.args)
+    return np.flatnonzero(PLAN.column_weights(weights))
+
+
+# 엔드포인트 → 응답이 의존하는 지표 열. 여기 없는 엔드포인트는 전체 데이터 버전을 사용
+VERSION_COLUMNS = {"recommend": recommend_columns}
+
+
+# 응답 캐시(ETag / Last-Modified)용 데이터 버전과 수정 시각 (요청한 도시 기준)
+def response_version():
+    depends = VERSION_COLUMNS.get(request.endpoint)
+    if depends is None:
+        return partition().data_version
+    return partition().columns_version(depends())
+
+
+def response_modified():
+    depends = VERSION_COLUMNS.get(request.endpoint)
+    if depends is None:
+        return partition().loaded_at
+    return partition().columns_modified(depends())
+
+
+http_cache.init(response_version, response_modified)
+
+
+# level= / parent= / year= 파라미터에 해당하는 지표 테이블
+def level_table():
+    level = request.args.get("level", "district")
+    parent = request.args.get("parent")
+    year = request.args.get("year")
+    history = partition().history
+    if year is not None:
+        if history is None:
+            raise dataset.DatasetLookupError("연도별 데이터가 없습니다.")
+        if level != "district" or parent is not None:
+            raise dataset.DatasetLookupError("연도별 조회는 자치구 단위만 가능합니다.")
+        return history.table(year)
+    return partition().hierarchy.table(level, parent)
+
+
+# 카테고리 가중치 파싱 (request.args 또는 저장된 프로필의 weights). 하나도 없으면 selected=False
+def parse_weights(source):
+    weights = np.zeros(len(PLAN.categories))
+    selected = False
+    for j, cat in enumerate(PLAN.categories):
+        if cat.key in source:
+            try:
+                weights[j] = float(source.get(cat.key))
+                selected = True
+            except (TypeError, ValueError):
+                continue
+    return weights, selected
+
+
+# 개수 파라미터 (num, limit 등): 정수가 아니거나 1 미만이면 ValueError (라우트에서 400)
+def positive_int_arg(name, default):
+    value = request.args.get(name, default)
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} 는 1 이상의 정수여야 합니다.")
+    if value < 1:
+        raise ValueError(f"{name} 는 1 이상의 정수여야 합니다.")
+    return value
+
+
+# 켜고 끄는 파라미터 (ranks=1 등): 1 / true / yes 만 켜짐 (ranks=0, ranks=false 는 꺼짐)
+def flag_arg(name):
+    return request.args.get(name, "").strip().lower() in ("1", "true", "yes")
+
+
+def recommend_top(table, weights, num, method="sum"):
+    column_weights = PLAN.column_weights(weights)
+    if method == "sum":
+        # 반전이 적용된 지표(adjusted) × 지표별 가중치. 큰 테이블은 Threshold Algorithm 인덱스로
+        # 상위 num 개만 찾고, 작은 테이블은 전체 스캔 (topk.py)
+        order, score = table.topk_index().search(column_weights, num)
+    else:
+        # TOPSIS / VIKOR: 미리 계산한 거리 행렬 × 가중치 (mcdm.py)
+        order, score = top_k(table.mcdm().scores(method, column_weights), num)
+    return [
+        {"district": table.names[i], "score": float(s)}
+        for i, s in zip(order, score)
+    ]
+
+
+# 저장된 가중치 프로필 → /recommend 와 같은 응답 (연도별 조회는 지원하지 않음)
+def profile_result(params):
+    weights, selected = parse_weights(params.get("weights") or {})
+    if not selected:
+        raise profiles.ProfileError("가중치 입력이 필요합니다.")
+    hierarchy = partitions.cache.get(params.get("city")).hierarchy
+    table = hierarchy.table(params.get("level", "district"), params.get("parent"))
+    return {"result": recommend_top(table, weights, int(params.get("num", 5)), params.get("method", "sum"))}
+
+
+# 프로필이 쓰는 도시의 데이터 버전. 백그라운드 갱신(resident_only)은 메모리에 있는 도시만
+def profile_version(params, resident_only=False):
+    key = params.get("city") or partitions.DEFAULT_CITY
+    p = partitions.cache.peek(key) if resident_only else partitions.cache.get(key)
+    return p.data_version if p is not None else None
+
+
+# 데이터 버전이 바뀌었으면 저장된 프로필 결과를 백그라운드에서 일괄 갱신
+profile_store = profiles.ProfileStore(db_connect, profile_result, profile_version)
+profile_store.schedule_refresh()
+
+# /recommend 질의 로그는 큐에 넣고 백그라운드에서 묶어서 INSERT (응답 경로에서 DB 를 기다리지 않음)
+query_log = querylog.QueryLog(db_connect).start()
+
+
+def log_recommend_query():
+    # warmup.track 에서 성공한 응답(200, 캐시 적중 / 304 포함)마다 호출. 오류로 거절된 요청은 기록하지 않음
+    weights, selected = parse_weights(request.args)
+    try:
+        num = int(request.args.get("num", 5))
+        year = request.args.get("year")
+        year = None if year is None else int(year)
+    except ValueError:
+        return
+    if selected:
+        query_log.log(
+            request.args.get("level", "district"), request.args.get("parent"), year, num,
+            {key: float(w) for key, w in zip(PLAN.keys, weights) if key in request.args}
+        )
 
 
 @app.route("/")
@@ -95,47 +217,20 @@ def index():
 
 # 사용자 가중치 API
 @app.route("/recommend")
+@warmup.track(on_request=log_recommend_query)
+@http_cache.conditional("short")
+@warmup.cached()
+@admission.limit("recommend")
 def recommend():
     try:
         num = int(request.args.get("num", 5))
-        weights = {}
 
         # 카테고리 파싱
-        for category, cols in CATEGORY_COLUMNS.items():
-            if category in request.args:
-                try:
-                    weight = float(request.args.get(category))
-                    for col in cols:
-                        weights[col] = weight
-                except ValueError:
-                    continue
-
-        if not weights:
+        weights, selected = parse_weights(request.args)
+        if not selected:
             return jsonify({"error": "가중치 입력이 필요합니다."}), 400
 
-        # 반전해야 할 지표
-        INVERTED_COLS = ["crime_rate", "senior_pedestrian_accidents", "steep_slope_count", "pm2.5_level"]
-
-        # 가중치 적용용 복사본 생성
-        df_weighted = df.copy()
-        for col in weights:
-            if col in INVERTED_COLS:
-                df_weighted[col] = 1 - pd.to_numeric(df_weighted[col], errors="coerce")
-            else:
-                df_weighted[col] = pd.to_numeric(df_weighted[col], errors="coerce")
-
-        df_numeric = df_weighted[list(weights.keys())]
-        score = df_numeric.mul(pd.Series(weights)).sum(axis=1)
-
-        df_result = df.copy()
-        df_result["score"] = score
-
-        result = (
-            df_result[["district", "score"]]
-            .sort_values(by="score", ascending=False)
-            .head(num)
-            .to_dict(orient="records")
-        )
+        result = recommend_top(level_table(), weights, num, request.args.get("method", "sum"))
 
         response = make_response(json.dumps({"result": result}, ensure_ascii=False))
         response.headers["Content-Type"] = "application/json; charset=utf-8"
@@ -145,366 +240,117 @@ def recommend():
         return jsonify({"error": str(e)}), 400
 
 
-# F-28 – 동네 안전이 제일 중요한 어르신
-@app.route("/safety-priority")
-def safety_priority():
+# *-priority 라우트 공통: 지표 열 몇 개로 상위 5개 (views.PRIORITY_ROUTES)
+def priority_response(route):
     try:
-        # 안전 관련 지표: 낮을수록 안전함
-        safety_cols = ["crime_rate", "senior_pedestrian_accidents"]
-
-        df_subset = df[["district"] + safety_cols].copy()
-        df_subset["safety_score"] = df_subset[safety_cols].mean(axis=1)
-
-        result = (
-            df_subset[["district", "safety_score"]]
-            .sort_values(by="safety_score", ascending=True)
-            .head(5)
-            .to_dict(orient="records")
-        )
-
-        response = make_response(json.dumps({
-            "title": "안전한 동네 TOP 5",
-            "unit": "범죄율 + 노인 보행자 사고 (낮을수록 안전)",
-            "category": "safety",
-            "items": [
-                { "rank": i + 1, "name": row["district"], "score": round(row["safety_score"], 3) }
-                for i, row in enumerate(result)
-            ]
-        }, ensure_ascii=False))
+        response = make_response(json.dumps(views.priority_body(partition().hierarchy, route), ensure_ascii=False))
         response.headers["Content-Type"] = "application/json; charset=utf-8"
         return response
 
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
+
+# F-28 – 동네 안전이 제일 중요한 어르신
+@app.route("/safety-priority")
+@http_cache.conditional("static")
+@admission.limit("fast")
+def safety_priority():
+    return priority_response("/safety-priority")
+
+
 #F-29 – 보행 취약 지형이 적은 지역 추천
 @app.route("/walkability-priority")
+@http_cache.conditional("static")
+@admission.limit("fast")
 def walkability_priority():
-    try:
-        # 보행 환경 기준: 낮을수록 좋은 급경사지 수
-        df_subset = df[["district", "steep_slope_count"]].copy()
-        df_subset["walk_score"] = df_subset["steep_slope_count"]
-
-        result = (
-            df_subset[["district", "walk_score"]]
-            .sort_values(by="walk_score", ascending=True)
-            .head(5)
-            .to_dict(orient="records")
-        )
-
-        response = make_response(json.dumps({
-            "title": "보행 환경이 좋은 동네 TOP 5",
-            "unit": "급경사지 개수 (낮을수록 보행에 유리)",
-            "category": "walk",
-            "items": [
-                { "rank": i + 1, "name": row["district"], "score": row["walk_score"] }
-                for i, row in enumerate(result)
-            ]
-        }, ensure_ascii=False))
-        response.headers["Content-Type"] = "application/json; charset=utf-8"
-        return response
+    return priority_response("/walkability-priority")
 
-    except Exception as e:
-        return jsonify({"error": str(e)}), 400
 
 #F-30 – 대중교통 이용이 편리한 자치구
 @app.route("/transport-priority")
+@http_cache.conditional("static")
+@admission.limit("fast")
 def transport_priority():
-    try:
-        # 관련 지표: 지하철역 수 + 버스 정류장 밀도
-        cols = ["subway_station_count", "bus_stop_density"]
-        df_subset = df[["district"] + cols].copy()
-        df_subset["transport_score"] = df_subset[cols].mean(axis=1)
-
-        result = (
-            df_subset[["district", "transport_score"]]
-            .sort_values(by="transport_score", ascending=False)
-            .head(5)
-            .to_dict(orient="records")
-        )
-
-        response = make_response(json.dumps({
-            "title": "대중교통 접근성이 좋은 동네 TOP 5",
-            "unit": "지하철역 수 + 버스 정류장 밀도 평균",
-            "category": "transport",
-            "items": [
-                { "rank": i + 1, "name": row["district"], "score": round(row["transport_score"], 3) }
-                for i, row in enumerate(result)
-            ]
-        }, ensure_ascii=False))
-        response.headers["Content-Type"] = "application/json; charset=utf-8"
-        return response
-
-    except Exception as e:
-        return jsonify({"error": str(e)}), 400
+    return priority_response("/transport-priority")
 
 
 #F-31 – 병원 접근성이 중요한 어르신을 위한 추천
 @app.route("/medical-priority")
+@http_cache.conditional("static")
+@admission.limit("fast")
 def medical_priority():
-    try:
-        # 관련 지표: 의료법인 수 + 응급실 수
-        cols = ["medical_corporations_count", "emergency_room_count"]
-        df_subset = df[["district"] + cols].copy()
-        df_subset["medical_score"] = df_subset[cols].mean(axis=1)
-
-        result = (
-            df_subset[["district", "medical_score"]]
-            .sort_values(by="medical_score", ascending=False)
-            .head(5)
-            .to_dict(orient="records")
-        )
+    return priority_response("/medical-priority")
 
-        response = make_response(json.dumps({
-            "title": "의료 접근성이 좋은 동네 TOP 5",
-            "unit": "의료법인 수 + 응급실 수 평균",
-            "category": "medical",
-            "items": [
-                { "rank": i + 1, "name": row["district"], "score": round(row["medical_score"], 3) }
-                for i, row in enumerate(result)
-            ]
-        }, ensure_ascii=False))
-        response.headers["Content-Type"] = "application/json; charset=utf-8"
-        return response
-
-    except Exception as e:
-        return jsonify({"error": str(e)}), 400
 
 #F-32 – 친목 모임을 좋아하시는 어르신을 위한 추천
 @app.route("/social-priority")
+@http_cache.conditional("static")
+@admission.limit("fast")
 def social_priority():
-    try:
-        df_subset = df[["district", "senior_center"]].copy()
-        df_subset["social_score"] = df_subset["senior_center"]
-
-        result = (
-            df_subset[["district", "social_score"]]
-            .sort_values(by="social_score", ascending=False)
-            .head(5)
-            .to_dict(orient="records")
-        )
-
-        response = make_response(json.dumps({
-            "title": "친목 활동하기 좋은 동네 TOP 5",
-            "unit": "경로당 수",
-            "category": "social",
-            "items": [
-                { "rank": i + 1, "name": row["district"], "score": int(row["social_score"]) }
-                for i, row in enumerate(result)
-            ]
-        }, ensure_ascii=False))
-        response.headers["Content-Type"] = "application/json; charset=utf-8"
-        return response
-
-    except Exception as e:
-        return jsonify({"error": str(e)}), 400
+    return priority_response("/social-priority")
 
 
 #F-33 – 건강한 취미 생활을 즐기시는 어르신을 위한 추천
 @app.route("/culture-welfare-priority")
+@http_cache.conditional("static")
+@admission.limit("fast")
 def culture_welfare_priority():
-    try:
-        cols = ["welfare_facilities", "cultural_facilities"]
-        df_subset = df[["district"] + cols].copy()
-        df_subset["culture_score"] = df_subset[cols].mean(axis=1)
-
-        result = (
-            df_subset[["district", "culture_score"]]
-            .sort_values(by="culture_score", ascending=False)
-            .head(5)
-            .to_dict(orient="records")
-        )
-
-        response = make_response(json.dumps({
-            "title": "취미·문화생활 하기 좋은 동네 TOP 5",
-            "unit": "복지시설 + 문화시설 평균",
-            "category": "culture",
-            "items": [
-                { "rank": i + 1, "name": row["district"], "score": round(row["culture_score"], 3) }
-                for i, row in enumerate(result)
-            ]
-        }, ensure_ascii=False))
-        response.headers["Content-Type"] = "application/json; charset=utf-8"
-        return response
+    return priority_response("/culture-welfare-priority")
 
-    except Exception as e:
-        return jsonify({"error": str(e)}), 400
 
 #F-34 – 산책·운동을 즐기시는 어르신을 위한 추천
 @app.route("/walk-sports-priority")
+@http_cache.conditional("static")
+@admission.limit("fast")
 def walk_sports_priority():
-    try:
-        cols = ["sports_center"]
-        df_subset = df[["district"] + cols].copy()
-        df_subset["activity_score"] = df_subset[cols].mean(axis=1)
-
-        result = (
-            df_subset[["district", "activity_score"]]
-            .sort_values(by="activity_score", ascending=False)
-            .head(5)
-            .to_dict(orient="records")
-        )
-
-        response = make_response(json.dumps({
-            "title": "산책·운동하기 좋은 동네 TOP 5",
-            "unit": "체육시설 수",
-            "category": "activity",
-            "items": [
-                { "rank": i + 1, "name": row["district"], "score": round(row["activity_score"], 3) }
-                for i, row in enumerate(result)
-            ]
-        }, ensure_ascii=False))
-        response.headers["Content-Type"] = "application/json; charset=utf-8"
-        return response
-
-    except Exception as e:
-        return jsonify({"error": str(e)}), 400
+    return priority_response("/walk-sports-priority")
 
 
 #F-69 – 자연환경을 중요시하는 어르신을 위한 추천
 @app.route("/nature-priority")
+@http_cache.conditional("static")
+@admission.limit("fast")
 def nature_priority():
-    try:
-        df_subset = df[["district", "green_space_per_capita"]].copy()
-        df_subset["nature_score"] = df_subset["green_space_per_capita"]
-
-        result = (
-            df_subset[["district", "nature_score"]]
-            .sort_values(by="nature_score", ascending=False)
-            .head(5)
-            .to_dict(orient="records")
-        )
-
-        response = make_response(json.dumps({
-            "title": "자연환경이 좋은 동네 TOP 5",
-            "unit": "1인당 녹지면적",
-            "category": "nature",
-            "items": [
-                { "rank": i + 1, "name": row["district"], "score": round(row["nature_score"], 3) }
-                for i, row in enumerate(result)
-            ]
-        }, ensure_ascii=False))
-        response.headers["Content-Type"] = "application/json; charset=utf-8"
-        return response
+    return priority_response("/nature-priority")
 
-    except Exception as e:
-        return jsonify({"error": str(e)}), 400
 
 # ✅ 단일 API: 다양한 상위/하위 자치구 요청 처리
 from flask import request, jsonify, make_response
 import json
 
 
+# fields= 파라미터 처리. 없으면 전체, 허용되지 않은 필드가 있으면 None
+def requested_fields(allowed):
+    selected = views.split_fields(request.args.get("fields"))
+    if selected is None:
+        return set(allowed)
+    if not selected <= set(allowed):
+        return None
+    return selected
+
+
 @app.route("/district-top5")
+@warmup.track()
+@http_cache.conditional()
+@warmup.cached()
+@admission.limit("district-top5")
 def district_top5():
     try:
         mode = request.args.get("mode")  # 'friendly', 'unfriendly', 'category'
-        category_name = request.args.get("category")
-
-        CATEGORY_COLUMNS = {
-            "치안": ["crime_rate"],
-            "보행환경": ["senior_pedestrian_accidents", "steep_slope_count"],
-            "대중교통": ["subway_station_count", "bus_stop_density"],
-            "병원접근성": ["medical_corporations_count", "emergency_room_count"],
-            "노인복지시설": ["welfare_facilities", "sports_center"],
-            "문화시설": ["cultural_facilities"],
-            "경로당": ["senior_center"],
-            "노인일자리": ["employ"],
-            "대기환경": ["pm2_5_level"],
-            "자연환경": ["green_space_per_capita"]
-        }
-
-        category_labels = {
-            "치안": "치안이 가장 좋은",
-            "보행환경": "보행환경이 가장 좋은",
-            "대중교통": "대중교통이 가장 편리한",
-            "병원접근성": "병원 접근성이 가장 좋은",
-            "노인복지시설": "복지시설이 가장 많은",
-            "문화시설": "문화시설이 가장 많은",
-            "경로당": "경로당이 가장 많은",
-            "노인일자리": "노인 일자리가 가장 많은",
-            "대기환경": "대기환경이 가장 좋은",
-            "자연환경": "녹지가 가장 많은"
-        }
-
-        REVERSE_COLUMNS = ["crime_rate", "senior_pedestrian_accidents", "steep_slope_count", "pm2_5_level"]
-
-        if mode not in ["friendly", "unfriendly", "category"]:
+        if mode not in views.TOP5_MODES:
             return jsonify({"error": "mode 파라미터가 필요하며 'friendly', 'unfriendly', 'category' 중 하나여야 합니다."}), 400
 
-        df_copy = df.copy()
-        score_map = {}
-
-        for cat, cols in CATEGORY_COLUMNS.items():
-            vals = df_copy[cols].copy()
-            if cat in ["치안", "보행환경", "대기환경"]:
-                vals = 1 - vals
-            score_map[cat] = vals.mean(axis=1)
-
-        df_score = pd.DataFrame(score_map)
-        df_score["district"] = df["district"]
-
-        if mode == "friendly" or mode == "unfriendly":
-            df_score["total_score"] = df_score[list(CATEGORY_COLUMNS.keys())].mean(axis=1)
-            df_sorted = df_score.sort_values(by="total_score", ascending=(mode == "unfriendly")).head(5).reset_index(drop=True)
-        elif mode == "category":
-            if not category_name or category_name not in CATEGORY_COLUMNS:
-                return jsonify({"error": "카테고리명이 필요하거나 유효하지 않습니다."}), 400
-            df_score["score"] = df_score[category_name]
-            df_sorted = df_score.sort_values(by="score", ascending=False).head(5).reset_index(drop=True)
-
-        # 전체 평균 계산
-        avg_scores = {
-            cat: round(df_score[cat].mean(), 3)
-            for cat in CATEGORY_COLUMNS
-        }
-
-        # 결과 포맷 구성
-        result = []
-        for i, row in df_sorted.iterrows():
-            if mode == "category":
-                metric_data = [{
-                    "name": category_name,
-                    "selectedDistrict": round(row[category_name], 3),
-                    "average": avg_scores[category_name]
-                }]
-            else:
-                metric_data = [
-                    {
-                        "name": cat,
-                        "selectedDistrict": round(row[cat], 3),
-                        "average": avg_scores[cat]
-                    } for cat in CATEGORY_COLUMNS
-                ]
-
-            # info 문구
-            if mode == "friendly" or mode == "unfriendly":
-                max_diff = -float("inf") if mode == "friendly" else float("inf")
-                target_cat = None
-                for cat in CATEGORY_COLUMNS:
-                    diff = row[cat] - avg_scores[cat]
-                    if (mode == "friendly" and diff > max_diff) or (mode == "unfriendly" and diff < max_diff):
-                        max_diff = diff
-                        target_cat = cat
-                label = category_labels.get(target_cat, "")
-                info = f"{row['district']}는 {label} 동네입니다."
-            else:
-                info = None
-
-            entry = {
-                "district": row["district"],
-                "rank": i + 1,
-                "metricData": metric_data
-            }
-            if info:
-                entry["info"] = info
-
-            result.append(entry)
+        body = views.top5_body(level_table(), mode, request.args.get("category"),
+                               views.split_fields(request.args.get("fields")),
+                               request.args.get("format") == "compact")
 
-        response = make_response(json.dumps({"data": result}, ensure_ascii=False))
+        response = make_response(json.dumps(body, ensure_ascii=False))
         response.headers["Content-Type"] = "application/json; charset=utf-8"
         return response
 
+    except (dataset.DatasetLookupError, views.ViewError) as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -1068,131 +914,641 @@ def district_top5():
 
 #F-66 – 자치구 한 줄 소개 문장 제공
 @app.route("/district-summary")
+@http_cache.conditional()
+@admission.limit("district-summary")
 def district_summary():
     try:
         name = request.args.get("name")
-        filtered = df[df["district"] == name]
-
-        if filtered.empty:
-            return jsonify({"error": f"'{name}' 자치구를 찾을 수 없습니다."}), 404
-
-        row = filtered.iloc[0]
-
-        # 실제 지표 컬럼으로 점수 계산
-        category_columns = {
-            "safety": 1 - row["crime_rate"],
-            "walkenv": 1 - row[["senior_pedestrian_accidents", "steep_slope_count"]].mean(),
-            "relation": row["senior_center"],
-            "welfare": row[["welfare_facilities", "sports_center"]].mean(),
-            "culture": row["cultural_facilities"],
-            "transport": row[["subway_station_count", "bus_stop_density"]].mean(),
-            "medical": row[["medical_corporations_count", "emergency_room_count"]].mean(),
-            "employment": row["employ"],
-            "air": 1 - row["pm2_5_level"],
-            "nature": row["green_space_per_capita"]
-        }
+        level = request.args.get("level", "district")
+        table = partition().hierarchy.level(level)
+        pos = table.resolve(name)
 
-        # 실제 컬럼 매핑 (다른 구 평균 계산용)
-        cat_to_cols = {
-            "safety": ["crime_rate"],
-            "walkenv": ["senior_pedestrian_accidents", "steep_slope_count"],
-            "relation": ["senior_center"],
-            "welfare": ["welfare_facilities", "sports_center"],
-            "culture": ["cultural_facilities"],
-            "transport": ["subway_station_count", "bus_stop_density"],
-            "medical": ["medical_corporations_count", "emergency_room_count"],
-            "employment": ["employ"],
-            "air": ["pm2_5_level"],
-            "nature": ["green_space_per_capita"]
-        }
+        if pos is None:
+            return jsonify({"error": f"'{name}' {dataset.LEVEL_OBJECTS[level]} 찾을 수 없습니다."}), 404
 
-        category_labels = {
-            "safety": "치안이 가장 좋은",
-            "walkenv": "보행환경이 가장 좋은",
-            "relation": "경로당이 가장 많은",
-            "welfare": "복지시설이 가장 많은",
-            "culture": "문화시설이 가장 많은",
-            "transport": "대중교통이 가장 편리한",
-            "medical": "의료 접근성이 가장 좋은",
-            "employment": "노인 일자리가 가장 많은",
-            "air": "대기환경이 가장 좋은",
-            "nature": "자연환경이 가장 좋은"
-        }
+        body = views.summary_body(table, pos, flag_arg("ranks"))
 
-        max_diff = -float("inf")
-        main_category = None
+        response = make_response(json.dumps(body, ensure_ascii=False))  # ✅ 한글 깨짐 방지
 
-        for cat, val in category_columns.items():
-            cols = cat_to_cols[cat]
-            comp_df = df[df["district"] != name][cols].copy()
+        response.headers["Content-Type"] = "application/json; charset=utf-8"
+        return response
 
-            # 반전 필요한 지표 처리
-            if cat in ["safety", "walkenv", "air"]:
-                comp_df = 1 - comp_df
 
-            avg_score = comp_df.mean(axis=1).mean()
-            diff = val - avg_score
 
-            if diff > max_diff:
-                max_diff = diff
-                main_category = cat
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
 
-        summary = f"{name}는 {category_labels[main_category]} 자치구입니다."
-        # 한글로 출력되게
-        summary = f"{name}는 {category_labels[main_category]} 자치구입니다."
 
-        response = make_response(json.dumps({
-            "district": name,
-            "summary": summary
-        }, ensure_ascii=False))  # ✅ 한글 깨짐 방지
+# 전체 자치구 한 줄 소개를 한 번에
+@app.route("/district-summaries")
+@http_cache.conditional()
+@admission.limit("fast")
+def district_summaries():
+    try:
+        table = partition().hierarchy.level(request.args.get("level", "district"))
+        summaries = views.level_summaries(table)
 
+        response = make_response(json.dumps({
+            "data": [
+                {"district": name, "summary": summary}
+                for name, summary in zip(table.names, summaries)
+            ]
+        }, ensure_ascii=False))
         response.headers["Content-Type"] = "application/json; charset=utf-8"
         return response
 
-
-
-    except Exception as e:
+    except dataset.DatasetLookupError as e:
         return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
 
 #F-99 – 자치구별 카테고리 점수 조회 API
 @app.route("/district-features")
+@http_cache.conditional()
+@admission.limit("district-features")
 def district_features():
     try:
         name = request.args.get("name")
-        row = df[df["district"] == name]
+        level = request.args.get("level", "district")
+        hierarchy = partition().hierarchy
+        table = hierarchy.level(level)
+        pos = table.resolve(name)
+
+        if pos is None:
+            return jsonify({"error": f"{name} {dataset.LEVEL_OBJECTS[level]} 찾을 수 없습니다."}), 404
 
-        if row.empty:
+        body = views.features_body(hierarchy, level, pos, flag_arg("ranks"))
+
+        response = make_response(json.dumps(body, ensure_ascii=False))  # ✅ 한글 깨짐 방지
+
+        response.headers["Content-Type"] = "application/json; charset=utf-8"
+        return response
+
+
+    except dataset.DatasetLookupError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# 카테고리별 / 종합 순위와 백분위 (category 를 생략하면 전체)
+@app.route("/district-rank")
+@http_cache.conditional()
+@admission.limit("fast")
+def district_rank():
+    try:
+        name = request.args.get("name")
+        level = request.args.get("level", "district")
+        table = partition().hierarchy.level(level)
+        pos = table.resolve(name)
+
+        if pos is None:
+            return jsonify({"error": f"{name} {dataset.LEVEL_OBJECTS[level]} 찾을 수 없습니다."}), 404
+
+        category = request.args.get("category")
+        columns = None
+        if category == "overall":
+            columns = [len(PLAN.categories)]
+        elif category:
+            j = PLAN.index(category)
+            if j is None:
+                return jsonify({"error": "카테고리명이 유효하지 않습니다."}), 400
+            columns = [j]
+
+        response = make_response(json.dumps({
+            "district": table.names[pos],
+            "total": len(table),
+            "ranks": views.rank_fields(table, pos, columns)
+        }, ensure_ascii=False))
+        response.headers["Content-Type"] = "application/json; charset=utf-8"
+        return response
+
+    except dataset.DatasetLookupError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# 지역 유형 군집 (clusters.py). 제공하는 method + k 조합은 도시를 읽을 때 / 관리자 수정 후에 미리 계산
+CLUSTER_PEERS_LIMIT = 50
+
+
+def cluster_result(table):
+    method = request.args.get("method", clusters.CLUSTER_METHOD)
+    k = positive_int_arg("k", clusters.CLUSTER_K)
+    clusters.check_variant(method, k)
+    return table.clusters(method, k)
+
+
+def cluster_fields(result, c):
+    return dict(
+        result.profiles[c],
+        cluster=c,
+        size=int(result.sizes[c]),
+        centroid={cat.feature_key: round(float(v), 2) for cat, v in zip(PLAN.categories, result.centers[c])},
+        silhouette=None if result.cluster_silhouette[c] is None else round(result.cluster_silhouette[c], 4),
+    )
+
+
+@app.route("/district-cluster")
+@http_cache.conditional()
+@admission.limit("district-features")
+def district_cluster():
+    try:
+        name = request.args.get("name")
+        level = request.args.get("level", "district")
+        peers = min(positive_int_arg("peers", 5), CLUSTER_PEERS_LIMIT)
+        table = partition().hierarchy.level(level)
+        pos = table.resolve(name)
+
+        if pos is None:
+            return jsonify({"error": f"{name} {dataset.LEVEL_OBJECTS[level]} 찾을 수 없습니다."}), 404
+
+        result = cluster_result(table)
+        c = int(result.labels[pos])
+
+        response = make_response(json.dumps(dict(
+            cluster_fields(result, c),
+            district=table.names[pos],
+            peers=[str(table.names[i]) for i in result.peers(pos, peers)],
+            district_silhouette=round(result.row_silhouette(pos), 4),
+            method=result.method,
+            k=result.k,
+            overall_silhouette=round(result.silhouette, 4),
+        ), ensure_ascii=False))
+        response.headers["Content-Type"] = "application/json; charset=utf-8"
+        return response
+
+    except (dataset.DatasetLookupError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/clusters")
+@http_cache.conditional()
+@admission.limit("district-features")
+def cluster_list():
+    try:
+        level = request.args.get("level", "district")
+        table = partition().hierarchy.level(level)
+        result = cluster_result(table)
+
+        response = make_response(json.dumps({
+            "level": level,
+            "method": result.method,
+            "k": result.k,
+            "silhouette": round(result.silhouette, 4),
+            "sampled": result.sampled,
+            "elapsed_ms": result.elapsed_ms,
+            "clusters": [
+                dict(cluster_fields(result, c), members=[str(table.names[i]) for i in result.members(c)])
+                for c in range(result.k)
+            ]
+        }, ensure_ascii=False))
+        response.headers["Content-Type"] = "application/json; charset=utf-8"
+        return response
+
+    except (dataset.DatasetLookupError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# 지역 이름 자동완성 (q=강ㄴ, q=gangn 등). 이름 색인의 접두어 조회라 지역 수와 상관없이 입력 길이만큼
+AUTOCOMPLETE_LIMIT = 20
+
+
+@app.route("/autocomplete")
+@http_cache.conditional()
+@admission.limit("fast")
+def autocomplete():
+    try:
+        query = request.args.get("q", "")
+        level = request.args.get("level", "district")
+        limit = min(positive_int_arg("limit", 10), AUTOCOMPLETE_LIMIT)
+        table = partition().hierarchy.level(level)
+        positions = table.name_index().suggest(query, limit)
+
+        response = make_response(json.dumps({
+            "query": query,
+            "level": level,
+            "suggestions": [str(table.names[pos]) for pos in positions]
+        }, ensure_ascii=False))
+        response.headers["Content-Type"] = "application/json; charset=utf-8"
+        return response
+
+    except (dataset.DatasetLookupError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# 여러 자치구 카테고리 점수 비교 (names=강남구,중랑구 또는 names=all)
+# 점수 행렬에서 한 번의 인덱싱으로 꺼내므로 지역 수와 상관없이 행당 비용이 같음
+MAX_PAIRWISE = 50
+COMPARE_FIELDS = ["features", "vsAverage", "pairwise"]
+
+
+@app.route("/district-compare")
+@http_cache.conditional()
+@admission.limit("district-compare")
+def district_compare():
+    try:
+        level = request.args.get("level", "district")
+        table = partition().hierarchy.level(level)
+        names = request.args.get("names", "")
+
+        if names == "all":
+            positions = np.arange(len(table))
+        else:
+            names = [n.strip() for n in names.split(",") if n.strip()]
+            if not names:
+                return jsonify({"error": "names 파라미터가 필요합니다."}), 400
+            resolved = [table.resolve(n) for n in names]
+            missing = [n for n, pos in zip(names, resolved) if pos is None]
+            if missing:
+                return jsonify({"error": f"{', '.join(missing)} {dataset.LEVEL_OBJECTS[level]} 찾을 수 없습니다."}), 404
+            positions = np.array(resolved)
+
+        selected = table.scores[positions]  # (n, C)
+        # 시 전체 평균 = 시 레벨 행 (하위 단위 인구 가중 평균)
+        city_average = partition().hierarchy.level("city").scores[0]
+        keys = [cat.feature_key for cat in PLAN.categories]
+
+        fields = requested_fields(COMPARE_FIELDS)
+        if fields is None:
+            return jsonify({"error": f"fields 는 {', '.join(COMPARE_FIELDS)} 중에서 선택해야 합니다."}), 400
+        compact = request.args.get("format") == "compact"
+        names = table.names[positions].tolist()
+
+        body = {
+            "categories": keys,
+            "average": np.round(city_average, 2).tolist()
+        }
+
+        # 요청한 필드만 계산
+        features = np.round(selected, 2).tolist() if "features" in fields else None
+        vs_average = np.round(selected - city_average, 2).tolist() if "vsAverage" in fields else None
+
+        if compact:
+            # 열 단위 응답: 카테고리 이름은 categories 에 한 번만, 값은 2차원 배열
+            body["district"] = names
+            if features is not None:
+                body["features"] = features
+            if vs_average is not None:
+                body["vsAverage"] = vs_average
+        else:
+            districts = []
+            for i, name in enumerate(names):
+                entry = {"district": name}
+                if features is not None:
+                    entry["features"] = dict(zip(keys, features[i]))
+                if vs_average is not None:
+                    entry["vsAverage"] = dict(zip(keys, vs_average[i]))
+                districts.append(entry)
+            body["districts"] = districts
+
+        # 두 지역씩 짝지은 점수 차이 (앞 지역 - 뒤 지역)
+        if "pairwise" in fields and len(positions) <= MAX_PAIRWISE:
+            a, b = np.triu_indices(len(positions), k=1)
+            diffs = np.round(selected[a] - selected[b], 2).tolist()
+            if compact:
+                body["pairwise"] = {"a": a.tolist(), "b": b.tolist(), "diff": diffs}
+            else:
+                body["pairwise"] = [
+                    {
+                        "a": names[i],
+                        "b": names[j],
+                        "diff": dict(zip(keys, d))
+                    }
+                    for i, j, d in zip(a, b, diffs)
+                ]
+
+        response = make_response(json.dumps(body, ensure_ascii=False))
+        response.headers["Content-Type"] = "application/json; charset=utf-8"
+        return response
+
+    except dataset.DatasetLookupError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# 자치구 카테고리 점수의 연도별 변화
+@app.route("/district-trend")
+@http_cache.conditional()
+@admission.limit("fast")
+def district_trend():
+    try:
+        history = partition().history
+        if history is None:
+            return jsonify({"error": "연도별 데이터가 없습니다."}), 404
+
+        name = request.args.get("name")
+        trend = history.district_trend(name)
+        if trend is None:
             return jsonify({"error": f"{name} 자치구를 찾을 수 없습니다."}), 404
 
-        row = row.iloc[0]
-
-        features = {
-            "safety": 1 - row["crime_rate"],
-            "walkenv": 1 - row[["senior_pedestrian_accidents", "steep_slope_count"]].mean(),
-            "relation": row["senior_center"],
-            "welfare": row[["sports_center", "welfare_facilities"]].mean(),
-            "culture": row["cultural_facilities"],
-            "transport": row[["subway_station_count", "bus_stop_density"]].mean(),
-            "medical": row[["medical_corporations_count", "emergency_room_count"]].mean(),
-            "employment": row["employ"],
-            "nature": row["green_space_per_capita"],
-            "air": 1 - row["pm2_5_level"]
+        response = make_response(json.dumps(trend, ensure_ascii=False))
+        response.headers["Content-Type"] = "application/json; charset=utf-8"
+        return response
+
+    except dataset.DatasetLookupError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# 카테고리별 점수가 가장 많이 오른 / 떨어진 자치구
+@app.route("/trend-movers")
+@http_cache.conditional()
+@admission.limit("fast")
+def trend_movers():
+    try:
+        history = partition().history
+        if history is None:
+            return jsonify({"error": "연도별 데이터가 없습니다."}), 404
+
+        category = request.args.get("category")
+        num = positive_int_arg("num", 5)
+        start, end, order, delta = history.movers(
+            category, request.args.get("from"), request.args.get("to")
+        )
+
+        def items(positions):
+            return [
+                {
+                    "rank": i + 1,
+                    "district": history.districts[d],
+                    "change": round(float(delta[d]), 3)
+                }
+                for i, d in enumerate(positions)
+            ]
+
+        response = make_response(json.dumps({
+            "category": category,
+            "from": start,
+            "to": end,
+            # 오른 지역은 변화량 > 0, 떨어진 지역은 변화량 < 0 만 (변화 없는 지역은 어느 쪽에도 없음)
+            "improvers": items([d for d in order[:num] if delta[d] > 0]),
+            "decliners": items([d for d in order[::-1][:num] if delta[d] < 0])
+        }, ensure_ascii=False))
+        response.headers["Content-Type"] = "application/json; charset=utf-8"
+        return response
+
+    except (dataset.DatasetLookupError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# 가중치 프로필 저장: {"name", "weights": {카테고리 key: 가중치}, "num", "level", "parent", "city"}
+# 저장 시점에 결과를 계산해 같이 저장
+@app.route("/profiles", methods=["POST"])
+@admission.limit("recommend")
+def save_profile():
+    try:
+        body = request.get_json(silent=True) or {}
+        name = str(body.get("name", "")).strip()
+        weights = body.get("weights")
+        if not isinstance(weights, dict):
+            raise profiles.ProfileError("weights 는 {카테고리: 가중치} 형식이어야 합니다.")
+        params = {
+            "weights": {key: weights[key] for key in PLAN.keys if key in weights},
+            "num": int(body.get("num", 5)),
+            "level": body.get("level", "district"),
+            "parent": body.get("parent"),
+            "method": body.get("method", "sum"),
+            "city": partitions.cache.get(body.get("city") or body.get("region")).key,
         }
+        result = profile_store.save(name, params)
+
+        response = make_response(json.dumps(dict(result, name=name), ensure_ascii=False))
+        response.headers["Content-Type"] = "application/json; charset=utf-8"
+        return response
+
+    except (profiles.ProfileError, dataset.DatasetLookupError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    except profiles.ProfileUnavailable as e:
+        return jsonify({"error": str(e)}), 503
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# 저장된 프로필 조회 (이름으로 한 번 조회, 재계산 없음)
+@app.route("/profiles/<name>", methods=["GET", "DELETE"])
+@admission.limit("fast")
+def profile(name):
+    try:
+        if request.method == "DELETE":
+            if not profile_store.delete(name):
+                return jsonify({"error": f"{name} 프로필이 없습니다."}), 404
+            return jsonify({"deleted": name})
+
+        result = profile_store.load(name)
+        if result is None:
+            return jsonify({"error": f"{name} 프로필이 없습니다."}), 404
+        if "error" in result:
+            # 저장 후 데이터가 바뀌어 현재 데이터로는 계산할 수 없는 프로필
+            return jsonify({"error": f"{name} 프로필을 현재 데이터로 계산할 수 없습니다: {result['error']}"}), 409
+
+        response = make_response(json.dumps(dict(result, name=name), ensure_ascii=False))
+        response.headers["Content-Type"] = "application/json; charset=utf-8"
+        return response
+
+    except profiles.ProfileUnavailable as e:
+        return jsonify({"error": str(e)}), 503
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# 모니터링용: 라우트별 대기열 길이 / 거절(shed) 횟수, 프로필 저장소 상태, 도시 파티션별 메모리 / 로딩 시간
+@app.route("/metrics")
+def metrics():
+    response = make_response(json.dumps({
+        "admission": admission.stats(),
+        "partitions": partitions.cache.stats(),
+        "live": live_sessions.stats(),
+        "profiles": profile_store.stats(),
+        "query_log": query_log.stats(),
+        "warmup": warmup.stats()
+    }, ensure_ascii=False))
+    response.headers["Content-Type"] = "application/json; charset=utf-8"
+    return response
+
+
+# 슬라이더 UI 용 실시간 순위 (live.py)
+# 1) POST /live/sessions {"weights", "num", "level", "parent"} (?city=) → 세션 id + 처음 결과
+# 2) GET /live/sessions/<id>/events 를 EventSource 로 구독
+# 3) 슬라이더를 움직일 때마다 PATCH /live/sessions/<id> {"category": "safety", "weight": 4}
+#    → 점수는 바뀐 카테고리만큼만 더하고, 상위 num 개의 순위 변화 + 점수를 이벤트로 전송 (가중합만 지원)
+live_sessions = live.SessionStore()
+
+
+@app.route("/live/sessions", methods=["POST"])
+@admission.limit("recommend")
+def create_live_session():
+    try:
+        body = request.get_json(silent=True) or {}
+        weights = body.get("weights", {})
+        if not isinstance(weights, dict):
+            raise live.LiveError("weights 는 {카테고리: 가중치} 형식이어야 합니다.")
+        weights, _ = parse_weights(weights)
+        key = partition().key
+
+        def source():
+            return partitions.cache.get(key).hierarchy
+
+        session = live_sessions.create(
+            source, body.get("level", "district"), body.get("parent"), weights, int(body.get("num", 5))
+        )
 
         response = make_response(json.dumps({
-            "district": name,
-            "features": {k: round(v, 2) for k, v in features.items()}
-        }, ensure_ascii=False))  # ✅ 한글 깨짐 방지
+            "session": session.id,
+            "seq": session.seq,
+            "result": session.result()
+        }, ensure_ascii=False))
+        response.headers["Content-Type"] = "application/json; charset=utf-8"
+        return response
+
+    except (live.LiveError, dataset.DatasetLookupError, ValueError) as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
+
+@app.route("/live/sessions/<sid>", methods=["PATCH", "DELETE"])
+@admission.limit("fast")
+def update_live_session(sid):
+    try:
+        if request.method == "DELETE":
+            if not live_sessions.close(sid):
+                return jsonify({"error": "세션이 없습니다."}), 404
+            return jsonify({"closed": sid})
+
+        session = live_sessions.get(sid)
+        if session is None:
+            return jsonify({"error": "세션이 없거나 만료되었습니다."}), 404
+
+        # {"category": "safety", "weight": 4} 또는 여러 개를 한 번에 {"weights": {"safety": 4, "air": 1}}
+        body = request.get_json(silent=True) or {}
+        changes = body.get("weights")
+        if changes is None and "category" in body:
+            changes = {body["category"]: body.get("weight")}
+        if not isinstance(changes, dict) or not changes:
+            return jsonify({"error": "category / weight 가 필요합니다."}), 400
+
+        parsed = {}
+        for name, weight in changes.items():
+            j = PLAN.index(name)
+            if j is None:
+                return jsonify({"error": f"{name} 은(는) 유효하지 않은 카테고리입니다."}), 400
+            if not isinstance(weight, (int, float)) or isinstance(weight, bool) or not np.isfinite(weight):
+                return jsonify({"error": "가중치는 숫자여야 합니다."}), 400
+            parsed[j] = float(weight)
+
+        event = session.update(parsed)
+        if event is None:
+            # 가중치가 그대로: 보낼 이벤트 없음 (현재 상태만 응답)
+            event = {"type": "rank", "seq": session.seq, "moved": [], "left": [], "scores": session.top_scores()}
+        response = make_response(json.dumps(event, ensure_ascii=False))
         response.headers["Content-Type"] = "application/json; charset=utf-8"
         return response
 
+    except dataset.DatasetLookupError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route("/live/sessions/<sid>/events")
+def live_session_events(sid):
+    session = live_sessions.get(sid)
+    if session is None:
+        return jsonify({"error": "세션이 없거나 만료되었습니다."}), 404
+    # 연결 하나가 스레드 하나를 계속 쓰므로 admission 차선에는 넣지 않음
+    return Response(session.stream(), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+
+
+# 관리자: 최하위 지역 하나의 원본 지표 값 수정 {"values": {지표 컬럼: 값}} (city= 로 도시 선택)
+# 바뀐 열만 다시 정규화 / 집계하고, 그 열에 의존하는 캐시만 무효화 (admin.py, Table.replace_columns)
+@app.route("/admin/districts/<name>", methods=["PATCH"])
+@admin.require_token
+def patch_district(name):
+    try:
+        body = request.get_json(silent=True) or {}
+        values = body.get("values")
+        if not isinstance(values, dict) or not values:
+            return jsonify({"error": "values 는 {지표: 값} 형식이어야 합니다."}), 400
+        unknown = [col for col in values if col not in INDICATOR_COLUMNS]
+        if unknown:
+            return jsonify({"error": f"알 수 없는 지표: {', '.join(unknown)}"}), 400
+        if not all(isinstance(v, (int, float)) and not isinstance(v, bool) and np.isfinite(v)
+                   for v in values.values()):
+            return jsonify({"error": "지표 값은 숫자여야 합니다."}), 400
+
+        p = partition()
+        with p.lock:
+            hierarchy = p.hierarchy
+            leaf = hierarchy.level(hierarchy.leaf)
+            # 수정 대상은 정확한 이름으로만 (별칭 / 접두어로 추측하지 않음)
+            pos = leaf.positions.get(name)
+            if pos is None:
+                return jsonify({"error": f"'{name}' {dataset.LEVEL_OBJECTS[hierarchy.leaf]} 찾을 수 없습니다."}), 404
+            name = str(leaf.names[pos])
+            changes = {INDICATOR_COLUMNS.index(col): float(v) for col, v in values.items()}
+
+            p.raw_state, updates, renormalized = p.raw_state.apply(pos, changes)
+            p.hierarchy = hierarchy.replace_columns(updates)
+
+            now = datetime.now(timezone.utc).replace(microsecond=0)
+            for k in updates:
+                p.column_revision[k] += 1
+                p.column_modified[k] = now
+            p.data_version = p.dataset_version()
+            p.loaded_at = now
+            admin.log_patch(name, values, p.patch_log)
+
+        # 저장된 프로필 결과와 군집은 백그라운드에서 다시 계산
+        profile_store.schedule_refresh()
+        threading.Thread(target=partitions.warm_clusters, args=(p.hierarchy,), daemon=True).start()
+
+        response = make_response(json.dumps({
+            "district": name,
+            "city": p.key,
+            "values": {
+                INDICATOR_COLUMNS[k]: {"raw": p.raw_state.raw[pos, k], "normalized": float(updates[k][pos])}
+                for k in changes
+            },
+            "renormalized": [INDICATOR_COLUMNS[k] for k in renormalized],
+            "data_version": p.data_version
+        }, ensure_ascii=False))
+        response.headers["Content-Type"] = "application/json; charset=utf-8"
+        return response
 
+    except dataset.DatasetLookupError as e:
+        return jsonify({"error": str(e)}), 400
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-    
+
+# 로드밸런서용: 자주 쓰이는 응답을 미리 계산해 둘 때까지 503
+@app.route("/ready")
+def ready():
+    if not warmup.ready():
+        return jsonify({"ready": False}), 503
+    return jsonify({"ready": True, "data_version": partition().data_version})
+
+
+# 라우트가 모두 등록된 뒤 워밍업 시작 (이전 실행에서 저장한 인기 질의 기준)
+warmup.start(app, response_version)
+
+
 
 # if __name__ == "__main__":
 #     app.run(host="0.0.0.0", port=int(os.environ.get("PORT", 5000)))
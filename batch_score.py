@@ -0,0 +1,199 @@
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from categories import PLAN
+from mcdm import METHODS
+from partitions import DEFAULT_CITY, Partition
+
+
+# 대량 가중치 프로필 오프라인 채점 (Flask / MySQL 없이 /recommend 와 같은 순위)
+#
+#   python batch_score.py survey.csv ranked.csv --num 5 [--city busan] [--level dong] [--workers 4]
+#
+# 입력: 카테고리 key(safety, walk, ...) 열이 가중치인 CSV 또는 Parquet. 비어 있는 칸은 가중치 0,
+#       --id-column 열(기본 id)이 있으면 결과에 그대로 붙임. chunk 단위로 읽으므로 파일 크기와 무관
+# 출력: .csv 면 한 행에 id, district_1, score_1, ... / .jsonl 이면 {"id", "result": /recommend 와 같은 형식}
+# chunk 마다 프로세스 풀에서 채점하고, 끝난 chunk 는 입력 순서대로 바로 파일에 씀
+
+CHUNK_ROWS = 50_000
+BLOCK_ELEMENTS = 1 << 22  # 가중합 계산 중 (프로필 × 지역 × 지표) 임시 배열 원소 수 상한
+
+_table = None
+_method = None
+
+
+def _init(city, level, parent, method):
+    # worker 마다 한 번: 도시 파티션을 읽고 채점할 테이블을 준비 (파생 데이터도 worker 안에서 재사용)
+    global _table, _method
+    _table = Partition(city).hierarchy.table(level, parent)
+    _method = method
+    if method == "sum":
+        _table.topk_index()
+    else:
+        _table.mcdm()
+
+
+def sum_scores(values, weights):
+    # weights: (B, K) 지표별 가중치 → (B, N) 점수.
+    # topk.weighted_scores 와 같은 식(가중치가 0 이 아닌 열만, 행마다 같은 순서로 합산)이라
+    # /recommend 와 점수가 비트 단위로 같음. 같은 열 조합의 프로필끼리 묶어서 한 번에 계산
+    bits = 1 << np.arange(weights.shape[1], dtype=np.int64)
+    codes = (weights != 0) @ bits  # 가중치가 있는 열 조합 → 정수
+    order = np.argsort(codes, kind="stable")
+    combos, starts = np.unique(codes[order], return_index=True)
+
+    scores = np.empty((len(weights), len(values)))
+    for code, rows in zip(combos, np.split(order, starts[1:])):
+        active = np.flatnonzero(code & bits)
+        subset = values[:, active]
+        step = max(1, BLOCK_ELEMENTS // max(1, subset.size))
+        for start in range(0, len(rows), step):
+            block = rows[start:start + step]
+            scores[block] = (subset[None, :, :] * weights[block][:, None, active]).sum(axis=-1)
+    return scores
+
+
+def score_chunk(weights, selected, num):
+    # weights: (B, C) 카테고리 가중치 → 프로필별 [(지역 이름, 점수), ...] 또는 오류 문자열
+    column_weights = weights @ PLAN.membership.T
+    errors = {int(b): "가중치 입력이 필요합니다." for b in np.flatnonzero(~selected)}
+    if _method == "sum":
+        scores = sum_scores(_table.topk_index().values, column_weights)
+    else:
+        scores = np.zeros((len(weights), len(_table)))
+        for b in np.flatnonzero(selected):
+            try:
+                scores[b] = _table.mcdm().scores(_method, column_weights[b])
+            except ValueError as e:
+                errors[int(b)] = str(e)
+
+    order = np.argsort(-scores, axis=1, kind="stable")[:, :num]  # topk.top_k 와 같은 동점 순서
+    names = _table.names[order].tolist()
+    top = np.take_along_axis(scores, order, axis=1).tolist()
+    return [
+        errors[b] if b in errors else list(zip(names[b], top[b]))
+        for b in range(len(weights))
+    ]
+
+
+def read_chunks(path, chunk_rows):
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Parquet 입력은 pyarrow 가 필요합니다 (pip install pyarrow).")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_rows, encoding="utf-8")
+
+
+def _weights(frame):
+    # 없는 카테고리 열 / 빈 칸 / 숫자가 아닌 값은 가중치 0.
+    # app.parse_weights 처럼 값이 하나라도 있으면 선택한 것으로 봄 (모두 비어 있으면 오류)
+    weights = np.zeros((len(frame), len(PLAN.keys)))
+    selected = np.zeros(len(frame), dtype=bool)
+    for j, key in enumerate(PLAN.keys):
+        if key in frame:
+            column = pd.to_numeric(frame[key], errors="coerce").to_numpy(dtype=float)
+            selected |= ~np.isnan(column)
+            weights[:, j] = np.nan_to_num(column, nan=0.0)
+    return weights, selected
+
+
+def header(num):
+    columns = ["id"]
+    for i in range(1, num + 1):
+        columns += [f"district_{i}", f"score_{i}"]
+    return columns + ["error"]
+
+
+def process_chunk(ids, weights, selected, num, jsonl):
+    # worker 에서 채점 + 출력 문자열 생성까지 (부모 프로세스는 순서대로 파일에 쓰기만)
+    buffer = io.StringIO()
+    writer = None if jsonl else csv.writer(buffer)
+    for row_id, result in zip(ids, score_chunk(weights, selected, num)):
+        if jsonl:
+            body = {"id": row_id}
+            if isinstance(result, str):
+                body["error"] = result
+            else:
+                body["result"] = [{"district": d, "score": s} for d, s in result]
+            buffer.write(json.dumps(body, ensure_ascii=False) + "\n")
+        elif isinstance(result, str):
+            writer.writerow([row_id] + [""] * (2 * num) + [result])
+        else:
+            writer.writerow([row_id] + [v for pair in result for v in pair] + [""])
+    return buffer.getvalue()
+
+
+def run(src, out, num=5, city=DEFAULT_CITY, level="district", parent=None, method="sum",
+        workers=None, chunk_rows=CHUNK_ROWS, id_column="id"):
+    if method not in METHODS:
+        raise SystemExit(f"method 는 {', '.join(METHODS)} 중 하나여야 합니다.")
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    jsonl = out.endswith(".jsonl")
+    f = open(out, "w", encoding="utf-8", newline="")
+    if not jsonl:
+        csv.writer(f).writerow(header(num))
+    total = 0
+    pending = []
+
+    def drain(limit):
+        # 입력 순서대로 결과를 씀. 진행 중인 chunk 가 limit 개 이하가 될 때까지
+        nonlocal total
+        while len(pending) > limit:
+            ids, future = pending.pop(0)
+            f.write(future.result())
+            total += len(ids)
+            elapsed = time.perf_counter() - started
+            print(f"\r{total:,} rows, {total / elapsed:,.0f} rows/s", end="", file=sys.stderr)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init,
+                                 initargs=(city, level, parent, method)) as pool:
+            offset = 0
+            for frame in read_chunks(src, chunk_rows):
+                if id_column in frame:
+                    ids = frame[id_column].tolist()
+                else:
+                    ids = list(range(offset, offset + len(frame)))  # id 열이 없으면 입력 행 번호
+                offset += len(frame)
+                pending.append((ids, pool.submit(process_chunk, ids, *_weights(frame), num, jsonl)))
+                drain(workers * 2)  # 읽기가 채점보다 빨라도 메모리에 쌓이는 chunk 수는 일정
+            drain(0)
+    finally:
+        f.close()
+
+    elapsed = time.perf_counter() - started
+    print(f"\n{total:,} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} rows/s, {workers} workers) → {out}",
+          file=sys.stderr)
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="가중치 프로필 파일 일괄 채점 (/recommend 와 같은 순위)")
+    parser.add_argument("src", help="입력 CSV / Parquet (카테고리 key 열 = 가중치)")
+    parser.add_argument("out", help="출력 .csv 또는 .jsonl")
+    parser.add_argument("--num", type=int, default=5)
+    parser.add_argument("--city", default=DEFAULT_CITY)
+    parser.add_argument("--level", default="district")
+    parser.add_argument("--parent", default=None)
+    parser.add_argument("--method", default="sum", choices=METHODS)
+    parser.add_argument("--workers", type=int, default=None, help="기본값: CPU 코어 수")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--id-column", default="id")
+    args = parser.parse_args()
+
+    run(args.src, args.out, args.num, args.city, args.level, args.parent, args.method,
+        args.workers, args.chunk_rows, args.id_column)
@@ -0,0 +1,124 @@
+import numpy as np
+
+
+# final_df.csv 의 지표 컬럼 (모두 0~1 min-max 정규화 값)
+INDICATOR_COLUMNS = [
+    "crime_rate",
+    "senior_pedestrian_accidents",
+    "steep_slope_count",
+    "senior_center",
+    "sports_center",
+    "cultural_facilities",
+    "welfare_facilities",
+    "subway_station_count",
+    "bus_stop_density",
+    "medical_corporations_count",
+    "emergency_room_count",
+    "employ",
+    "green_space_per_capita",
+    "pm2_5_level",
+]
+
+
+class Category:
+    # key: /recommend 파라미터 이름, ko: /district-top5 의 카테고리 이름,
+    # feature_key: /district-features, /district-summary 응답에서 쓰던 이름
+    # label: /district-top5 info 문구, summary_label: /district-summary 문구 (없으면 label 과 같음)
+    # higher_is_better=False 이면 소속 지표를 1 - 값으로 반전
+    def __init__(self, key, ko, en, columns, label, weak_label,
+                 higher_is_better=True, feature_key=None, summary_label=None):
+        self.key = key
+        self.ko = ko
+        self.en = en
+        self.columns = columns
+        self.label = label
+        self.weak_label = weak_label
+        self.summary_label = summary_label or label
+        self.higher_is_better = higher_is_better
+        self.feature_key = feature_key or key
+
+
+# 카테고리 ↔ 지표 매핑은 여기 한 곳에서만 관리 (순서 = /district-top5 metricData 순서)
+CATEGORIES = [
+    Category("safety", "치안", "Safety", ["crime_rate"],
+             "치안이 가장 좋은", "치안이 가장 부족한", higher_is_better=False),
+    Category("walk", "보행환경", "Walkability", ["senior_pedestrian_accidents", "steep_slope_count"],
+             "보행환경이 가장 좋은", "보행환경이 가장 열악한", higher_is_better=False,
+             feature_key="walkenv"),
+    Category("transport", "대중교통", "Public transport", ["subway_station_count", "bus_stop_density"],
+             "대중교통이 가장 편리한", "대중교통 접근성이 가장 낮은"),
+    Category("medical", "병원접근성", "Medical access", ["medical_corporations_count", "emergency_room_count"],
+             "병원 접근성이 가장 좋은", "의료 접근성이 가장 부족한", summary_label="의료 접근성이 가장 좋은"),
+    Category("welfare", "노인복지시설", "Welfare facilities", ["sports_center", "welfare_facilities"],
+             "복지시설이 가장 많은", "복지시설이 가장 부족한"),
+    Category("culture", "문화시설", "Cultural facilities", ["cultural_facilities"],
+             "문화시설이 가장 많은", "문화시설이 가장 적은"),
+    Category("relation", "경로당", "Senior centers", ["senior_center"],
+             "경로당이 가장 많은", "경로당이 가장 적은"),
+    Category("social", "노인일자리", "Senior employment", ["employ"],
+             "노인 일자리가 가장 많은", "노인 일자리가 가장 부족한", feature_key="employment"),
+    Category("air", "대기환경", "Air quality", ["pm2_5_level"],
+             "대기환경이 가장 좋은", "대기질이 가장 나쁜", higher_is_better=False),
+    Category("nature", "자연환경", "Green space", ["green_space_per_capita"],
+             "녹지가 가장 많은", "녹지가 가장 적은", summary_label="자연환경이 가장 좋은"),
+]
+
+
+class ScoringPlan:
+    # 레지스트리를 로딩 시 한 번 인덱스 배열 / 반전 마스크 / 평균 행렬로 컴파일.
+    # 요청 처리 중에는 dict 나 컬럼 이름을 다시 찾지 않고 행렬 연산만 사용
+    def __init__(self, categories, columns):
+        self.categories = categories
+        self.keys = [cat.key for cat in categories]
+        self.columns = columns
+
+        col_pos = {col: i for i, col in enumerate(columns)}
+        self.col_idx = [np.array([col_pos[c] for c in cat.columns]) for cat in categories]
+
+        # 카테고리 이름(영문 key / 한글 / 응답용 key) → 위치
+        self.positions = {}
+        for j, cat in enumerate(categories):
+            for name in (cat.key, cat.ko, cat.feature_key):
+                self.positions[name] = j
+
+        self.invert = np.zeros(len(columns), dtype=bool)
+        self.membership = np.zeros((len(columns), len(categories)))
+        for j, (cat, idx) in enumerate(zip(categories, self.col_idx)):
+            self.membership[idx, j] = 1.0
+            if not cat.higher_is_better:
+                self.invert[idx] = True
+
+    def index(self, name):
+        return self.positions.get(name)
+
+    def adjust(self, raw):
+        # (N, K) 원본 지표 → 높을수록 좋은 방향으로 맞춘 지표
+        return np.where(self.invert, 1.0 - raw, raw)
+
+    def adjust_column(self, values, k):
+        return 1.0 - values if self.invert[k] else values
+
+    def category_scores(self, adjusted, categories=None):
+        # 카테고리 점수 = 소속 지표 평균 (NaN 지표는 평균에서 제외). (..., K) → (..., C)
+        # 카테고리마다 소속 지표만 더하므로 일부 카테고리만 다시 계산해도 전체 계산과 같은 값
+        if categories is None:
+            categories = range(len(self.categories))
+        valid = ~np.isnan(adjusted)
+        filled = np.where(valid, adjusted, 0.0)
+        out = np.empty(adjusted.shape[:-1] + (len(categories),))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            for out_j, j in enumerate(categories):
+                idx = self.col_idx[j]
+                out[..., out_j] = filled[..., idx].sum(axis=-1) / valid[..., idx].sum(axis=-1)
+        return out
+
+    def categories_of(self, columns):
+        # 지표 위치들 → 그 지표가 속한 카테고리 위치들
+        return sorted({int(j) for k in columns for j in np.flatnonzero(self.membership[k])})
+
+    def column_weights(self, category_weights):
+        # 카테고리 가중치 (C,) → 지표별 가중치 (K,). 카테고리의 모든 지표에 같은 가중치
+        return self.membership @ category_weights
+
+
+PLAN = ScoringPlan(CATEGORIES, INDICATOR_COLUMNS)
@@ -0,0 +1,281 @@
+import os
+import time
+
+import numpy as np
+
+from categories import PLAN
+
+
+# 카테고리 점수 (N, C) 로 지역 유형 묶기 (k-means / Ward 계층 군집)
+#
+# dataset version 별로 한 번 계산해서 Table 의 파생 데이터로 캐시 (Table.clusters).
+# 같은 데이터 + 같은 seed 면 항상 같은 결과이고, 군집 번호는 크기가 큰 순서로 다시 매김.
+# 큰 테이블도 다시 로딩할 때 부담이 없도록
+#   - 계층 군집은 행이 CLUSTER_HIER_MAX 개를 넘으면 k-means 로 그만큼의 소군집을 만든 뒤 그 중심들을 Ward 로 묶음
+#   - silhouette 은 행이 CLUSTER_SILHOUETTE_SAMPLE 개를 넘으면 seed 로 뽑은 표본으로 계산
+# 10만 행이면 한 번에 수 초가 걸리므로 요청 안에서 처음 계산하지 않는다. API 가 제공하는 (method, k) 는
+# 기본 조합(CLUSTER_METHOD, CLUSTER_K)과 CLUSTER_VARIANTS 에 적은 조합("hierarchical:5,kmeans:8")뿐이고,
+# 도시를 읽을 때 / 관리자 수정 후에 미리 계산한다 (partitions.warm_clusters)
+
+METHODS = ["kmeans", "hierarchical"]
+CLUSTER_METHOD = os.getenv("CLUSTER_METHOD", "kmeans")
+CLUSTER_K = int(os.getenv("CLUSTER_K", 5))
+CLUSTER_MAX_K = 12
+CLUSTER_VARIANTS = [(CLUSTER_METHOD, CLUSTER_K)] + [
+    (method.strip(), int(k))
+    for method, k in (v.split(":") for v in os.getenv("CLUSTER_VARIANTS", "").split(",") if v.strip())
+]
+CLUSTER_SEED = int(os.getenv("CLUSTER_SEED", 42))
+CLUSTER_HIER_MAX = int(os.getenv("CLUSTER_HIER_MAX", 1000))
+CLUSTER_SILHOUETTE_SAMPLE = int(os.getenv("CLUSTER_SILHOUETTE_SAMPLE", 2000))
+MICRO_SAMPLE = 20  # 소군집 k-means 를 돌릴 표본 행 수 = CLUSTER_HIER_MAX × 이 값
+KMEANS_INIT = 4
+KMEANS_MAX_ITER = 100
+BLOCK_ROWS = 4096  # 거리 행렬을 한 번에 만들 행 수
+
+
+def features(scores):
+    # 비어 있는 카테고리 점수는 그 카테고리의 평균으로 (모두 비어 있으면 0)
+    x = np.array(scores, dtype=float)
+    means = np.nan_to_num(np.nanmean(np.where(np.isnan(x).all(axis=0), 0.0, x), axis=0))
+    missing = np.isnan(x)
+    x[missing] = np.take(means, np.nonzero(missing)[1])
+    return x
+
+
+def _sq_dist(x, centers, x_sq=None):
+    # (N, k) 제곱 거리. |x|² - 2x·c + |c|² (음수 반올림 오차는 0 으로). x_sq: 미리 구한 |x|²
+    x_sq = (x ** 2).sum(axis=1) if x_sq is None else x_sq
+    d = x_sq[:, None] - 2 * x @ centers.T + (centers ** 2).sum(axis=1)[None, :]
+    return np.maximum(d, 0.0)
+
+
+def _nearest(x, centers):
+    # 각 행에서 가장 가까운 중심 (중심이 많을 때 거리 행렬을 BLOCK_ROWS 행씩)
+    out = np.empty(len(x), dtype=int)
+    for start in range(0, len(x), BLOCK_ROWS):
+        out[start:start + BLOCK_ROWS] = _sq_dist(x[start:start + BLOCK_ROWS], centers).argmin(axis=1)
+    return out
+
+
+def _sums(x, labels, k, weights):
+    # 군집별 (가중) 합. np.add.at 보다 열마다 bincount 가 훨씬 빠름
+    return np.stack([np.bincount(labels, weights=x[:, j] * weights, minlength=k) for j in range(x.shape[1])], axis=1)
+
+
+def _kmeans_pp(x, k, rng, weights, x_sq):
+    # k-means++ 초기 중심: 이미 고른 중심에서 멀수록 뽑힐 확률이 큼
+    centers = [x[rng.choice(len(x), p=weights / weights.sum())]]
+    closest = _sq_dist(x, centers[0][None, :], x_sq)[:, 0]
+    for _ in range(1, k):
+        p = closest * weights
+        total = p.sum()
+        pos = rng.choice(len(x), p=p / total) if total > 0 else rng.integers(len(x))
+        centers.append(x[pos])
+        closest = np.minimum(closest, _sq_dist(x, x[pos][None, :], x_sq)[:, 0])
+    return np.array(centers)
+
+
+def kmeans(x, k, seed=CLUSTER_SEED, weights=None, n_init=KMEANS_INIT, max_iter=KMEANS_MAX_ITER):
+    # weights: 행별 가중치. 관성(inertia)이 가장 작은 실행의 (labels, centers)
+    rng = np.random.default_rng(seed)
+    weights = np.ones(len(x)) if weights is None else np.asarray(weights, dtype=float)
+    x_sq = (x ** 2).sum(axis=1)
+    k = min(k, len(x))
+    best = None
+    for _ in range(n_init):
+        centers = _kmeans_pp(x, k, rng, weights, x_sq)
+        for _ in range(max_iter):
+            labels = _sq_dist(x, centers, x_sq).argmin(axis=1)
+            counts = np.bincount(labels, weights=weights, minlength=k)
+            sums = _sums(x, labels, k, weights)
+            # 비어 버린 군집은 이전 중심을 유지
+            moved = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1e-300)[:, None], centers)
+            if np.allclose(moved, centers, rtol=0, atol=1e-10):
+                centers = moved
+                break
+            centers = moved
+        d = _sq_dist(x, centers, x_sq)
+        labels = d.argmin(axis=1)
+        inertia = float((d[np.arange(len(x)), labels] * weights).sum())
+        if best is None or inertia < best[0]:
+            best = (inertia, labels, centers)
+    return best[1], best[2]
+
+
+def ward(x, k, weights=None):
+    # Ward 계층 군집 (nearest-neighbor chain, O(M²)). weights: 각 행이 대표하는 원래 행 수
+    m = len(x)
+    sizes = np.ones(m) if weights is None else np.asarray(weights, dtype=float).copy()
+    centers = np.array(x, dtype=float)
+    active = np.ones(m, dtype=bool)
+    rep = np.arange(m)  # slot → 그 군집에 속한 원래 행 하나 (병합 기록용)
+    merges = []
+    chain = []
+    remaining = m
+    while remaining > 1:
+        if not chain:
+            chain.append(int(np.flatnonzero(active)[0]))
+        a = chain[-1]
+        # Ward 거리: 두 군집을 합칠 때 늘어나는 제곱 오차
+        d = sizes * sizes[a] / (sizes + sizes[a]) * ((centers - centers[a]) ** 2).sum(axis=1)
+        d[~active] = np.inf
+        d[a] = np.inf
+        b = int(d.argmin())
+        if len(chain) > 1 and d[chain[-2]] <= d[b]:
+            b = chain[-2]
+        if len(chain) > 1 and b == chain[-2]:
+            chain.pop()
+            chain.pop()
+            merges.append((float(d[b]), rep[a], rep[b]))
+            total = sizes[a] + sizes[b]
+            centers[a] = (centers[a] * sizes[a] + centers[b] * sizes[b]) / total
+            sizes[a] = total
+            active[b] = False
+            remaining -= 1
+        else:
+            chain.append(b)
+
+    # 병합을 거리 순으로 m - k 번 적용 (Ward 는 reducible 이라 scipy 의 linkage 와 같은 계층)
+    parent = np.arange(m)
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    merges.sort(key=lambda merge: merge[0])
+    for _, a, b in merges[:m - min(k, m)]:
+        parent[find(a)] = find(b)
+    roots = np.array([find(i) for i in range(m)])
+    return np.unique(roots, return_inverse=True)[1].ravel()
+
+
+def silhouette(x, labels, rows=None):
+    # rows 의 각 행: (b - a) / max(a, b). a = 같은 군집 평균 거리, b = 가장 가까운 다른 군집 평균 거리
+    k = labels.max() + 1
+    counts = np.bincount(labels, minlength=k).astype(float)
+    rows = np.arange(len(x)) if rows is None else np.asarray(rows)
+    out = np.zeros(len(rows))
+    onehot = np.zeros((len(x), k))
+    onehot[np.arange(len(x)), labels] = 1.0
+    for start in range(0, len(rows), BLOCK_ROWS):
+        block = rows[start:start + BLOCK_ROWS]
+        dist = np.sqrt(_sq_dist(x[block], x))  # (b, N)
+        totals = dist @ onehot  # (b, k) 군집별 거리 합
+        own = labels[block]
+        same = counts[own] - 1
+        a = np.divide(totals[np.arange(len(block)), own], same, out=np.zeros(len(block)), where=same > 0)
+        means = totals / np.maximum(counts, 1)
+        means[np.arange(len(block)), own] = np.inf
+        means[:, counts == 0] = np.inf
+        b = means.min(axis=1)
+        denom = np.maximum(a, b)
+        s = np.divide(b - a, denom, out=np.zeros(len(block)), where=(denom > 0) & np.isfinite(b))
+        out[start:start + len(block)] = np.where(same > 0, s, 0.0)  # 혼자인 군집은 0
+    return out
+
+
+def _relabel(labels):
+    # 군집 번호를 크기가 큰 순서로 (같으면 가장 앞 행이 먼저)
+    k = labels.max() + 1
+    counts = np.bincount(labels, minlength=k)
+    first = np.full(k, len(labels))
+    np.minimum.at(first, labels, np.arange(len(labels)))
+    order = np.lexsort((first, -counts))
+    mapping = np.empty(k, dtype=int)
+    mapping[order] = np.arange(k)
+    return mapping[labels]
+
+
+def check_variant(method, k):
+    # 미리 계산하는 조합만 허용 (그 외 조합은 CLUSTER_VARIANTS 로 명시적으로 추가)
+    if method not in METHODS:
+        raise ValueError(f"method 는 {', '.join(METHODS)} 중 하나여야 합니다.")
+    if (method, k) not in CLUSTER_VARIANTS:
+        raise ValueError(
+            f"제공하는 군집 조합(method:k)은 {', '.join(f'{m}:{n}' for m, n in CLUSTER_VARIANTS)} 입니다."
+        )
+
+
+def describe(center, overall):
+    # 전체 평균 대비 높은 / 낮은 카테고리 (0.05 이상 차이 나는 것 중 2개씩)
+    diff = center - overall
+    order = np.argsort(-diff, kind="stable")
+    strengths = [PLAN.categories[j].ko for j in order[:2] if diff[j] > 0.05]
+    weaknesses = [PLAN.categories[j].ko for j in order[::-1][:2] if diff[j] < -0.05]
+    parts = []
+    if strengths:
+        parts.append(f"{'·'.join(strengths)} 우수")
+    if weaknesses:
+        parts.append(f"{'·'.join(weaknesses)} 취약")
+    return {"type": " / ".join(parts) or "평균형", "strengths": strengths, "weaknesses": weaknesses}
+
+
+class Clustering:
+    def __init__(self, scores, method="kmeans", k=CLUSTER_K, seed=CLUSTER_SEED):
+        if method not in METHODS:
+            raise ValueError(f"method 는 {', '.join(METHODS)} 중 하나여야 합니다.")
+        if not 2 <= k <= CLUSTER_MAX_K:
+            raise ValueError(f"k 는 2~{CLUSTER_MAX_K} 이어야 합니다.")
+        started = time.perf_counter()
+        self.method = method
+        self.seed = seed
+        self.x = features(scores)
+        n = len(self.x)
+        self.k = min(k, n)
+
+        if method == "kmeans":
+            labels, _ = kmeans(self.x, self.k, seed)
+        elif n <= CLUSTER_HIER_MAX:
+            labels = ward(self.x, self.k)
+        else:
+            # 표본으로 소군집 중심을 만들고 모든 행을 가장 가까운 중심에 배정한 뒤,
+            # 소군집 중심을 소속 행 수만큼의 가중치로 묶음. 각 행은 자기 소군집의 군집을 따름
+            rng = np.random.default_rng(seed)
+            sample = self.x
+            if n > CLUSTER_HIER_MAX * MICRO_SAMPLE:
+                sample = self.x[np.sort(rng.choice(n, CLUSTER_HIER_MAX * MICRO_SAMPLE, replace=False))]
+            _, centers = kmeans(sample, CLUSTER_HIER_MAX, seed, n_init=1, max_iter=10)
+            micro = _nearest(self.x, centers)
+            used, micro = np.unique(micro, return_inverse=True)
+            micro = micro.ravel()
+            counts = np.bincount(micro).astype(float)
+            centers = _sums(self.x, micro, len(used), np.ones(n)) / counts[:, None]
+            labels = ward(centers, self.k, counts)[micro]
+        self.labels = _relabel(labels)
+        self.k = int(self.labels.max()) + 1
+
+        self.sizes = np.bincount(self.labels, minlength=self.k)
+        self.centers = _sums(self.x, self.labels, self.k, np.ones(n)) / self.sizes[:, None]
+        self.overall = self.x.mean(axis=0)
+
+        # silhouette (큰 테이블은 seed 로 뽑은 표본으로)
+        if n > CLUSTER_SILHOUETTE_SAMPLE:
+            rows = np.sort(np.random.default_rng(seed).choice(n, CLUSTER_SILHOUETTE_SAMPLE, replace=False))
+        else:
+            rows = np.arange(n)
+        values = silhouette(self.x, self.labels, rows) if self.k > 1 else np.zeros(len(rows))
+        self.silhouette = float(values.mean())
+        sample_labels = self.labels[rows]
+        self.cluster_silhouette = [
+            float(values[sample_labels == c].mean()) if (sample_labels == c).any() else None
+            for c in range(self.k)
+        ]
+        self.sampled = len(rows) < n
+        self.profiles = [describe(center, self.overall) for center in self.centers]
+        self.elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+
+    def members(self, cluster):
+        return np.flatnonzero(self.labels == cluster)
+
+    def peers(self, pos, limit):
+        # 같은 군집에서 카테고리 점수가 가까운 순서 (자기 자신 제외)
+        members = self.members(self.labels[pos])
+        members = members[members != pos]
+        d = ((self.x[members] - self.x[pos]) ** 2).sum(axis=1)
+        return members[np.argsort(d, kind="stable")[:limit]]
+
+    def row_silhouette(self, pos):
+        return float(silhouette(self.x, self.labels, [pos])[0]) if self.k > 1 else 0.0
@@ -0,0 +1,328 @@
+import copy
+import hashlib
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from categories import INDICATOR_COLUMNS, PLAN
+from clusters import Clustering
+from mcdm import MCDMModel
+from names import NameIndex
+from topk import TopKIndex
+
+
+# 하위 → 상위 순서
+LEVELS = ["dong", "district", "city"]
+LEVEL_LABELS = {"dong": "행정동", "district": "자치구", "city": "시"}
+LEVEL_OBJECTS = {"dong": "행정동을", "district": "자치구를", "city": "시를"}
+
+# 행정동 단위 지표 (dong, district, population, 지표 컬럼들). 파일이 없으면 자치구가 최하위 레벨
+DONG_DATA_PATH = os.getenv("DONG_DATA_PATH", "final_dong_df.csv")
+CITY_NAME = os.getenv("CITY_NAME", "서울특별시")
+
+
+class DatasetLookupError(LookupError):
+    pass
+
+
+class Table:
+    # 지표 테이블 + 로딩 시 한 번 계산해 두는 배열들
+    # adjusted: 반전 적용한 지표 (N, K), scores: 카테고리 점수 (N, C)
+    def __init__(self, frame, adjusted=None, scores=None):
+        self.frame = frame.reset_index(drop=True)
+        self.names = self.frame["district"].to_numpy()
+        self.positions = {key: i for i, key in enumerate(self.names)}
+        if adjusted is None:
+            adjusted = PLAN.adjust(self.frame[INDICATOR_COLUMNS].to_numpy(dtype=float))
+        if scores is None:
+            scores = PLAN.category_scores(adjusted)
+        self.adjusted = adjusted
+        self.scores = scores
+        self.version = content_hash(self.names, self.adjusted)
+        self._derived = {}
+        self._derived_locks = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.names)
+
+    def derived(self, name, compute):
+        # 파생 데이터는 dataset version 별로 한 번만 계산해서 재사용.
+        # 처음 요청이 동시에 여러 개 와도 키별 lock 으로 한 번만 계산하고 나머지는 그 결과를 기다림
+        key = (self.version, name)
+        if key in self._derived:
+            return self._derived[key]
+        with self._lock:
+            lock = self._derived_locks.setdefault(key, threading.Lock())
+        with lock:
+            if key not in self._derived:
+                self._derived[key] = compute(self)
+        return self._derived[key]
+
+    def loo_means(self):
+        # 자기 자신을 뺀 나머지 행들의 카테고리 평균 (N, C)
+        return self.derived("loo_means", leave_one_out_means)
+
+    def total_scores(self):
+        # 종합 점수 = 카테고리 점수 평균 (N,)
+        return self.derived("total_scores", lambda t: np.nanmean(t.scores, axis=1))
+
+    def ranks(self):
+        # (rank, percentile) 각각 (N, C + 1). 마지막 열은 종합 점수
+        return self.derived("ranks", rank_table)
+
+    def topk_index(self):
+        # /recommend 가중합 상위 k 조회용 지표별 정렬 목록 (NaN 지표는 0 점)
+        return self.derived("topk_index", lambda t: TopKIndex(np.nan_to_num(t.adjusted)))
+
+    def mcdm(self):
+        # TOPSIS / VIKOR 용 정규화 · 이상점 거리 (mcdm.py)
+        return self.derived("mcdm", lambda t: MCDMModel(t.adjusted))
+
+    def clusters(self, method, k):
+        # 카테고리 점수로 묶은 지역 유형 (clusters.py). method / k 조합별로 한 번만 계산.
+        # 서버에서는 CLUSTER_VARIANTS 조합만 로딩 시 미리 계산해 두고 요청에서는 꺼내기만 함
+        return self.derived(f"clusters:{method}:{k}", lambda t: Clustering(t.scores, method, k))
+
+    def name_index(self):
+        # 이름 / 접두어 / 자모 / 로마자 별칭 → 행 위치 (names.py)
+        return self.derived("name_index", lambda t: NameIndex(t.names))
+
+    def resolve(self, name):
+        # 이름 → 행 위치. 정확히 같은 이름은 positions 로 바로, 아니면 별칭 / 접두어 색인으로.
+        # 없으면 None, 후보가 여러 개면 DatasetLookupError
+        if name is None:
+            return None
+        pos = self.positions.get(name)
+        if pos is not None:
+            return pos
+        return resolve_one(self.name_index(), name)
+
+    def replace_columns(self, updates):
+        # 지표 열 일부({열 위치: 새 값 (N,)})만 바뀐 새 테이블. 나머지 열과 카테고리는 그대로 두고
+        # 바뀐 열에 속한 카테고리 점수와 그 열에 해당하는 파생 데이터만 다시 계산한다.
+        # 모든 계산이 열(카테고리)별로 독립이라 처음부터 다시 만든 테이블과 값이 같음
+        columns = sorted(updates)
+        cats = PLAN.categories_of(columns)
+
+        table = copy.copy(self)
+        table.frame = self.frame.copy()
+        table.adjusted = self.adjusted.copy()
+        for k, values in updates.items():
+            table.frame[INDICATOR_COLUMNS[k]] = values
+            table.adjusted[:, k] = PLAN.adjust_column(values, k)
+        table.scores = self.scores.copy()
+        table.scores[:, cats] = PLAN.category_scores(table.adjusted, cats)
+        table.version = content_hash(table.names, table.adjusted)
+        table._derived = {}
+        table._derived_locks = {}
+        table._lock = threading.Lock()
+
+        # 이전 버전에서 이미 계산해 둔 파생 데이터는 바뀐 열만 갱신해서 넘겨줌 (나머지는 요청 시 다시 계산)
+        def carry(name, update):
+            previous = self._derived.get((self.version, name))
+            if previous is not None:
+                table._derived[(table.version, name)] = update(previous)
+
+        carry("name_index", lambda index: index)
+        carry("topk_index", lambda index: index.with_columns(columns, np.nan_to_num(table.adjusted)))
+        carry("mcdm", lambda model: model.with_columns(columns, table.adjusted))
+
+        def update_loo(loo):
+            loo = loo.copy()
+            loo[:, cats] = leave_one_out(table.scores[:, cats])
+            return loo
+        carry("loo_means", update_loo)
+
+        def update_ranks(previous):
+            # 종합 점수는 모든 행이 바뀔 수 있어서 종합 순위 열도 같이 갱신
+            rank, percentile = previous[0].copy(), previous[1].copy()
+            changed = cats + [len(PLAN.categories)]
+            rank[:, changed], percentile[:, changed] = rank_columns(
+                np.column_stack([table.scores[:, cats], table.total_scores()])
+            )
+            return rank, percentile
+        carry("ranks", update_ranks)
+        return table
+
+    def take(self, positions):
+        # 행 위치 배열로 부분 테이블 (배열은 다시 계산하지 않고 잘라서 사용)
+        return Table(self.frame.iloc[positions], self.adjusted[positions], self.scores[positions])
+
+
+def resolve_one(index, name):
+    matches = index.lookup(name)
+    if len(matches) > 1:
+        candidates = ", ".join(index.names[p] for p in matches[:5])
+        raise DatasetLookupError(f"'{name}' 에 해당하는 이름이 여러 개입니다: {candidates}")
+    return matches[0] if matches else None
+
+
+def content_hash(names, values):
+    h = hashlib.sha1()
+    h.update("\0".join(map(str, names)).encode("utf-8"))
+    h.update(np.ascontiguousarray(values).tobytes())
+    return h.hexdigest()[:12]
+
+
+def leave_one_out_means(table):
+    return leave_one_out(table.scores)
+
+
+def leave_one_out(scores):
+    # (전체 합 - 자기 값) / (전체 개수 - 1) 로 한 번에 계산. NaN 은 합과 개수 모두에서 제외
+    valid = ~np.isnan(scores)
+    filled = np.where(valid, scores, 0.0)
+    total = column_sums(filled)
+    count = valid.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (total - filled) / (count - valid)
+
+
+def column_sums(values):
+    # 열마다 따로 합산 (axis=0 합은 열 개수에 따라 더하는 순서가 달라질 수 있어서
+    # 일부 열만 다시 계산할 때 전체 계산과 값이 어긋날 수 있음)
+    return np.array([np.ascontiguousarray(values[:, j]).sum() for j in range(values.shape[1])])
+
+
+def rank_columns(values):
+    # 열마다 정렬 한 번 + searchsorted 로 순위 계산. 높을수록 1위, 동점은 같은 순위
+    # percentile = 자기 점수 이하인 지역 비율 (%)
+    rank = np.full(values.shape, np.nan)
+    percentile = np.full(values.shape, np.nan)
+    for j in range(values.shape[1]):
+        col = values[:, j]
+        valid = ~np.isnan(col)
+        ordered = np.sort(col[valid])
+        n = len(ordered)
+        at_or_below = np.searchsorted(ordered, col[valid], side="right")
+        rank[valid, j] = n - at_or_below + 1
+        percentile[valid, j] = 100.0 * at_or_below / n
+    return rank, percentile
+
+
+def rank_table(table):
+    return rank_columns(np.column_stack([table.scores, table.total_scores()]))
+
+
+class Level(Table):
+    # 한 레벨의 지표 테이블.
+    # 응답 형식을 유지하기 위해 단위 이름은 레벨과 상관없이 "district" 컬럼에 둔다.
+    # parent: 상위 레벨 키, population: 인구(가중치), count: 포함된 최하위 단위 수
+    def __init__(self, name, frame):
+        super().__init__(frame)
+        self.name = name
+        self.children = {}  # 상위 키 → 이 레벨의 행 위치 배열
+        if "parent" in self.frame:
+            self.children = {
+                key: np.asarray(pos)
+                for key, pos in self.frame.groupby("parent", sort=False).indices.items()
+            }
+
+
+def rollup(frame, columns):
+    # 하위 레벨 행들을 parent 기준으로 인구 가중 평균 (NaN 은 가중치에서 제외)
+    codes, parents = pd.factorize(frame["parent"], sort=False)
+    n = len(parents)
+    w = frame["population"].to_numpy(dtype=float)
+
+    out = {"district": parents.to_numpy()}
+    for col in columns:
+        out[col] = weighted_means(codes, n, w, frame[col].to_numpy(dtype=float))
+
+    out["population"] = np.bincount(codes, weights=w, minlength=n)
+    out["count"] = np.bincount(
+        codes, weights=frame["count"].to_numpy(dtype=float), minlength=n
+    ).astype(int)
+    return pd.DataFrame(out)
+
+
+def weighted_means(codes, n, w, x):
+    valid = ~np.isnan(x)
+    num = np.bincount(codes, weights=np.where(valid, x * w, 0.0), minlength=n)
+    den = np.bincount(codes, weights=np.where(valid, w, 0.0), minlength=n)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return num / den
+
+
+class Hierarchy:
+    # 행정동 → 자치구 → 시 계층. 상위 레벨 집계는 로딩 시 한 번만 계산
+    def __init__(self, leaf_level, leaf_frame, city_name=CITY_NAME):
+        self.levels = {}
+        self.city_name = city_name
+        frame = leaf_frame
+        for name in LEVELS[LEVELS.index(leaf_level):]:
+            if name != leaf_level:
+                frame = rollup(frame, INDICATOR_COLUMNS)
+            if name == "district":
+                frame["parent"] = city_name
+            self.levels[name] = Level(name, frame)
+        self.leaf = leaf_level
+        # 상위 레벨은 최하위 레벨에서 계산되므로 최하위 테이블 버전이 곧 데이터 버전
+        self.version = self.levels[leaf_level].version
+
+    def replace_columns(self, updates):
+        # 최하위 레벨의 지표 열 일부가 바뀐 새 계층. 상위 레벨은 바뀐 열만 다시 집계
+        hierarchy = copy.copy(self)
+        hierarchy.levels = {}
+        lower = None
+        for name in LEVELS[LEVELS.index(self.leaf):]:
+            level = self.levels[name]
+            if lower is not None:
+                codes, parents = pd.factorize(lower.frame["parent"], sort=False)
+                w = lower.frame["population"].to_numpy(dtype=float)
+                updates = {
+                    k: weighted_means(codes, len(parents), w, lower.frame[INDICATOR_COLUMNS[k]].to_numpy(dtype=float))
+                    for k in updates
+                }
+            lower = hierarchy.levels[name] = level.replace_columns(updates)
+        hierarchy.version = hierarchy.levels[self.leaf].version
+        return hierarchy
+
+    def level(self, name):
+        if name not in self.levels:
+            raise DatasetLookupError(
+                f"level 은 {', '.join(self.levels)} 중 하나여야 합니다."
+            )
+        return self.levels[name]
+
+    def table(self, level, parent=None):
+        # parent 가 주어지면 해당 상위 단위의 하위 행만 (인덱스 조회)
+        lv = self.level(level)
+        if parent is None:
+            return lv
+        if parent not in lv.children and level != LEVELS[-1]:
+            # 상위 레벨 이름 색인으로 별칭 / 접두어 해석 (강남 → 강남구)
+            upper = self.levels.get(LEVELS[LEVELS.index(level) + 1])
+            pos = upper.resolve(parent) if upper is not None else None
+            if pos is not None:
+                parent = upper.names[pos]
+        if parent not in lv.children:
+            raise DatasetLookupError(f"'{parent}' 에 속한 하위 지역이 없습니다.")
+        # 부분 테이블도 레벨 테이블의 파생 데이터로 캐시 (그 테이블의 topk 인덱스 등을 요청마다 다시 만들지 않음)
+        return lv.derived(f"children:{parent}", lambda t: t.take(t.children[parent]))
+
+
+def _prepare(frame):
+    frame = frame.copy()
+    if "population" not in frame:
+        # 인구 정보가 없으면 동일 가중치
+        frame["population"] = 1.0
+    frame["population"] = pd.to_numeric(frame["population"], errors="coerce").fillna(0.0)
+    frame["count"] = 1
+    for col in INDICATOR_COLUMNS:
+        frame[col] = pd.to_numeric(frame[col], errors="coerce")
+    return frame
+
+
+def load_hierarchy(district_df, dong_path=DONG_DATA_PATH, city_name=CITY_NAME):
+    if os.path.exists(dong_path):
+        dong = pd.read_csv(dong_path, encoding="utf-8")
+        # 동 이름은 구가 달라도 겹칠 수 있어서(예: 신사동) "구 동" 형태를 키로 사용
+        dong = dong.rename(columns={"district": "parent"})
+        dong["district"] = dong["parent"] + " " + dong["dong"]
+        return Hierarchy("dong", _prepare(dong), city_name)
+
+    return Hierarchy("district", _prepare(district_df[["district"] + INDICATOR_COLUMNS]), city_name)
@@ -0,0 +1,129 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from categories import INDICATOR_COLUMNS, PLAN
+from dataset import DatasetLookupError, Table, resolve_one
+from names import NameIndex
+
+
+# 연도별 지표 (year, district, 지표 컬럼들) long format.
+# 연도 간 비교가 되려면 정규화를 연도별이 아니라 전체 기간 기준으로 해야 함
+HISTORY_DATA_PATH = os.getenv("HISTORY_DATA_PATH", "final_df_history.csv")
+
+
+class History:
+    # 연도 × 자치구 × 지표 3차원 배열. 카테고리 점수와 추세는 로딩 시 한 번 계산하고
+    # (category, from, to) 별 순위는 version 단위로 캐시
+    def __init__(self, frame):
+        frame = frame.copy()
+        frame["year"] = frame["year"].astype(int)
+
+        self.years = np.sort(frame["year"].unique())
+        self.districts = pd.unique(frame["district"])
+        self.year_pos = {int(y): i for i, y in enumerate(self.years)}
+        self.district_pos = {d: i for i, d in enumerate(self.districts)}
+
+        y_idx = frame["year"].map(self.year_pos).to_numpy()
+        d_idx = frame["district"].map(self.district_pos).to_numpy()
+        self.values = np.full((len(self.years), len(self.districts), len(INDICATOR_COLUMNS)), np.nan)
+        self.values[y_idx, d_idx] = frame[INDICATOR_COLUMNS].to_numpy(dtype=float)
+
+        self.version = hashlib.sha1(self.values.tobytes()).hexdigest()[:12]
+
+        # 모든 연도의 카테고리 점수를 한 번에 (year, district, category)
+        self.categories = PLAN.keys
+        self.adjusted = PLAN.adjust(self.values)
+        self.scores = PLAN.category_scores(self.adjusted)
+
+        # 전체 기간 선형 추세 (연도당 점수 변화량). 결측 연도는 제외
+        t = self.years.astype(float)[:, None, None]
+        valid = ~np.isnan(self.scores)
+        n = valid.sum(axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            t_mean = np.where(valid, t, 0).sum(axis=0) / n
+            s_mean = np.where(valid, self.scores, 0).sum(axis=0) / n
+            dt = np.where(valid, t - t_mean, 0)
+            ds = np.where(valid, self.scores - s_mean, 0)
+            self.slopes = (dt * ds).sum(axis=0) / (dt * dt).sum(axis=0)  # (district, category)
+
+        self._tables = {}
+        self._movers = {}
+        self._name_index = None
+
+    def year_index(self, year):
+        try:
+            return self.year_pos[int(year)]
+        except (KeyError, ValueError):
+            raise DatasetLookupError(
+                f"year 는 {', '.join(str(y) for y in self.years)} 중 하나여야 합니다."
+            )
+
+    def table(self, year):
+        # 해당 연도 단면 (그 해 데이터가 있는 자치구만)
+        i = self.year_index(year)
+        if i not in self._tables:
+            present = np.flatnonzero(~np.isnan(self.values[i]).all(axis=1))
+            frame = pd.DataFrame(self.values[i, present], columns=INDICATOR_COLUMNS)
+            frame.insert(0, "district", self.districts[present])
+            self._tables[i] = Table(frame, self.adjusted[i, present], self.scores[i, present])
+        return self._tables[i]
+
+    def resolve(self, name):
+        # 자치구 이름 / 별칭 → 연도별 배열의 위치 (dataset.Table.resolve 와 같은 규칙)
+        if name is None:
+            return None
+        d = self.district_pos.get(name)
+        if d is not None:
+            return d
+        if self._name_index is None:
+            self._name_index = NameIndex(self.districts)
+        return resolve_one(self._name_index, name)
+
+    def district_trend(self, name):
+        d = self.resolve(name)
+        if d is None:
+            return None
+        return {
+            "district": self.districts[d],
+            "years": [int(y) for y in self.years],
+            "scores": {
+                cat: [None if np.isnan(v) else round(float(v), 3) for v in self.scores[:, d, j]]
+                for j, cat in enumerate(self.categories)
+            },
+            "slopes": {
+                cat: None if np.isnan(self.slopes[d, j]) else round(float(self.slopes[d, j]), 4)
+                for j, cat in enumerate(self.categories)
+            },
+        }
+
+    def movers(self, category, start=None, end=None):
+        # start → end 사이 점수 변화량 기준 정렬 (상승폭 내림차순). 결과는 캐시
+        j = PLAN.index(category)
+        if j is None:
+            raise DatasetLookupError(f"category 는 {', '.join(self.categories)} 중 하나여야 합니다.")
+        i = 0 if start is None else self.year_index(start)
+        k = len(self.years) - 1 if end is None else self.year_index(end)
+
+        key = (self.version, j, i, k)
+        if key not in self._movers:
+            delta = self.scores[k, :, j] - self.scores[i, :, j]
+            valid = np.flatnonzero(~np.isnan(delta))
+            order = valid[np.argsort(-delta[valid], kind="stable")]
+            self._movers[key] = (order, delta)
+        order, delta = self._movers[key]
+        return int(self.years[i]), int(self.years[k]), order, delta
+
+
+def load_history(current_df, path=HISTORY_DATA_PATH):
+    if os.path.exists(path):
+        frame = pd.read_csv(path, encoding="utf-8")
+    elif os.getenv("DATA_YEAR"):
+        # 연도별 파일이 없으면 현재 스냅샷 한 해만
+        frame = current_df[["district"] + INDICATOR_COLUMNS].copy()
+        frame["year"] = int(os.getenv("DATA_YEAR"))
+    else:
+        return None
+    return History(frame)
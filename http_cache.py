@@ -0,0 +1,67 @@
+import hashlib
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import make_response, request
+
+
+# 라우트 종류별 Cache-Control
+# static: 파라미터 없는 *-priority 라우트, default: 조회형 라우트, short: 가중치 조합이 많은 /recommend
+CACHE_POLICIES = {
+    "static": "public, max-age=3600, stale-while-revalidate=60",
+    "default": "public, max-age=600",
+    "short": "public, max-age=60",
+}
+
+# 데이터 버전 / 로딩 시각을 돌려주는 함수 (app.py 에서 init 으로 등록)
+_version = None
+_loaded_at = None
+
+
+def init(version, loaded_at):
+    global _version, _loaded_at
+    _version = version
+    _loaded_at = loaded_at
+
+
+def etag_for(version, path, query):
+    # 같은 데이터 + 같은 경로 + 같은 쿼리(순서 무관)면 같은 응답 (snapshot.py 도 같은 값을 씀)
+    raw = f"{version}|{path}|{query}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+
+
+def make_etag():
+    return etag_for(_version(), request.path, urlencode(sorted(request.args.items(multi=True))))
+
+
+def conditional(policy="default"):
+    # ETag / Last-Modified 가 맞으면 점수 계산과 직렬화 없이 바로 304
+    cache_control = CACHE_POLICIES[policy]
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            etag = make_etag()
+            loaded_at = _loaded_at()
+
+            not_modified = False
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains(etag)
+            elif request.if_modified_since:
+                not_modified = request.if_modified_since >= loaded_at
+
+            if not_modified:
+                response = make_response("", 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            response.last_modified = loaded_at
+            response.headers["Cache-Control"] = cache_control
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,183 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from categories import INDICATOR_COLUMNS
+
+
+# 원본 공공데이터 → final_df.csv 생성 파이프라인
+#
+#   python ingest.py --raw-dir raw --out final_df.csv
+#
+# raw 폴더에 아래 SOURCES 의 파일을 두면, 큰 CSV 도 chunk 단위로 읽어서 자치구별로 집계하고
+# min-max 정규화한 지표 테이블을 저장한다. 원본 파일별 집계 결과는 캐시해 두었다가
+# 파일이나 SOURCES 정의가 바뀐 경우에만 다시 읽는다.
+# 반전(낮을수록 좋은 지표)은 final_df.csv 에 적용하지 않고 점수 계산 시 categories.PLAN 에서 처리.
+
+# 자치구 기준 정보 (district, population, area_km2). 1인당 / 면적당 지표의 분모
+REFERENCE_FILE = "districts.csv"
+
+
+class Source:
+    # agg: count(행 수) / sum(value 컬럼 합) / mean(value 컬럼 평균)
+    # per: 자치구 기준 정보의 컬럼으로 나눔 (예: population, area_km2)
+    def __init__(self, file, agg="count", value=None, per=None, district_col="district", encoding="utf-8"):
+        self.file = file
+        self.agg = agg
+        self.value = value
+        self.per = per
+        self.district_col = district_col
+        self.encoding = encoding
+
+
+SOURCES = {
+    "crime_rate": Source("crime.csv", agg="sum", value="count", per="population"),
+    "senior_pedestrian_accidents": Source("senior_pedestrian_accidents.csv", agg="sum", value="count"),
+    "steep_slope_count": Source("steep_slopes.csv"),
+    "senior_center": Source("senior_centers.csv"),
+    "sports_center": Source("sports_centers.csv"),
+    "cultural_facilities": Source("cultural_facilities.csv"),
+    "welfare_facilities": Source("welfare_facilities.csv"),
+    "subway_station_count": Source("subway_stations.csv"),
+    "bus_stop_density": Source("bus_stops.csv", per="area_km2"),
+    "medical_corporations_count": Source("medical_corporations.csv"),
+    "emergency_room_count": Source("emergency_rooms.csv"),
+    "employ": Source("senior_jobs.csv", agg="sum", value="jobs"),
+    "green_space_per_capita": Source("green_space.csv", agg="sum", value="area_m2", per="population"),
+    "pm2_5_level": Source("pm25.csv", agg="mean", value="pm25"),
+}
+
+CACHE_DIR = ".ingest_cache"
+CHUNK_ROWS = 200_000
+
+
+def fingerprint(path, source):
+    # 수 GB 파일을 매번 해시하지 않도록 크기 + 수정시각으로 변경 여부 판단.
+    # 집계 방식(SOURCES 정의)이 바뀌어도 다시 집계하도록 소스 정의도 같이 기록
+    st = os.stat(path)
+    return {
+        "size": st.st_size,
+        "mtime_ns": st.st_mtime_ns,
+        "file": source.file,
+        "agg": source.agg,
+        "value": source.value,
+        "district_col": source.district_col,
+        "encoding": source.encoding,
+    }
+
+
+def aggregate_source(path, source, chunk_rows):
+    # chunk 단위로 읽으면서 자치구별 합계 / 개수만 누적 → 메모리는 chunk 크기 + 자치구 수
+    usecols = [source.district_col] + ([source.value] if source.value else [])
+    total = pd.Series(dtype=float)
+    count = pd.Series(dtype=float)
+
+    for chunk in pd.read_csv(path, usecols=usecols, chunksize=chunk_rows, encoding=source.encoding):
+        key = chunk[source.district_col].astype(str).str.strip()
+        if source.value:
+            values = pd.to_numeric(chunk[source.value], errors="coerce")
+            grouped = values.groupby(key)
+            total = total.add(grouped.sum(), fill_value=0)
+            count = count.add(grouped.count(), fill_value=0)
+        else:
+            count = count.add(key.value_counts(), fill_value=0)
+
+    return pd.DataFrame({"total": total, "count": count}).fillna(0.0).rename_axis("district")
+
+
+def load_or_aggregate(name, source, raw_dir, manifest, chunk_rows, force):
+    path = os.path.join(raw_dir, source.file)
+    cache_path = os.path.join(CACHE_DIR, f"{name}.csv")
+    fp = fingerprint(path, source)
+
+    if not force and manifest.get(name) == fp and os.path.exists(cache_path):
+        cached = pd.read_csv(cache_path, index_col="district", encoding="utf-8", float_precision="round_trip")
+        return cached, False
+
+    partial = aggregate_source(path, source, chunk_rows)
+    partial.to_csv(cache_path, encoding="utf-8")
+    manifest[name] = fp
+    return partial, True
+
+
+def finalize(name, source, partial, reference):
+    if source.agg == "count":
+        raw = partial["count"]
+    elif source.agg == "sum":
+        raw = partial["total"]
+    elif source.agg == "mean":
+        raw = partial["total"] / partial["count"].replace(0, np.nan)
+    else:
+        raise ValueError(f"{name}: 알 수 없는 agg '{source.agg}'")
+
+    # 기준 정보의 자치구 순서에 맞추고, 데이터가 없는 자치구는 0 (mean 은 NaN)
+    raw = raw.reindex(reference.index)
+    if source.agg != "mean":
+        raw = raw.fillna(0.0)
+    if source.per:
+        # 분모가 0 이면 inf 대신 NaN (결측). inf 가 있으면 min_max 가 열 전체를 0 으로 만듦
+        raw = raw / reference[source.per].replace(0, np.nan)
+    return raw
+
+
+def min_max(series):
+    lo, hi = series.min(), series.max()
+    if not np.isfinite(hi - lo) or hi == lo:
+        return series * 0.0
+    return (series - lo) / (hi - lo)
+
+
+def raw_table(raw_dir, chunk_rows=CHUNK_ROWS, force=False, verbose=True):
+    # 정규화 전 자치구 × 지표 원본 값 (관리자 수정 API 도 이 값을 기준으로 다시 정규화)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    manifest_path = os.path.join(CACHE_DIR, "manifest.json")
+    manifest = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+
+    reference = pd.read_csv(os.path.join(raw_dir, REFERENCE_FILE), encoding="utf-8")
+    reference["district"] = reference["district"].astype(str).str.strip()
+    reference = reference.set_index("district")
+
+    table = pd.DataFrame(index=reference.index)
+    for name in INDICATOR_COLUMNS:
+        source = SOURCES[name]
+        started = time.perf_counter()
+        partial, rebuilt = load_or_aggregate(name, source, raw_dir, manifest, chunk_rows, force)
+        table[name] = finalize(name, source, partial, reference)
+        if verbose:
+            state = "집계" if rebuilt else "캐시"
+            print(f"{name:<28} {state} {time.perf_counter() - started:.2f}s")
+
+    # 캐시 manifest 는 모든 소스 처리가 끝난 뒤에 저장
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return table
+
+
+def run(raw_dir, out, chunk_rows=CHUNK_ROWS, force=False):
+    table = raw_table(raw_dir, chunk_rows, force)
+    for name in INDICATOR_COLUMNS:
+        table[name] = min_max(table[name])
+
+    # 앱이 읽는 도중 반쯤 쓰인 파일을 보지 않도록 임시 파일에 쓰고 교체
+    tmp = out + ".tmp"
+    table.reset_index().to_csv(tmp, index=False, encoding="utf-8-sig")
+    os.replace(tmp, out)
+    return table
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="원본 데이터로 final_df.csv 생성")
+    parser.add_argument("--raw-dir", default="raw")
+    parser.add_argument("--out", default="final_df.csv")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--force", action="store_true", help="캐시를 무시하고 모든 원본을 다시 집계")
+    args = parser.parse_args()
+
+    run(args.raw_dir, args.out, args.chunk_rows, args.force)
@@ -0,0 +1,238 @@
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+
+import numpy as np
+
+from categories import PLAN
+from topk import top_k, weighted_scores
+
+
+# 슬라이더 UI 용 실시간 순위 세션 (Server-Sent Events)
+#
+# 세션은 가중치와 전체 지역 점수 배열을 들고 있다가, 카테고리 하나의 가중치가 바뀌면
+#   score += Δw × (그 카테고리 지표 합)
+# 으로 N 번의 곱셈-덧셈만 하고, 상위 num 개 중 순위가 바뀐 지역과 상위 num 개의 새 점수를 이벤트로 보낸다.
+# 누적 오차로 /recommend 와 동점 순서가 달라지지 않도록 LIVE_RESYNC 번마다 처음부터 다시 계산.
+# 데이터가 바뀌면(관리자 수정 등) 다음 변경 때 전체를 다시 계산하고 snapshot 이벤트를 보냄.
+# 세션은 요청을 받은 프로세스의 메모리에만 있으므로 worker 는 하나로 운영 (admin.py 와 같음)
+
+LIVE_SESSION_TTL = float(os.getenv("LIVE_SESSION_TTL", 600))  # 마지막 사용 후 유지 시간(초)
+LIVE_MAX_SESSIONS = int(os.getenv("LIVE_MAX_SESSIONS", 1000))
+LIVE_RESYNC = int(os.getenv("LIVE_RESYNC", 64))
+LIVE_HEARTBEAT = float(os.getenv("LIVE_HEARTBEAT", 15))  # SSE 연결 유지용 주석 전송 간격(초)
+LIVE_MAX_NUM = 100
+EVENT_QUEUE = 64
+
+
+class LiveError(ValueError):
+    pass
+
+
+def category_columns(table):
+    # (N, C): 카테고리별 소속 지표(반전 적용, NaN → 0) 합. 가중치 1 일 때 그 카테고리의 점수 기여분
+    return table.derived("category_columns", lambda t: t.topk_index().values @ PLAN.membership)
+
+
+class Session:
+    # source() → 현재 계층 (partitions 의 도시 파티션). 계층이 바뀌면 데이터가 바뀐 것
+    def __init__(self, source, level, parent, weights, num):
+        if not 1 <= num <= LIVE_MAX_NUM:
+            raise LiveError(f"num 은 1~{LIVE_MAX_NUM} 이어야 합니다.")
+        self.id = secrets.token_urlsafe(16)
+        self.source = source
+        self.level = level
+        self.parent = parent
+        self.num = num
+        self.weights = np.asarray(weights, dtype=float).copy()
+        self.lock = threading.Lock()
+        self.events = queue.Queue(EVENT_QUEUE)
+        self.listener = 0
+        self.seq = 0
+        self.touched = time.monotonic()
+        self.closed = False
+        self.stats = {"updates": 0, "events": 0, "resyncs": 0, "resets": 0}
+        self._load()
+
+    def _load(self):
+        self.hierarchy = self.source()
+        self.table = self.hierarchy.table(self.level, self.parent)
+        self._rescore()
+
+    def _rescore(self):
+        # /recommend(topk.full_scan) 과 같은 식으로 전체 점수를 처음부터 계산
+        column_weights = PLAN.column_weights(self.weights)
+        active = np.flatnonzero(column_weights)
+        values = self.table.topk_index().values
+        self.scores = weighted_scores(values[:, active], column_weights[active])
+        self.pending = 0
+        self.top = self._top()
+
+    def _top(self):
+        order, _ = top_k(self.scores, self.num)
+        return [int(i) for i in order]
+
+    def result(self):
+        return [{"district": str(self.table.names[i]), "score": float(self.scores[i])} for i in self.top]
+
+    def top_scores(self):
+        # 현재 상위 num 개의 점수 (순위 순서). 순위가 그대로여도 점수는 바뀌므로 매번 보냄
+        return [float(self.scores[i]) for i in self.top]
+
+    def snapshot(self):
+        return {"type": "snapshot", "seq": self.seq, "result": self.result()}
+
+    def update(self, changes):
+        # changes: {카테고리 위치: 새 가중치} → 보낸 이벤트 (순위 변화가 없으면 None)
+        with self.lock:
+            self.touched = time.monotonic()
+            self.stats["updates"] += 1
+            if self.source() is not self.hierarchy:
+                # 데이터가 바뀜: 새 테이블로 다시 계산하고 전체 결과를 보냄
+                for j, w in changes.items():
+                    self.weights[j] = w
+                self._load()
+                self.stats["resets"] += 1
+                self.seq += 1
+                return self._push(self.snapshot())
+
+            columns = category_columns(self.table)
+            changed = False
+            for j, w in changes.items():
+                delta = w - self.weights[j]
+                if delta:
+                    self.scores += delta * columns[:, j]
+                    self.weights[j] = w
+                    self.pending += 1
+                    changed = True
+
+            before = self.top
+            if self.pending >= LIVE_RESYNC:
+                self._rescore()
+                self.stats["resyncs"] += 1
+            else:
+                self.top = self._top()
+
+            previous = {pos: rank for rank, pos in enumerate(before, start=1)}
+            current = {pos: rank for rank, pos in enumerate(self.top, start=1)}
+            moved = [
+                {"district": str(self.table.names[pos]), "rank": rank, "from": previous.get(pos),
+                 "score": float(self.scores[pos])}
+                for pos, rank in current.items() if previous.get(pos) != rank
+            ]
+            left = [
+                {"district": str(self.table.names[pos]), "from": rank}
+                for pos, rank in previous.items() if pos not in current
+            ]
+            if not changed:
+                return None
+            self.seq += 1
+            return self._push({"type": "rank", "seq": self.seq, "moved": moved, "left": left,
+                               "scores": self.top_scores()})
+
+    def _push(self, event):
+        # 클라이언트가 이벤트를 못 따라오면 쌓인 것을 버리고 전체 결과 한 번으로 대신함
+        try:
+            self.events.put_nowait(event)
+        except queue.Full:
+            self._drain()
+            self.events.put_nowait(self.snapshot())
+        self.stats["events"] += 1
+        return event
+
+    def _drain(self):
+        while True:
+            try:
+                self.events.get_nowait()
+            except queue.Empty:
+                return
+
+    def stream(self):
+        # SSE 응답 body. 연결할 때마다 snapshot 부터 (그 전에 쌓인 이벤트는 버리고, 이전 연결은 종료)
+        with self.lock:
+            self.listener += 1
+            listener = self.listener
+            self._drain()
+            first = self.snapshot()
+        yield _format(first)
+        while not self.closed and listener == self.listener:
+            try:
+                event = self.events.get(timeout=LIVE_HEARTBEAT)
+            except queue.Empty:
+                self.touched = time.monotonic()
+                yield ": keep-alive\n\n"
+                continue
+            if event is None:
+                break
+            if listener != self.listener:
+                # 그 사이 새 연결이 생김: 이벤트는 새 연결 몫으로 돌려놓고 종료
+                try:
+                    self.events.put_nowait(event)
+                except queue.Full:
+                    pass
+                break
+            yield _format(event)
+
+    def close(self):
+        self.closed = True
+        try:
+            self.events.put_nowait(None)
+        except queue.Full:
+            pass
+
+
+def _format(event):
+    return f"id: {event['seq']}\nevent: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+class SessionStore:
+    def __init__(self, ttl=LIVE_SESSION_TTL, max_sessions=LIVE_MAX_SESSIONS):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.sessions = {}
+        self._lock = threading.Lock()
+        self.created = 0
+        self.expired = 0
+
+    def _reap(self):
+        now = time.monotonic()
+        for sid in [sid for sid, s in self.sessions.items() if now - s.touched > self.ttl]:
+            self.sessions.pop(sid).close()
+            self.expired += 1
+
+    def create(self, source, level, parent, weights, num):
+        session = Session(source, level, parent, weights, num)
+        with self._lock:
+            self._reap()
+            if len(self.sessions) >= self.max_sessions:
+                raise LiveError("세션이 너무 많습니다. 잠시 후 다시 시도해 주세요.")
+            self.sessions[session.id] = session
+            self.created += 1
+        return session
+
+    def get(self, sid):
+        with self._lock:
+            session = self.sessions.get(sid)
+        if session is not None:
+            session.touched = time.monotonic()
+        return session
+
+    def close(self, sid):
+        with self._lock:
+            session = self.sessions.pop(sid, None)
+        if session is not None:
+            session.close()
+        return session is not None
+
+    def stats(self):
+        with self._lock:
+            self._reap()
+            sessions = list(self.sessions.values())
+        totals = {"updates": 0, "events": 0, "resyncs": 0, "resets": 0}
+        for s in sessions:
+            for key in totals:
+                totals[key] += s.stats[key]
+        return dict(totals, sessions=len(sessions), created=self.created, expired=self.expired)
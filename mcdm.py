@@ -0,0 +1,77 @@
+import numpy as np
+
+
+# 가중합 외의 다기준 의사결정 순위 (TOPSIS / VIKOR)
+#
+# 입력은 반전이 적용된 지표(높을수록 좋음, NaN → 0)라서 모든 지표를 이익 기준으로 취급.
+# 가중치와 무관한 정규화 / 이상점 / 반이상점 거리는 dataset version 별로 한 번 계산해 두고,
+# 질의 때는 (N, K) 행렬 × 가중치 한 번으로 점수를 낸다.
+
+METHODS = ["sum", "topsis", "vikor"]
+VIKOR_V = 0.5  # VIKOR 다수 효용(S) / 개별 후회(R) 비중
+
+
+def _fit(values):
+    values = np.nan_to_num(np.asarray(values, dtype=float))
+
+    # TOPSIS: 열별 벡터 정규화 후 이상점(열 최대) / 반이상점(열 최소)까지의 성분별 제곱 거리
+    # 열마다 따로 합산해서 일부 열만 다시 계산해도 같은 값 (with_columns)
+    squares = values ** 2
+    norms = np.sqrt([np.ascontiguousarray(squares[:, k]).sum() for k in range(values.shape[1])])
+    normalized = np.divide(values, norms, out=np.zeros_like(values), where=norms > 0)
+    ideal_sq = (normalized - normalized.max(axis=0)) ** 2  # (N, K)
+    anti_sq = (normalized - normalized.min(axis=0)) ** 2
+
+    # VIKOR: 열별 (최고값 - 값) / (최고값 - 최저값). 0 이면 그 지표에서 가장 좋은 행
+    best, worst = values.max(axis=0), values.min(axis=0)
+    span = best - worst
+    gap = np.divide(best - values, span, out=np.zeros_like(values), where=span > 0)
+    return ideal_sq, anti_sq, gap
+
+
+def normalize_weights(weights):
+    # TOPSIS / VIKOR 는 음수 가중치를 정의하지 않으므로 거절, 합이 1 이 되도록 맞춤
+    if (weights < 0).any():
+        raise ValueError("topsis / vikor 는 음수 가중치를 지원하지 않습니다.")
+    total = weights.sum()
+    if total <= 0:
+        raise ValueError("가중치 입력이 필요합니다.")
+    return weights / total
+
+
+class MCDMModel:
+    def __init__(self, values):
+        self.ideal_sq, self.anti_sq, self.gap = _fit(values)
+
+    def with_columns(self, columns, values):
+        # 지표 열 일부만 바뀐 경우: 모든 항이 열별로 독립이라 그 열만 다시 계산
+        model = MCDMModel.__new__(MCDMModel)
+        model.ideal_sq, model.anti_sq, model.gap = self.ideal_sq.copy(), self.anti_sq.copy(), self.gap.copy()
+        model.ideal_sq[:, columns], model.anti_sq[:, columns], model.gap[:, columns] = _fit(values[:, columns])
+        return model
+
+    def topsis(self, weights):
+        # 이상점과 가까울수록, 반이상점과 멀수록 1 에 가까움 (상대 근접도)
+        w2 = normalize_weights(weights) ** 2
+        d_ideal = np.sqrt(self.ideal_sq @ w2)
+        d_anti = np.sqrt(self.anti_sq @ w2)
+        denom = d_ideal + d_anti
+        return np.divide(d_anti, denom, out=np.zeros_like(denom), where=denom > 0)
+
+    def vikor(self, weights, v=VIKOR_V):
+        # Q 는 낮을수록 좋은 값이라 다른 방식과 맞추기 위해 1 - Q 를 점수로 사용
+        w = normalize_weights(weights)
+        s = self.gap @ w
+        r = (self.gap * w).max(axis=1)
+        s_span = s.max() - s.min()
+        r_span = r.max() - r.min()
+        s_part = (s - s.min()) / s_span if s_span > 0 else np.zeros_like(s)
+        r_part = (r - r.min()) / r_span if r_span > 0 else np.zeros_like(r)
+        return 1.0 - (v * s_part + (1 - v) * r_part)
+
+    def scores(self, method, weights):
+        if method == "topsis":
+            return self.topsis(weights)
+        if method == "vikor":
+            return self.vikor(weights)
+        raise ValueError(f"method 는 {', '.join(METHODS)} 중 하나여야 합니다.")
@@ -0,0 +1,195 @@
+import itertools
+import re
+import unicodedata
+
+
+# 지역 이름 색인 (정확 일치 hash map + 접두어 trie)
+#
+# 이름마다 여러 별칭을 등록한다.
+#   강남구 → 강남구 / 강남 / gangnamgu / gangnam,  "강남구 역삼동" → 역삼동 / 역삼 / yeoksamdong ...
+# 키는 공백·기호를 지우고 소문자로 바꾼 뒤 한글을 자모로 풀어서 만든다 (강남 → ㄱㅏㅇㄴㅏㅁ).
+# 그래서 입력 중인 "강ㄴ" 도 "강남구" 의 접두어가 됨. 조회 비용은 이름 수가 아니라 입력 길이에 비례
+
+HANGUL_BASE, HANGUL_LAST = 0xAC00, 0xD7A3
+CHO = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JUNG = "ㅏㅐㅑㅒㅓㅔㅕㅖㅗㅘㅙㅚㅛㅜㅝㅞㅟㅠㅡㅢㅣ"
+JONG = ["", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ", "ㄿ", "ㅀ",
+        "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+
+# 겹모음 / 겹받침은 낱자로 (입력 중에는 ㅗ → ㅘ 처럼 한 글자씩 들어오므로)
+SPLIT = {
+    "ㅘ": "ㅗㅏ", "ㅙ": "ㅗㅐ", "ㅚ": "ㅗㅣ", "ㅝ": "ㅜㅓ", "ㅞ": "ㅜㅔ", "ㅟ": "ㅜㅣ", "ㅢ": "ㅡㅣ",
+    "ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ", "ㄽ": "ㄹㅅ",
+    "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ",
+}
+
+# 국어의 로마자 표기법 (자모 단위 + 자주 나오는 연음 / 비음화 / 유음화만)
+CHO_ROMAN = ["g", "kk", "n", "d", "tt", "r", "m", "b", "pp", "s", "ss", "", "j", "jj", "ch", "k", "t", "p", "h"]
+JUNG_ROMAN = ["a", "ae", "ya", "yae", "eo", "e", "yeo", "ye", "o", "wa", "wae", "oe", "yo", "u", "wo", "we",
+              "wi", "yu", "eu", "ui", "i"]
+JONG_ROMAN = ["", "k", "k", "k", "n", "n", "n", "t", "l", "k", "m", "p", "l", "l", "p", "l", "m", "p", "p",
+              "t", "t", "ng", "t", "t", "k", "t", "p", "t"]
+# 받침 뒤에 모음(ㅇ)이 오면 받침이 다음 음절 첫소리로 넘어감
+LIAISON = {1: "g", 2: "kk", 4: "n", 7: "d", 8: "r", 16: "m", 17: "b", 19: "s", 20: "ss", 22: "j",
+           23: "ch", 24: "k", 25: "t", 26: "p", 27: ""}
+
+# 행정구역 접미사 (강남구 → 강남 도 별칭으로)
+SUFFIXES = ("구", "동", "시", "군", "읍", "면")
+
+_STRIP = re.compile(r"[\s\-_.·'\"]+")
+
+
+def _syllables(text):
+    # 한글 음절 → (초성, 중성, 종성) 인덱스. 한글이 아니면 None
+    for ch in text:
+        code = ord(ch)
+        if HANGUL_BASE <= code <= HANGUL_LAST:
+            offset = code - HANGUL_BASE
+            yield ch, (offset // 588, (offset % 588) // 28, offset % 28)
+        else:
+            yield ch, None
+
+
+def normalize(text):
+    return _STRIP.sub("", unicodedata.normalize("NFC", str(text))).lower()
+
+
+def fold(text):
+    # 색인 / 조회 키: 정규화 후 한글을 자모로 풀어 씀
+    out = []
+    for ch, parts in _syllables(normalize(text)):
+        if parts is None:
+            out.append(SPLIT.get(ch, ch))
+        else:
+            cho, jung, jong = parts
+            out.append(CHO[cho] + SPLIT.get(JUNG[jung], JUNG[jung]))
+            if jong:
+                out.append(SPLIT.get(JONG[jong], JONG[jong]))
+    return "".join(out)
+
+
+def topic(name):
+    # 이름 + 보조사: 마지막 음절에 받침이 있으면 "은", 없으면 "는" (신사동은, 강남구는).
+    # 한글로 끝나지 않으면 판단할 수 없으므로 "은(는)"
+    name = str(name)
+    parts = list(_syllables(name[-1:]))
+    if not parts or parts[0][1] is None:
+        return f"{name}은(는)"
+    return f"{name}{'은' if parts[0][1][2] else '는'}"
+
+
+def romanize(text):
+    syllables = list(_syllables(normalize(text)))
+    out = []
+    for i, (ch, parts) in enumerate(syllables):
+        if parts is None:
+            out.append(ch)
+            continue
+        cho, jung, jong = parts
+        nxt = syllables[i + 1][1] if i + 1 < len(syllables) else None
+
+        # 앞 음절 받침이 이 음절 첫소리를 바꾸는 경우는 앞에서 처리 (out 마지막 원소에 반영)
+        initial = CHO_ROMAN[cho]
+        prev = syllables[i - 1][1] if i > 0 else None
+        if prev is not None:
+            prev_final = JONG_ROMAN[prev[2]]
+            if cho == 5 and prev_final in ("ng", "m", "k", "p"):
+                initial = "n"  # 종로 → jongno, 백리 → baengni
+            elif cho == 5 and prev_final in ("n", "l"):
+                initial = "l"  # 신림 → sillim
+            elif cho == 2 and prev_final == "l":
+                initial = "l"  # 설날 → seollal
+        out.append(initial + JUNG_ROMAN[jung])
+
+        if not jong:
+            continue
+        final = JONG_ROMAN[jong]
+        if nxt is not None:
+            if nxt[0] == 11 and jong in LIAISON:
+                final = LIAISON[jong]  # 관악 → gwanak
+            elif nxt[0] in (2, 6, 5):
+                # 비음화: 받침 ㄱ/ㄷ/ㅂ 뒤 ㄴ·ㅁ·ㄹ
+                final = {"k": "ng", "t": "n", "p": "m"}.get(final, final)
+                if nxt[0] == 5 and final == "n":
+                    final = "l"
+        out.append(final)
+    return "".join(out)
+
+
+def aliases(name):
+    # 이름 하나에 대한 별칭들 (원래 이름, 마지막 단어, 접미사 뺀 이름, 각각의 로마자)
+    name = str(name)
+    words = name.split()
+    forms = {name}
+    for start in range(1, len(words)):
+        forms.add(" ".join(words[start:]))
+    for form in list(forms):
+        stem = normalize(form)
+        if len(stem) > 2 and stem.endswith(SUFFIXES):
+            forms.add(stem[:-1])
+    for form in list(forms):
+        forms.add(romanize(form))
+    return {fold(form) for form in forms if normalize(form)}
+
+
+class _Node:
+    __slots__ = ("children", "targets")
+
+    def __init__(self):
+        self.children = {}
+        self.targets = set()
+
+
+class NameIndex:
+    # names: 행 순서대로의 이름 배열. 조회 결과는 행 위치
+    def __init__(self, names):
+        self.names = [str(n) for n in names]
+        self.exact = {}
+        self.root = _Node()
+
+        for pos, name in enumerate(self.names):
+            for key in aliases(name):
+                self.exact.setdefault(key, set()).add(pos)
+                node = self.root
+                for ch in key:
+                    node = node.children.setdefault(ch, _Node())
+                    node.targets.add(pos)
+
+        # 후보 순서: 짧은 이름 → 가나다 순. 로딩 시 한 번 정렬해 두고 조회 때는 그대로 사용
+        order = lambda pos: (len(self.names[pos]), self.names[pos])
+        self.exact = {key: sorted(targets, key=order) for key, targets in self.exact.items()}
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            node.targets = sorted(node.targets, key=order)
+            stack.extend(node.children.values())
+
+    def prefix(self, query):
+        node = self.root
+        for ch in fold(query):
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        return node.targets
+
+    def lookup(self, query):
+        # 정확히 일치하는 별칭이 있으면 그것만, 없으면 접두어가 일치하는 이름들
+        key = fold(query)
+        if not key:
+            return []
+        if key in self.exact:
+            return self.exact[key]
+        return self.prefix(query)
+
+    def suggest(self, query, limit=10):
+        key = fold(query)
+        if not key or limit < 1:
+            return []
+        # 정확 일치 → 접두어 순서로 읽다가 limit 개를 모으면 멈춤 (후보 목록을 합쳐서 만들지 않음)
+        seen = []
+        for pos in itertools.chain(self.exact.get(key, ()), self.prefix(query)):
+            if pos not in seen:
+                seen.append(pos)
+                if len(seen) == limit:
+                    break
+        return seen
@@ -0,0 +1,216 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+import admin
+import clusters
+import dataset
+from categories import INDICATOR_COLUMNS
+from history import HISTORY_DATA_PATH, load_history
+
+
+# 도시별 데이터 파티션
+#
+# 기본 도시(DEFAULT_CITY)는 지금처럼 저장소 루트의 final_df.csv 등을 쓰고, 다른 도시는
+# CITY_DATA_DIR/<도시 key>/ 아래에 같은 이름의 파일을 둔다.
+#   final_df.csv, final_dong_df.csv(선택), final_df_history.csv(선택), city.json({"name": "부산광역시"})
+# 파티션은 처음 요청될 때 읽고, 메모리 한도(PARTITION_MAX_BYTES) / 개수 한도(PARTITION_MAX_CITIES)를
+# 넘으면 가장 오래 안 쓴 도시부터 내린다. 기본 도시는 내리지 않음.
+# 파생 데이터(순위, 색인 등)는 각 파티션의 테이블에 붙어 있으므로 파티션과 함께 사라짐
+
+CITY_DATA_DIR = os.getenv("CITY_DATA_DIR", "cities")
+DEFAULT_CITY = os.getenv("DEFAULT_CITY", "seoul")
+PARTITION_MAX_BYTES = int(os.getenv("PARTITION_MAX_BYTES", 512 * 1024 * 1024))
+PARTITION_MAX_CITIES = int(os.getenv("PARTITION_MAX_CITIES", 16))
+
+_KEY = re.compile(r"^[a-z0-9_-]{1,64}$")
+
+
+class Partition:
+    # 한 도시의 지표 테이블, 계층, 연도별 데이터, 관리자 수정 상태와 응답 캐시용 버전
+    def __init__(self, key):
+        started = time.perf_counter()
+        self.key = key
+        self.lock = threading.Lock()  # 관리자 수정은 파티션 단위로 직렬화
+
+        if key == DEFAULT_CITY:
+            root = "."
+            dong_path, history_path = dataset.DONG_DATA_PATH, HISTORY_DATA_PATH
+            self.patch_log, raw_dir, city_name = admin.PATCH_LOG_PATH, admin.RAW_DATA_DIR, dataset.CITY_NAME
+        else:
+            root = os.path.join(CITY_DATA_DIR, key)
+            dong_path = os.path.join(root, "final_dong_df.csv")
+            history_path = os.path.join(root, "final_df_history.csv")
+            self.patch_log, raw_dir, city_name = os.path.join(root, "admin_patches.jsonl"), None, key
+            info_path = os.path.join(root, "city.json")
+            if os.path.exists(info_path):
+                with open(info_path, encoding="utf-8") as f:
+                    city_name = json.load(f).get("name", key)
+
+        df = pd.read_csv(os.path.join(root, "final_df.csv"), encoding="utf-8")  # 자치구별 노인친화 지표
+
+        # 행정동 → 자치구 → 시 계층 + 관리자 수정용 원본 값 (이전 수정 내역 적용).
+        # 모든 라우트는 계층의 값만 사용 (행정동 데이터가 있으면 자치구 값은 동 집계라 final_df.csv 와 다름)
+        hierarchy = dataset.load_hierarchy(df, dong_path, city_name)
+        hierarchy, self.raw_state = admin.load(hierarchy, self.patch_log, raw_dir)
+        self.hierarchy = hierarchy
+        self.city_name = city_name
+
+        # 연도별 지표 (연도 × 자치구 × 지표). 연도별 데이터가 없으면 None
+        self.history = load_history(hierarchy.level("district").frame, history_path)
+
+        self.data_version = self.dataset_version()
+        self.loaded_at = datetime.now(timezone.utc).replace(microsecond=0)
+
+        # 지표 열별 수정 횟수 / 수정 시각. 일부 지표만 쓰는 응답(/recommend)은 그 열들이 바뀔 때만 무효화
+        self.base_version, self.base_loaded_at = self.data_version, self.loaded_at
+        self.column_revision = [0] * len(INDICATOR_COLUMNS)
+        self.column_modified = [self.loaded_at] * len(INDICATOR_COLUMNS)
+
+        self.load_ms = round((time.perf_counter() - started) * 1000, 1)
+        self.hits = 0
+
+    def dataset_version(self):
+        return hashlib.sha1(
+            f"{self.key}|{self.hierarchy.version}|{self.history.version if self.history else ''}".encode("utf-8")
+        ).hexdigest()[:12]
+
+    def columns_version(self, columns):
+        revisions = ",".join(f"{k}:{self.column_revision[k]}" for k in columns)
+        return hashlib.sha1(f"{self.base_version}|{revisions}".encode("utf-8")).hexdigest()[:12]
+
+    def columns_modified(self, columns):
+        return max((self.column_modified[k] for k in columns), default=self.base_loaded_at)
+
+    def nbytes(self):
+        # 테이블 / 배열 / 파생 데이터의 대략적인 메모리 (LRU 한도 판단용)
+        total = 0
+        for level in self.hierarchy.levels.values():
+            total += int(level.frame.memory_usage(deep=True).sum())
+            total += _nbytes(level.adjusted) + _nbytes(level.scores)
+            total += sum(_nbytes(value) for value in level._derived.values())
+        if self.history is not None:
+            total += _nbytes(self.history.values) + _nbytes(self.history.adjusted) + _nbytes(self.history.scores)
+        total += _nbytes(self.raw_state.raw) + _nbytes(self.raw_state.normalized)
+        return total
+
+
+def _nbytes(value, depth=0):
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if depth > 2:
+        return 0
+    if isinstance(value, (list, tuple)):
+        return sum(_nbytes(v, depth + 1) for v in value)
+    if isinstance(value, dict):
+        return sum(_nbytes(v, depth + 1) for v in value.values())
+    if hasattr(value, "__dict__"):
+        return sum(_nbytes(v, depth + 1) for v in vars(value).values())
+    return 0
+
+
+def warm_clusters(hierarchy):
+    # 제공하는 군집 조합(clusters.CLUSTER_VARIANTS)을 레벨마다 미리 계산 (요청 안에서 처음 계산하지 않도록)
+    for level in hierarchy.levels.values():
+        for method, k in clusters.CLUSTER_VARIANTS:
+            level.clusters(method, k)
+
+
+class PartitionCache:
+    def __init__(self, max_bytes=PARTITION_MAX_BYTES, max_cities=PARTITION_MAX_CITIES):
+        self.max_bytes = max_bytes
+        self.max_cities = max_cities
+        self.resident = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading = {}  # key → 그 도시를 읽는 동안 잡는 lock (같은 도시를 두 번 읽지 않도록)
+        self.loads = {}
+        self.evictions = 0
+
+    def available(self):
+        keys = {DEFAULT_CITY}
+        if os.path.isdir(CITY_DATA_DIR):
+            keys.update(
+                name for name in os.listdir(CITY_DATA_DIR)
+                if _KEY.match(name) and os.path.exists(os.path.join(CITY_DATA_DIR, name, "final_df.csv"))
+            )
+        return sorted(keys)
+
+    def _check(self, key):
+        if key == DEFAULT_CITY:
+            return
+        if not _KEY.match(key) or not os.path.exists(os.path.join(CITY_DATA_DIR, key, "final_df.csv")):
+            raise dataset.DatasetLookupError(f"city 는 {', '.join(self.available())} 중 하나여야 합니다.")
+
+    def peek(self, key):
+        # 메모리에 있는 경우만 (백그라운드 작업이 파티션을 새로 읽지 않도록)
+        with self._lock:
+            return self.resident.get(key)
+
+    def get(self, key=None):
+        key = key or DEFAULT_CITY
+        with self._lock:
+            partition = self.resident.get(key)
+            if partition is not None:
+                self.resident.move_to_end(key)
+                partition.hits += 1
+                return partition
+            self._check(key)
+            loading = self._loading.setdefault(key, threading.Lock())
+
+        with loading:
+            with self._lock:
+                partition = self.resident.get(key)
+            if partition is None:
+                partition = Partition(key)
+                warm_clusters(partition.hierarchy)
+                with self._lock:
+                    self.resident[key] = partition
+                    self.loads[key] = self.loads.get(key, 0) + 1
+                    self._evict(keep=key)
+        partition.hits += 1
+        return partition
+
+    def _evict(self, keep):
+        # 오래 안 쓴 순서로 내리되 기본 도시와 방금 읽은 도시는 남김
+        sizes = {key: p.nbytes() for key, p in self.resident.items()}
+        for key in list(self.resident):
+            if sum(sizes.values()) <= self.max_bytes and len(self.resident) <= self.max_cities:
+                break
+            if key in (keep, DEFAULT_CITY):
+                continue
+            del self.resident[key]
+            del sizes[key]
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            partitions = list(self.resident.values())
+        return {
+            "resident": [
+                {
+                    "city": p.key,
+                    "name": p.city_name,
+                    "bytes": p.nbytes(),
+                    "rows": len(p.hierarchy.level(p.hierarchy.leaf)),
+                    "load_ms": p.load_ms,
+                    "hits": p.hits,
+                    "data_version": p.data_version,
+                }
+                for p in partitions
+            ],
+            "loads": dict(self.loads),
+            "evictions": self.evictions,
+            "max_bytes": self.max_bytes,
+            "max_cities": self.max_cities,
+        }
+
+
+cache = PartitionCache()
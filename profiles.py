@@ -0,0 +1,216 @@
+import json
+import threading
+import time
+
+
+# 저장된 가중치 프로필 (이름 → /recommend 파라미터 + 저장 시점에 계산해 둔 결과)
+#
+# 조회는 이름(primary key) 한 번 SELECT. 결과에는 계산할 때의 data_version 을 같이 저장하고,
+# 데이터가 바뀌면(버전 불일치) 요청마다 하나씩 다시 쓰지 않고 백그라운드 작업이 묶음으로 갱신한다.
+# 갱신 전 조회는 메모리에서 계산한 결과를 돌려주고 DB 에는 쓰지 않음.
+# DB 연결은 connect() 로 받으므로 로컬 MySQL(.env) 대신 테스트용 연결도 넣을 수 있음 (DictCursor 필요)
+# DB 에 닿지 않으면 ProfileUnavailable (라우트에서 503). 연결은 버리고 다음 요청에서 다시 연결
+# data_version 은 프로필마다 다를 수 있음 (도시별 파티션). 갱신은 메모리에 올라와 있는 도시의 프로필만
+
+TABLE = "weight_profiles"
+MAX_NAME_LENGTH = 64
+REFRESH_BATCH = 500
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS {TABLE} (
+    name VARCHAR({MAX_NAME_LENGTH}) NOT NULL PRIMARY KEY,
+    params TEXT NOT NULL,
+    result MEDIUMTEXT NOT NULL,
+    data_version VARCHAR(40) NOT NULL,
+    updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    KEY idx_data_version (data_version)
+) DEFAULT CHARSET=utf8mb4
+"""
+
+
+class ProfileError(ValueError):
+    pass
+
+
+class ProfileUnavailable(Exception):
+    pass
+
+
+class ProfileStore:
+    # compute(params) → 응답 body(dict).
+    # version(params, resident_only) → 그 프로필이 쓰는 데이터의 현재 버전 (resident_only 인데 메모리에 없으면 None)
+    def __init__(self, connect, compute, version):
+        self.connect = connect
+        self.compute = compute
+        self.version = version
+        self._conn = None
+        self._ready = False
+        self._lock = threading.Lock()
+
+        self._refresh_wanted = threading.Event()
+        self._refresher = None
+        self._stats = {
+            "saved": 0, "hits": 0, "stale_reads": 0, "misses": 0,
+            "refreshed": 0, "refresh_runs": 0, "refresh_errors": 0,
+            "last_refresh_ms": None, "db_errors": 0,
+        }
+
+    def _connection(self):
+        # 요청 스레드들은 연결 하나를 lock 으로 나눠 씀. 끊긴 연결은 ping 으로 다시 연결
+        if self._conn is None:
+            self._conn = self.connect()
+        else:
+            self._conn.ping(reconnect=True)
+        if not self._ready:
+            with self._conn.cursor() as cur:
+                cur.execute(SCHEMA)
+            self._conn.commit()
+            self._ready = True
+        return self._conn
+
+    def _db_error(self, e):
+        # 끊긴 연결은 버리고(다음 요청에서 새로 연결 + 테이블 확인) 503 용 예외로
+        self._conn = None
+        self._ready = False
+        self._stats["db_errors"] += 1
+        return ProfileUnavailable(f"프로필 저장소에 연결할 수 없습니다: {e}")
+
+    def _materialize(self, params):
+        body = self.compute(params)
+        return json.dumps(body, ensure_ascii=False, separators=(",", ":"))
+
+    def save(self, name, params):
+        if not name or len(name) > MAX_NAME_LENGTH:
+            raise ProfileError(f"name 은 1~{MAX_NAME_LENGTH}자여야 합니다.")
+        version = self.version(params)
+        result = self._materialize(params)  # 잘못된 파라미터는 여기서 예외 → 저장하지 않음
+        raw_params = json.dumps(params, ensure_ascii=False, sort_keys=True)
+
+        with self._lock:
+            try:
+                conn = self._connection()
+                with conn.cursor() as cur:
+                    cur.execute(
+                        f"INSERT INTO {TABLE} (name, params, result, data_version) VALUES (%s, %s, %s, %s) "
+                        "ON DUPLICATE KEY UPDATE params = VALUES(params), result = VALUES(result), "
+                        "data_version = VALUES(data_version)",
+                        (name, raw_params, result, version),
+                    )
+                conn.commit()
+            except Exception as e:
+                raise self._db_error(e) from e
+            self._stats["saved"] += 1
+        return json.loads(result)
+
+    def load(self, name):
+        # 이름으로 한 번 조회. 없으면 None
+        with self._lock:
+            try:
+                conn = self._connection()
+                with conn.cursor() as cur:
+                    cur.execute(f"SELECT params, result, data_version FROM {TABLE} WHERE name = %s", (name,))
+                    row = cur.fetchone()
+                conn.commit()
+            except Exception as e:
+                raise self._db_error(e) from e
+
+            if row is None:
+                self._stats["misses"] += 1
+                return None
+            params = json.loads(row["params"])
+            if row["data_version"] == self.version(params):
+                self._stats["hits"] += 1
+                return json.loads(row["result"])
+            self._stats["stale_reads"] += 1
+
+        # 이전 버전으로 계산된 결과: 이번 응답만 새로 계산하고, 저장은 백그라운드 갱신에 맡김.
+        # 새 데이터에서 계산할 수 없으면(없어진 parent 등) 백그라운드 갱신이 저장하는 것과 같은 {"error"}
+        self.schedule_refresh()
+        try:
+            return self.compute(params)
+        except (LookupError, ValueError) as e:
+            return {"error": str(e)}
+
+    def delete(self, name):
+        with self._lock:
+            try:
+                conn = self._connection()
+                with conn.cursor() as cur:
+                    deleted = cur.execute(f"DELETE FROM {TABLE} WHERE name = %s", (name,))
+                conn.commit()
+            except Exception as e:
+                raise self._db_error(e) from e
+        return bool(deleted)
+
+    # ---- 버전 변경 시 일괄 갱신 ----
+
+    def schedule_refresh(self):
+        # 이미 돌고 있으면 다음 한 번만 예약 (요청이 몰려도 작업은 하나)
+        self._refresh_wanted.set()
+        if self._refresher is None or not self._refresher.is_alive():
+            self._refresher = threading.Thread(target=self._refresh_loop, name="profile-refresh", daemon=True)
+            self._refresher.start()
+
+    def _refresh_loop(self):
+        while self._refresh_wanted.is_set():
+            self._refresh_wanted.clear()
+            try:
+                self.refresh_all()
+            except Exception:
+                self._stats["refresh_errors"] += 1
+
+    def refresh_all(self, batch=REFRESH_BATCH):
+        # 이름 순으로 batch 개씩 읽어 버전이 다른 행만 다시 계산하고 한 번에 UPDATE.
+        # 프로필마다 도시(버전)가 다르므로 WHERE data_version 대신 행별로 비교.
+        # 메모리에 없는 도시의 프로필은 건너뜀 (그 도시를 처음 조회할 때 load 에서 다시 계산)
+        # 요청 스레드와 lock 을 나눠 쓰지 않도록 별도 연결 사용
+        started = time.perf_counter()
+        refreshed = 0
+        last = ""
+        conn = self.connect()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(SCHEMA)
+            while True:
+                with conn.cursor() as cur:
+                    cur.execute(
+                        f"SELECT name, params, data_version FROM {TABLE} WHERE name > %s ORDER BY name LIMIT %s",
+                        (last, batch),
+                    )
+                    rows = cur.fetchall()
+                if not rows:
+                    break
+                last = rows[-1]["name"]
+
+                updates = []
+                for row in rows:
+                    params = json.loads(row["params"])
+                    version = self.version(params, resident_only=True)
+                    if version is None or version == row["data_version"]:
+                        continue
+                    try:
+                        result = self._materialize(params)
+                    except Exception as e:
+                        # 새 데이터에서 계산할 수 없는 프로필(없어진 parent 등)은 오류를 결과로 저장
+                        result = json.dumps({"error": str(e)}, ensure_ascii=False)
+                    updates.append((result, version, row["name"], row["params"]))
+
+                # 갱신하는 동안 사용자가 다시 저장한 프로필(params 변경)은 덮어쓰지 않음
+                if updates:
+                    with conn.cursor() as cur:
+                        cur.executemany(
+                            f"UPDATE {TABLE} SET result = %s, data_version = %s WHERE name = %s AND params = %s",
+                            updates,
+                        )
+                    conn.commit()
+                refreshed += len(updates)
+        finally:
+            conn.close()
+
+        self._stats["refreshed"] += refreshed
+        self._stats["refresh_runs"] += 1
+        self._stats["last_refresh_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return refreshed
+
+    def stats(self):
+        return dict(self._stats, refreshing=self._refresher is not None and self._refresher.is_alive())
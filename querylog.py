@@ -0,0 +1,268 @@
+import atexit
+import json
+import math
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+import pymysql
+
+from categories import PLAN
+
+
+# /recommend 질의 로그 (어떤 가중치 조합을 쓰는지 분석용)
+#
+# 요청 스레드는 메모리 큐에 넣기만 하고, 백그라운드 writer 가 QUERY_LOG_BATCH 행이 모이거나
+# QUERY_LOG_FLUSH_MS 가 지나면 한 번에 INSERT (pymysql executemany → 여러 행 INSERT 한 문장).
+# 큐가 가득 차거나 DB 쓰기가 실패하면 로컬 파일(spill)에 JSON 줄로 남기고, 다음 쓰기 성공 후 다시 넣는다.
+# 값 때문에 실패하는 행(DataError 등)은 한 행씩 다시 넣어 보고, 그래도 안 되면 quarantine 파일로 옮김
+# (spill 에 남기면 매번 같은 batch 를 실패시키므로). 프로세스 종료 시(atexit) 남은 큐를 비우고 종료
+
+TABLE = "recommend_queries"
+BATCH_ROWS = int(os.getenv("QUERY_LOG_BATCH", 200))
+FLUSH_MS = int(os.getenv("QUERY_LOG_FLUSH_MS", 1000))
+MAX_QUEUE = int(os.getenv("QUERY_LOG_QUEUE", 10000))
+SPILL_PATH = os.getenv("QUERY_LOG_SPILL", "query_log.spill.jsonl")
+SPILL_MAX_BYTES = int(os.getenv("QUERY_LOG_SPILL_MAX_BYTES", 50 * 1024 * 1024))
+QUARANTINE_PATH = os.getenv("QUERY_LOG_QUARANTINE", "query_log.quarantine.jsonl")
+
+LEVEL_MAX = 16
+PARENT_MAX = 64
+YEAR_RANGE = (-32768, 32767)  # SMALLINT
+NUM_MAX = 2 ** 31 - 1  # INT
+
+# 행 하나의 값 때문에 실패한 경우 (연결 / 서버 오류가 아님)
+ROW_ERRORS = (pymysql.err.DataError, pymysql.err.IntegrityError)
+
+COLUMNS = ["created_at", "level", "parent", "year", "num"] + PLAN.keys
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS {TABLE} (
+    id BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY,
+    created_at DATETIME(3) NOT NULL,
+    level VARCHAR({LEVEL_MAX}) NOT NULL,
+    parent VARCHAR({PARENT_MAX}) NULL,
+    year SMALLINT NULL,
+    num INT NOT NULL,
+    {", ".join(f"{key} DOUBLE NULL" for key in PLAN.keys)},
+    KEY idx_created_at (created_at)
+) DEFAULT CHARSET=utf8mb4
+"""
+
+INSERT = f"INSERT INTO {TABLE} ({', '.join(COLUMNS)}) VALUES ({', '.join(['%s'] * len(COLUMNS))})"
+
+
+def _year(value):
+    try:
+        year = int(value)
+    except (TypeError, ValueError):
+        return None
+    return year if YEAR_RANGE[0] <= year <= YEAR_RANGE[1] else None
+
+
+def _weight(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+class QueryLog:
+    def __init__(self, connect, batch_rows=BATCH_ROWS, flush_ms=FLUSH_MS,
+                 max_queue=MAX_QUEUE, spill_path=SPILL_PATH, quarantine_path=QUARANTINE_PATH):
+        self.connect = connect
+        self.batch_rows = batch_rows
+        self.flush_s = flush_ms / 1000
+        self.spill_path = spill_path
+        self.quarantine_path = quarantine_path
+        self.queue = queue.Queue(maxsize=max_queue)
+
+        self._conn = None
+        self._spill_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._writer = None
+        self._stats = {
+            "enqueued": 0, "written": 0, "batches": 0, "spilled": 0, "dropped": 0,
+            "replayed": 0, "quarantined": 0, "write_errors": 0,
+            "last_write_ms": None, "avg_write_ms": None, "max_write_ms": 0.0,
+        }
+
+    def start(self):
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._run, name="query-log", daemon=True)
+            self._writer.start()
+            atexit.register(self.close)
+        return self
+
+    def log(self, level, parent, year, num, weights):
+        # weights: 카테고리 key → 가중치 (입력하지 않은 카테고리는 NULL).
+        # 열 크기 / 범위를 넘는 값은 여기서 자르거나 NULL 로 (한 행 때문에 batch 가 실패하지 않도록)
+        row = [
+            datetime.now().isoformat(sep=" ", timespec="milliseconds"),
+            str(level)[:LEVEL_MAX],
+            None if parent is None else str(parent)[:PARENT_MAX],
+            _year(year),
+            min(max(int(num), 0), NUM_MAX),
+        ] + [_weight(weights.get(key)) for key in PLAN.keys]
+        try:
+            self.queue.put_nowait(row)
+            self._stats["enqueued"] += 1
+        except queue.Full:
+            # 응답을 막지 않도록 기다리지 않고 디스크로
+            self._spill([row])
+
+    # ---- writer ----
+
+    def _run(self):
+        while not self._stop.is_set():
+            batch = self._collect()
+            if batch:
+                self._write(batch)
+        # 종료: 남은 행을 모두 쓰기
+        while True:
+            batch = self._drain(self.batch_rows)
+            if not batch:
+                break
+            self._write(batch)
+
+    def _collect(self):
+        # 첫 행을 기다린 뒤 batch_rows 가 차거나 flush 시간이 지날 때까지 모음
+        try:
+            batch = [self.queue.get(timeout=self.flush_s)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_s
+        while len(batch) < self.batch_rows and not self._stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _drain(self, limit):
+        batch = []
+        while len(batch) < limit:
+            try:
+                batch.append(self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _insert(self, rows):
+        if self._conn is None:
+            self._conn = self.connect()
+            with self._conn.cursor() as cur:
+                cur.execute(SCHEMA)
+        else:
+            self._conn.ping(reconnect=True)
+        with self._conn.cursor() as cur:
+            cur.executemany(INSERT, rows)
+        self._conn.commit()
+
+    def _insert_rows(self, rows):
+        # 쓴 행 수. 값 오류면 한 행씩 다시 넣고 실패한 행은 quarantine,
+        # 연결 / 서버 오류면 아직 못 쓴 행을 spill 하고 None
+        try:
+            self._insert(rows)
+            return len(rows)
+        except ROW_ERRORS:
+            self._stats["write_errors"] += 1
+            self._conn = None
+        except Exception:
+            self._stats["write_errors"] += 1
+            self._conn = None
+            self._spill(rows)
+            return None
+
+        written = 0
+        for i, row in enumerate(rows):
+            try:
+                self._insert([row])
+                written += 1
+            except ROW_ERRORS:
+                self._conn = None
+                self._quarantine(row)
+            except Exception:
+                self._stats["write_errors"] += 1
+                self._conn = None
+                self._spill(rows[i:])
+                return None
+        return written
+
+    def _write(self, batch):
+        started = time.perf_counter()
+        written = self._insert_rows(batch)
+        if written is None:
+            return
+
+        elapsed = (time.perf_counter() - started) * 1000
+        stats = self._stats
+        stats["written"] += written
+        stats["batches"] += 1
+        stats["last_write_ms"] = round(elapsed, 2)
+        stats["max_write_ms"] = round(max(stats["max_write_ms"], elapsed), 2)
+        avg = stats["avg_write_ms"]
+        stats["avg_write_ms"] = round(elapsed if avg is None else 0.9 * avg + 0.1 * elapsed, 2)
+
+        if not self._stop.is_set():
+            self._replay()
+
+    # ---- spill ----
+
+    def _spill(self, rows):
+        with self._spill_lock:
+            try:
+                size = os.path.getsize(self.spill_path) if os.path.exists(self.spill_path) else 0
+                if size >= SPILL_MAX_BYTES:
+                    raise OSError("spill file is full")
+                with open(self.spill_path, "a", encoding="utf-8") as f:
+                    for row in rows:
+                        f.write(json.dumps(row, ensure_ascii=False) + "\n")
+                self._stats["spilled"] += len(rows)
+            except OSError:
+                self._stats["dropped"] += len(rows)
+
+    def _quarantine(self, row):
+        # 다시 넣어도 계속 실패할 행: 확인용으로 따로 남기고 다시 시도하지 않음
+        with self._spill_lock:
+            try:
+                with open(self.quarantine_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(row, ensure_ascii=False) + "\n")
+                self._stats["quarantined"] += 1
+            except OSError:
+                self._stats["dropped"] += 1
+
+    def _replay(self):
+        # DB 가 다시 살아나면 spill 파일을 옮겨서 batch 단위로 다시 INSERT
+        # (연결 오류면 남은 행은 다시 spill, 값 오류인 행은 quarantine)
+        with self._spill_lock:
+            if not os.path.exists(self.spill_path):
+                return
+            replay_path = self.spill_path + ".replay"
+            os.replace(self.spill_path, replay_path)
+
+        with open(replay_path, encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+        os.remove(replay_path)
+
+        for start in range(0, len(rows), self.batch_rows):
+            chunk = rows[start:start + self.batch_rows]
+            written = self._insert_rows(chunk)
+            if written is None:
+                self._spill(rows[start + len(chunk):])
+                return
+            self._stats["replayed"] += written
+
+    def close(self, timeout=5.0):
+        self._stop.set()
+        if self._writer is not None:
+            self._writer.join(timeout)
+
+    def stats(self):
+        return dict(self._stats, queue_depth=self.queue.qsize(), queue_max=self.queue.maxsize)
@@ -0,0 +1,196 @@
+import argparse
+import gzip
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urlencode
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성: 없으면 .br 파일은 만들지 않음
+    brotli = None
+
+import partitions
+import views
+from categories import PLAN
+from dataset import LEVELS
+from http_cache import etag_for
+
+
+# 읽기 전용 응답을 정적 JSON 파일로 미리 만들어 두기 (CDN / 프론트엔드가 Flask 를 거치지 않고 읽음)
+#
+#   python snapshot.py --out snapshots [--city busan] [--workers 4]
+#
+# 파라미터가 없거나 경우의 수가 적은 라우트(*-priority, /district-top5 모든 mode / 카테고리,
+# 모든 지역의 /district-summary, /district-features)의 응답 body 를 라우트와 같은 views.py 함수로 만들어
+# 저장한다 (gzip, brotli 가 설치되어 있으면 .br 도). app 은 import 하지 않으므로 CSV 만 있으면 되고
+# DB 연결 / 백그라운드 스레드 없이 동작 (batch_score.py 와 같음). ETag 는 http_cache 와 같은 값
+#   <out>/<data_version>/manifest.json : 요청 key(경로?정렬된 쿼리) → 파일, ETag, 크기
+#   <out>/manifest.json                : data_version → 도시 / 생성 시각 / 파일 수, 도시별 현재 버전
+# 같은 data_version 의 스냅샷이 이미 있으면 다시 만들지 않음 (--force 로 강제)
+
+SNAPSHOT_DIR = "snapshots"
+
+_city = None
+
+
+def _init(city):
+    # worker 마다 한 번: 도시 파티션 (fork 면 부모에서 읽은 것을 그대로 사용)
+    global _city
+    _city = city
+    partitions.cache.get(city)
+
+
+def request_key(path, params):
+    # warmup.request_key / http_cache.make_etag 와 같은 정규화
+    query = urlencode(sorted(params.items()))
+    return f"{path}?{query}" if query else path
+
+
+def snapshot_requests(partition, city=None):
+    # (경로, 쿼리 파라미터) 목록
+    extra = {"city": city} if city else {}
+    requests = [(route, extra) for route in views.PRIORITY_ROUTES]
+    for level in LEVELS:
+        if level not in partition.hierarchy.levels:
+            continue
+        params = dict(extra) if level == "district" else dict(extra, level=level)
+        for mode in ("friendly", "unfriendly"):
+            requests.append(("/district-top5", dict(params, mode=mode)))
+        for cat in PLAN.categories:
+            requests.append(("/district-top5", dict(params, mode="category", category=cat.ko)))
+        for name in partition.hierarchy.level(level).names:
+            requests.append(("/district-summary", dict(params, name=str(name))))
+            requests.append(("/district-features", dict(params, name=str(name))))
+    return requests
+
+
+def response_body(partition, path, params):
+    # 해당 라우트가 만드는 것과 같은 body (파라미터 없는 기본 응답)
+    if path in views.PRIORITY_ROUTES:
+        return views.priority_body(partition.hierarchy, path)
+    level = params.get("level", "district")
+    hierarchy = partition.hierarchy
+    if path == "/district-top5":
+        return views.top5_body(hierarchy.table(level), params["mode"], params.get("category"))
+    table = hierarchy.level(level)
+    pos = table.positions[params["name"]]
+    if path == "/district-summary":
+        return views.summary_body(table, pos)
+    return views.features_body(hierarchy, level, pos)
+
+
+def file_name(key):
+    # /district-summary?level=dong&name=... → district-summary/level=dong&name=%EA%B0%95....json
+    path, _, query = key.partition("?")
+    return f"{path.strip('/')}/{query}.json" if query else f"{path.strip('/')}.json"
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def render(requests, root):
+    # 프로세스 하나가 맡은 요청들을 렌더링해서 파일로 쓰고 manifest 항목을 돌려줌
+    partition = partitions.cache.get(_city)
+    entries, failed = {}, {}
+    for path, params in requests:
+        key = request_key(path, params)
+        try:
+            body = json.dumps(response_body(partition, path, params), ensure_ascii=False).encode("utf-8")
+        except Exception as e:
+            failed[key] = str(e)
+            continue
+        name = file_name(key)
+        _write(os.path.join(root, name), body)
+        query = urlencode(sorted(params.items()))
+        entry = {"file": name, "etag": f'"{etag_for(partition.data_version, path, query)}"', "bytes": len(body)}
+
+        # mtime=0: 같은 body 면 같은 .gz (CDN 캐시 / 배포 diff 가 흔들리지 않도록)
+        compressed = gzip.compress(body, compresslevel=9, mtime=0)
+        _write(os.path.join(root, name + ".gz"), compressed)
+        entry["gzip"] = len(compressed)
+        if brotli is not None:
+            compressed = brotli.compress(body)
+            _write(os.path.join(root, name + ".br"), compressed)
+            entry["br"] = len(compressed)
+        entries[key] = entry
+    return entries, failed
+
+
+def build(out=SNAPSHOT_DIR, city=None, workers=None, force=False):
+    started = time.perf_counter()
+    partition = partitions.cache.get(city)
+    _init(partition.key)
+    city = None if partition.key == partitions.DEFAULT_CITY else partition.key
+    version = partition.data_version
+    root = os.path.join(out, version)
+
+    if not force and os.path.exists(os.path.join(root, "manifest.json")):
+        print(f"{version}: 이미 있음 ({root})")
+        return root
+
+    requests = snapshot_requests(partition, city)
+
+    workers = max(1, min(workers or os.cpu_count() or 1, len(requests)))
+    entries, failed = {}, {}
+    if workers == 1:
+        entries, failed = render(requests, root)
+    else:
+        # 부모에서 읽은 데이터를 그대로 쓰도록 가능하면 fork (spawn 이면 worker 마다 CSV 를 다시 읽음).
+        # 이 프로세스는 스레드를 띄우지 않으므로 fork 해도 잡힌 lock 이 복사되지 않음
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        chunks = [requests[i::workers * 4] for i in range(workers * 4)]
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                 initializer=_init, initargs=(partition.key,)) as pool:
+            for done, errors in pool.map(render, chunks, [root] * len(chunks)):
+                entries.update(done)
+                failed.update(errors)
+
+    generated_at = datetime.now(timezone.utc).replace(microsecond=0).isoformat()
+    manifest = {
+        "data_version": version,
+        "city": partition.key,
+        "generated_at": generated_at,
+        "files": dict(sorted(entries.items())),
+        "failed": failed,
+    }
+    _write(os.path.join(root, "manifest.json"), json.dumps(manifest, ensure_ascii=False, indent=1).encode("utf-8"))
+
+    # 최상위 manifest: 도시별 현재 버전 + 버전별 요약 (이전 버전 디렉터리는 지우지 않음)
+    index_path = os.path.join(out, "manifest.json")
+    index = {"current": {}, "versions": {}}
+    if os.path.exists(index_path):
+        with open(index_path, encoding="utf-8") as f:
+            index = json.load(f)
+    index["current"][partition.key] = version
+    index["versions"][version] = {
+        "city": partition.key,
+        "generated_at": generated_at,
+        "manifest": f"{version}/manifest.json",
+        "files": len(entries),
+    }
+    _write(index_path, json.dumps(index, ensure_ascii=False, indent=1).encode("utf-8"))
+
+    elapsed = time.perf_counter() - started
+    print(f"{version}: {len(entries)}개 파일, 실패 {len(failed)}개, {workers} 프로세스, {elapsed:.1f}s → {root}")
+    return root
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="읽기 전용 라우트의 정적 JSON 스냅샷 생성")
+    parser.add_argument("--out", default=SNAPSHOT_DIR)
+    parser.add_argument("--city", default=None, help="기본값: DEFAULT_CITY")
+    parser.add_argument("--workers", type=int, default=None, help="기본값: CPU 코어 수")
+    parser.add_argument("--force", action="store_true", help="같은 data_version 의 스냅샷이 있어도 다시 생성")
+    args = parser.parse_args()
+
+    build(args.out, args.city, args.workers, args.force)
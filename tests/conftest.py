@@ -0,0 +1,107 @@
+import os
+import shutil
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TMP = tempfile.mkdtemp(prefix="senior_city_tests_")
+
+# app 을 import 하기 전에: 저장소에 파일을 남기지 않도록 쓰는 경로는 임시 디렉터리로, DB 는 sqlite 대역으로
+os.environ.update({
+    "MYSQLPORT": "3306",
+    "ADMIN_TOKEN": "test-token",
+    "ADMIN_PATCH_LOG": os.path.join(TMP, "admin_patches.jsonl"),
+    "QUERY_LOG_SPILL": os.path.join(TMP, "query_log.spill.jsonl"),
+    "QUERY_LOG_QUARANTINE": os.path.join(TMP, "query_log.quarantine.jsonl"),
+    "WARM_KEYS_PATH": os.path.join(TMP, "warm_keys.json"),
+    "DONG_DATA_PATH": os.path.join(TMP, "final_dong_df.csv"),
+    "CITY_DATA_DIR": os.path.join(TMP, "cities"),
+})
+os.chdir(ROOT)
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pymysql  # noqa: E402
+
+import fakedb  # noqa: E402
+from categories import INDICATOR_COLUMNS  # noqa: E402
+
+FAKE_DB = fakedb.FakeDB()
+pymysql.connect = FAKE_DB.connect
+
+
+@pytest.fixture(scope="session")
+def appmod():
+    import app
+    return app
+
+
+@pytest.fixture
+def client(appmod):
+    return appmod.app.test_client()
+
+
+@pytest.fixture
+def fake_db():
+    FAKE_DB.down = False
+    yield FAKE_DB
+    FAKE_DB.down = False
+
+
+@pytest.fixture
+def restore_partition(appmod):
+    # 관리자 수정 등으로 바뀐 기본 도시 상태를 테스트 후 되돌림
+    p = appmod.partitions.cache.get()
+    saved = {name: getattr(p, name) for name in (
+        "hierarchy", "raw_state", "data_version", "loaded_at", "column_revision", "column_modified"
+    )}
+    saved["column_revision"] = list(saved["column_revision"])
+    saved["column_modified"] = list(saved["column_modified"])
+    yield p
+    for name, value in saved.items():
+        setattr(p, name, value)
+    if os.path.exists(p.patch_log):
+        os.remove(p.patch_log)
+
+
+@pytest.fixture
+def make_city(appmod):
+    # CITY_DATA_DIR/<key>/ 에 도시 데이터를 만들고, 테스트 후 지우고 캐시에서도 내림
+    made = []
+
+    def make(key, frame=None, dong=None):
+        root = os.path.join(appmod.partitions.CITY_DATA_DIR, key)
+        os.makedirs(root, exist_ok=True)
+        if frame is None:
+            frame = pd.read_csv(os.path.join(ROOT, "final_df.csv"), encoding="utf-8")
+        frame.to_csv(os.path.join(root, "final_df.csv"), index=False, encoding="utf-8")
+        if dong is not None:
+            dong.to_csv(os.path.join(root, "final_dong_df.csv"), index=False, encoding="utf-8")
+        made.append(key)
+        return root
+
+    yield make
+    cache = appmod.partitions.cache
+    for key in made:
+        with cache._lock:
+            cache.resident.pop(key, None)
+        shutil.rmtree(os.path.join(appmod.partitions.CITY_DATA_DIR, key), ignore_errors=True)
+
+
+@pytest.fixture
+def dong_city(make_city):
+    # 자치구마다 행정동 두 개: 하나는 final_df.csv 값, 하나는 임의 값 (인구도 다름).
+    # 자치구 레벨 값은 인구 가중 평균이라 final_df.csv 행과 달라짐
+    frame = pd.read_csv("final_df.csv", encoding="utf-8")
+    rng = np.random.default_rng(0)
+    rows = []
+    for _, row in frame.iterrows():
+        rows.append(dict(row[INDICATOR_COLUMNS], district=row["district"], dong="가동", population=1000))
+        rows.append(dict(zip(INDICATOR_COLUMNS, rng.random(len(INDICATOR_COLUMNS))),
+                         district=row["district"], dong="나동", population=int(rng.integers(500, 5000))))
+    make_city("dongtown", frame, pd.DataFrame(rows))
+    return frame
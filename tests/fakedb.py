@@ -0,0 +1,98 @@
+import re
+import sqlite3
+import threading
+
+import pymysql
+
+
+# 테스트용 MySQL 대역: pymysql DictCursor 연결과 같은 모양으로 sqlite(메모리)에 씀
+#
+# 이 저장소가 쓰는 SQL 만 옮김 (CREATE TABLE 의 MySQL 전용 구문 제거, %s → ?,
+# ON DUPLICATE KEY UPDATE → ON CONFLICT). down = True 면 연결 / 실행이 OperationalError
+
+
+class FakeDB:
+    def __init__(self):
+        self.db = sqlite3.connect(":memory:", check_same_thread=False)
+        self.lock = threading.Lock()
+        self.down = False
+        self.connects = 0
+
+    def connect(self, **kwargs):
+        self._check()
+        self.connects += 1
+        return Connection(self)
+
+    def _check(self):
+        if self.down:
+            raise pymysql.err.OperationalError(2003, "Can't connect to MySQL server (fake)")
+
+    def rows(self, sql, args=()):
+        with self.lock:
+            cur = self.db.execute(sql, args)
+            columns = [d[0] for d in cur.description]
+            return [dict(zip(columns, row)) for row in cur.fetchall()]
+
+
+def translate(sql):
+    sql = sql.replace("%s", "?")
+    if "CREATE TABLE" in sql:
+        sql = re.sub(r"BIGINT NOT NULL AUTO_INCREMENT PRIMARY KEY", "INTEGER PRIMARY KEY", sql)
+        sql = re.sub(r",\s*KEY \w+ \([^)]*\)", "", sql)
+        sql = re.sub(r"ON UPDATE CURRENT_TIMESTAMP|DEFAULT CHARSET=\w+", "", sql)
+    match = re.search(r"INSERT INTO \w+ \((\w+).*ON DUPLICATE KEY UPDATE", sql, re.S)
+    if match:
+        sql = sql.replace("ON DUPLICATE KEY UPDATE", f"ON CONFLICT({match.group(1)}) DO UPDATE SET")
+        sql = re.sub(r"VALUES\((\w+)\)", r"excluded.\1", sql)
+    return sql
+
+
+class Cursor:
+    def __init__(self, fake):
+        self.fake = fake
+        self.cur = fake.db.cursor()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, args=()):
+        self.fake._check()
+        with self.fake.lock:
+            self.cur.execute(translate(sql), tuple(args))
+            return self.cur.rowcount
+
+    def executemany(self, sql, rows):
+        self.fake._check()
+        with self.fake.lock:
+            self.cur.executemany(translate(sql), [tuple(row) for row in rows])
+            return self.cur.rowcount
+
+    def fetchone(self):
+        row = self.cur.fetchone()
+        return None if row is None else dict(zip([d[0] for d in self.cur.description], row))
+
+    def fetchall(self):
+        columns = [d[0] for d in self.cur.description]
+        return [dict(zip(columns, row)) for row in self.cur.fetchall()]
+
+
+class Connection:
+    def __init__(self, fake):
+        self.fake = fake
+
+    def cursor(self):
+        return Cursor(self.fake)
+
+    def commit(self):
+        self.fake._check()
+        with self.fake.lock:
+            self.fake.db.commit()
+
+    def ping(self, reconnect=True):
+        self.fake._check()
+
+    def close(self):
+        pass
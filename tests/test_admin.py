@@ -0,0 +1,66 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import admin
+import dataset
+from categories import INDICATOR_COLUMNS
+
+AUTH = {"Authorization": "Bearer test-token"}
+
+
+def _warm(hierarchy):
+    for table in hierarchy.levels.values():
+        table.loo_means()
+        table.ranks()
+        table.topk_index()
+        table.mcdm()
+
+
+def _assert_same(a, b):
+    np.testing.assert_array_equal(a.adjusted, b.adjusted)
+    np.testing.assert_array_equal(a.scores, b.scores)
+    np.testing.assert_array_equal(a.loo_means(), b.loo_means())
+    for x, y in zip(a.ranks(), b.ranks()):
+        np.testing.assert_array_equal(x, y)
+    np.testing.assert_array_equal(a.topk_index().values, b.topk_index().values)
+    np.testing.assert_array_equal(a.topk_index().order, b.topk_index().order)
+    for name in ("ideal_sq", "anti_sq", "gap"):
+        np.testing.assert_array_equal(getattr(a.mcdm(), name), getattr(b.mcdm(), name))
+
+
+def test_incremental_patch_matches_rebuild():
+    # 바뀐 열만 다시 계산한 계층 == 수정된 원본 값으로 처음부터 만든 계층 (모든 레벨, 모든 파생 데이터)
+    hierarchy = dataset.load_hierarchy(pd.read_csv("final_df.csv", encoding="utf-8"), "missing.csv")
+    state, _ = admin.load_raw_state(hierarchy, None)
+    _warm(hierarchy)
+
+    # 범위 안의 값(그 칸만 정규화)과 범위 밖의 값(열 전체 다시 정규화)
+    for pos, changes in [(3, {0: 0.25, 5: 0.9}), (10, {2: 1.7}), (0, {7: -0.5, 8: 0.1})]:
+        state, updates, _ = state.apply(pos, changes)
+        hierarchy = hierarchy.replace_columns(updates)
+        rebuilt = admin.rebuild(hierarchy, state)
+        _warm(rebuilt)
+        for level in hierarchy.levels:
+            _assert_same(hierarchy.level(level), rebuilt.level(level))
+
+
+def test_patch_requires_exact_name(client, restore_partition):
+    # 접두어 / 별칭으로 추측해서 수정하지 않음 (404, 데이터 / 수정 기록 그대로)
+    p = restore_partition
+    version = p.data_version
+    body = {"values": {INDICATOR_COLUMNS[0]: 0.5}}
+    response = client.patch("/admin/districts/노", json=body, headers=AUTH)
+    assert response.status_code == 404
+    assert p.data_version == version
+    assert not os.path.exists(p.patch_log)
+
+    response = client.patch("/admin/districts/노원구", json=body, headers=AUTH)
+    assert response.status_code == 200
+    assert response.get_json()["district"] == "노원구"
+
+
+def test_patch_rejects_bad_token(client):
+    response = client.patch("/admin/districts/노원구", json={"values": {INDICATOR_COLUMNS[0]: 0.5}})
+    assert response.status_code == 401
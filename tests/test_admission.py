@@ -0,0 +1,159 @@
+import threading
+import time
+
+import pytest
+from flask import Flask
+
+import admission
+
+
+def hold(lane):
+    # 다른 스레드에서 차선 자리를 하나 차지하고, release 를 호출하면 놓음
+    acquired, release = threading.Event(), threading.Event()
+
+    def run():
+        lane.acquire()
+        acquired.set()
+        release.wait(5)
+        lane.release(0.001)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    assert acquired.wait(5)
+    return release, thread
+
+
+def wait_in_queue(lane, outcome):
+    def run():
+        try:
+            lane.acquire()
+            outcome.append("admitted")
+            lane.release(0.001)
+        except admission.Shed as e:
+            outcome.append(e.reason)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while lane.waiting == 0 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    return thread
+
+
+def test_queue_full_is_shed_immediately():
+    lane = admission.Lane("t", concurrency=1, queue=1, deadline=5.0)
+    release, holder = hold(lane)
+    outcome = []
+    waiter = wait_in_queue(lane, outcome)
+
+    started = time.monotonic()
+    with pytest.raises(admission.Shed) as e:
+        lane.acquire()
+    assert e.value.reason == "queue_full"
+    assert e.value.retry_after >= 1
+    assert time.monotonic() - started < 0.5  # 기다리지 않음
+
+    # 앞선 요청이 끝나면 대기 중이던 요청이 들어감
+    release.set()
+    holder.join(5)
+    waiter.join(5)
+    assert outcome == ["admitted"]
+    assert lane.stats()["shed"]["queue_full"] == 1
+
+
+def test_expected_wait_over_deadline_is_shed():
+    lane = admission.Lane("t", concurrency=1, queue=10, deadline=0.5)
+    lane.avg_service = 2.0  # 앞 요청 하나만 기다려도 deadline 초과
+    release, holder = hold(lane)
+    with pytest.raises(admission.Shed) as e:
+        lane.acquire()
+    assert e.value.reason == "deadline"
+    assert e.value.retry_after >= 2
+    release.set()
+    holder.join(5)
+
+
+def test_waiter_times_out_at_deadline():
+    lane = admission.Lane("t", concurrency=1, queue=10, deadline=0.2)
+    lane.avg_service = 0.001
+    release, holder = hold(lane)
+    outcome = []
+    started = time.monotonic()
+    wait_in_queue(lane, outcome).join(5)
+    elapsed = time.monotonic() - started
+    assert outcome == ["timeout"]
+    assert 0.15 <= elapsed < 2.0
+    assert lane.waiting == 0 and lane.active == 1
+    release.set()
+    holder.join(5)
+    assert lane.active == 0
+
+
+@pytest.fixture
+def lanes_app(monkeypatch):
+    # 차선 두 개(동시 1 / 대기열 1)짜리 작은 앱. slow 는 gate 가 열릴 때까지 붙잡고 있음
+    monkeypatch.setitem(admission.ROUTE_LIMITS, "test-slow", {"concurrency": 1, "queue": 1, "deadline": 5.0})
+    monkeypatch.setitem(admission.ROUTE_LIMITS, "test-other", {"concurrency": 1, "queue": 1, "deadline": 5.0})
+    monkeypatch.setattr(admission, "_lanes", {})
+    gate = threading.Event()
+    app = Flask("admission-test")
+
+    @app.route("/slow")
+    @admission.limit("test-slow")
+    def slow():
+        gate.wait(5)
+        return "slow"
+
+    @app.route("/other")
+    @admission.limit("test-other")
+    def other():
+        return "other"
+
+    yield app, gate
+    gate.set()
+
+
+def test_route_sheds_with_503_and_retry_after(lanes_app):
+    app, gate = lanes_app
+    lane = admission.get_lane("test-slow")
+    results = []
+
+    def call():
+        results.append(app.test_client().get("/slow").status_code)
+
+    threads = [threading.Thread(target=call, daemon=True) for _ in range(2)]
+    threads[0].start()
+    while lane.active == 0:
+        time.sleep(0.001)
+    threads[1].start()
+    while lane.waiting == 0:
+        time.sleep(0.001)
+
+    response = app.test_client().get("/slow")
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) >= 1
+    assert response.get_json()["reason"] == "queue_full"
+
+    gate.set()
+    for t in threads:
+        t.join(5)
+    assert results == [200, 200]
+
+
+def test_full_lane_does_not_starve_another(lanes_app):
+    app, gate = lanes_app
+    lane = admission.get_lane("test-slow")
+    thread = threading.Thread(target=lambda: app.test_client().get("/slow"), daemon=True)
+    thread.start()
+    while lane.active == 0:
+        time.sleep(0.001)
+
+    # slow 차선이 꽉 차 있어도 다른 차선은 바로 처리
+    started = time.monotonic()
+    for _ in range(20):
+        assert app.test_client().get("/other").status_code == 200
+    assert time.monotonic() - started < 1.0
+    assert admission.get_lane("test-other").stats()["shed_total"] == 0
+
+    gate.set()
+    thread.join(5)
@@ -0,0 +1,41 @@
+import pytest
+
+from names import NameIndex, fold
+
+
+def test_prefix_and_limit(client):
+    body = client.get("/autocomplete?q=강&limit=2").get_json()
+    assert len(body["suggestions"]) == 2
+    assert all(name.startswith("강") for name in body["suggestions"])
+
+
+def test_limit_is_capped(client, appmod, monkeypatch):
+    # ㄱ 로 시작하는 자치구는 8 개 (강남구, 강동구, ... 금천구) → 상한 3 에서 잘림
+    assert len(client.get("/autocomplete?q=ㄱ&limit=10").get_json()["suggestions"]) == 8
+    monkeypatch.setattr(appmod, "AUTOCOMPLETE_LIMIT", 3)
+    body = client.get("/autocomplete?q=ㄱ&limit=10").get_json()
+    assert len(body["suggestions"]) == 3
+
+
+@pytest.mark.parametrize("limit", ["abc", "0", "-1", ""])
+def test_bad_limit(client, limit):
+    response = client.get(f"/autocomplete?q=강&limit={limit}")
+    assert response.status_code == 400
+    assert "limit" in response.get_json()["error"]
+
+
+NAMES = [f"가나{i}동" for i in range(300)] + ["가나동", "가구", "나가동"]
+
+
+@pytest.mark.parametrize("query, limit", [("가", 20), ("가나", 5), ("가나1", 7), ("가구", 3), ("나", 10), ("ga", 4)])
+def test_suggest_stops_at_limit(query, limit):
+    index = NameIndex(NAMES)
+    got = index.suggest(query, limit)
+    # 정확 일치 → 접두어 순서를 다 합쳐 중복을 뺀 목록의 앞부분과 같음
+    expected = list(dict.fromkeys(list(index.exact.get(fold(query), [])) + list(index.prefix(query))))
+    assert got == expected[:limit]
+    assert len(got) == min(limit, len(expected))
+
+
+def test_suggest_without_limit_room():
+    assert NameIndex(NAMES).suggest("가", 0) == []
@@ -0,0 +1,75 @@
+import json
+from urllib.parse import urlencode
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import batch_score
+from categories import PLAN
+from partitions import DEFAULT_CITY
+
+
+def random_profiles(rng, n):
+    # 대부분 몇 개 카테고리만 (정수 가중치 → 동점 많음), 일부는 음수 / 소수 / 전체 / 빈 프로필
+    weights = np.zeros((n, len(PLAN.keys)))
+    for b in range(n):
+        r = rng.random()
+        if r < 0.02:
+            continue
+        count = len(PLAN.keys) if r < 0.1 else int(rng.integers(1, 4))
+        cats = rng.choice(len(PLAN.keys), count, replace=False)
+        weights[b, cats] = rng.choice([1, 2, 3, 5, -1, 0.5, 1.7], count)
+    selected = (weights != 0).any(axis=1)
+    return weights, selected
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    # worker 전역(_table / _method)을 테스트 후 되돌림
+    monkeypatch.setattr(batch_score, "_table", None)
+    monkeypatch.setattr(batch_score, "_method", None)
+
+    def init(method, level="district", parent=None):
+        batch_score._init(DEFAULT_CITY, level, parent, method)
+        return batch_score._table
+    return init
+
+
+@pytest.mark.parametrize("method", ["sum", "topsis", "vikor"])
+def test_matches_recommend_top(appmod, worker, method):
+    table = worker(method)
+    weights, selected = random_profiles(np.random.default_rng(0), 3000)
+    results = batch_score.score_chunk(weights, selected, 5)
+
+    for b, result in enumerate(results):
+        if not selected[b]:
+            assert result == "가중치 입력이 필요합니다."
+            continue
+        try:
+            expected = appmod.recommend_top(table, weights[b], 5, method)
+        except ValueError as e:
+            assert result == str(e)
+            continue
+        assert [(r["district"], r["score"]) for r in expected] == result
+
+
+def test_run_matches_recommend_route(client, tmp_path):
+    weights, _ = random_profiles(np.random.default_rng(1), 40)
+    frame = pd.DataFrame(weights, columns=PLAN.keys).replace(0, np.nan)
+    frame.insert(0, "id", [f"p{b}" for b in range(len(frame))])
+    src, out = tmp_path / "profiles.csv", tmp_path / "ranked.jsonl"
+    frame.to_csv(src, index=False)
+
+    batch_score.run(str(src), str(out), num=5, workers=1, chunk_rows=7)
+
+    lines = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert [line["id"] for line in lines] == list(frame["id"])
+    for line, (_, row) in zip(lines, frame.iterrows()):
+        params = {key: row[key] for key in PLAN.keys if not np.isnan(row[key])}
+        response = client.get("/recommend?" + urlencode(dict(params, num=5)))
+        if not params:
+            assert response.status_code == 400
+            assert line["error"] == response.get_json()["error"]
+        else:
+            assert line["result"] == response.get_json()["result"]
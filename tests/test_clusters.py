@@ -0,0 +1,153 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import clusters
+from categories import PLAN
+
+
+def blobs(rng, sizes, spread=0.02):
+    # 서로 멀리 떨어진 군집 (C 차원). 정답 라벨과 함께
+    centers = rng.random((len(sizes), len(PLAN.categories))) * 10
+    x = np.concatenate([c + rng.normal(0, spread, (n, len(c))) for c, n in zip(centers, sizes)])
+    truth = np.repeat(np.arange(len(sizes)), sizes)
+    return x, truth
+
+
+def same_partition(labels, truth):
+    # 번호와 상관없이 같은 묶음인지
+    pairs = set(zip(labels.tolist(), truth.tolist()))
+    return len(pairs) == len(set(labels.tolist())) == len(set(truth.tolist()))
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_kmeans_separates_blobs(seed):
+    x, truth = blobs(np.random.default_rng(seed), [30, 12, 50, 7])
+    labels, centers = clusters.kmeans(x, 4, seed)
+    assert same_partition(labels, truth)
+    assert centers.shape == (4, x.shape[1])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_ward_separates_blobs(seed):
+    x, truth = blobs(np.random.default_rng(seed), [20, 5, 33])
+    assert same_partition(clusters.ward(x, 3), truth)
+
+
+def test_hierarchical_micro_clusters_separate_blobs(monkeypatch):
+    # 행이 CLUSTER_HIER_MAX 를 넘는 경우 (소군집 → Ward) 경로
+    monkeypatch.setattr(clusters, "CLUSTER_HIER_MAX", 40)
+    x, truth = blobs(np.random.default_rng(1), [400, 150, 250])
+    result = clusters.Clustering(x, "hierarchical", 3)
+    assert same_partition(result.labels, truth)
+    # 군집 번호는 크기 순
+    assert result.sizes.tolist() == [400, 250, 150]
+
+
+def brute_silhouette(x, labels):
+    out = []
+    for i in range(len(x)):
+        d = np.sqrt(((x - x[i]) ** 2).sum(axis=1))
+        same = (labels == labels[i])
+        same[i] = False
+        if not same.any():
+            out.append(0.0)
+            continue
+        a = d[same].mean()
+        b = min(d[labels == c].mean() for c in set(labels.tolist()) if c != labels[i])
+        out.append((b - a) / max(a, b))
+    return np.array(out)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_silhouette_matches_brute_force(seed):
+    rng = np.random.default_rng(seed)
+    x = rng.random((int(rng.integers(5, 60)), 4))
+    labels = rng.integers(0, int(rng.integers(2, 5)), len(x))
+    labels = np.unique(labels, return_inverse=True)[1].ravel()
+    if labels.max() == 0:
+        labels[0] = 1
+    assert np.allclose(clusters.silhouette(x, labels), brute_silhouette(x, labels), atol=1e-9)
+    rows = [0, len(x) - 1]
+    assert np.allclose(clusters.silhouette(x, labels, rows), brute_silhouette(x, labels)[rows], atol=1e-9)
+
+
+def test_peers_are_nearest_members_of_same_cluster():
+    x, _ = blobs(np.random.default_rng(2), [25, 25], spread=0.5)
+    result = clusters.Clustering(x, "kmeans", 2)
+    for pos in (0, 10, 30):
+        peers = result.peers(pos, 5)
+        members = [m for m in result.members(result.labels[pos]) if m != pos]
+        d = {m: ((result.x[m] - result.x[pos]) ** 2).sum() for m in members}
+        assert peers.tolist() == sorted(members, key=lambda m: (d[m], m))[:5]
+        assert pos not in peers.tolist()
+
+
+def test_derived_is_computed_once_under_concurrency(appmod):
+    table = appmod.partitions.cache.get().hierarchy.level("district").take(np.arange(10))
+    calls = []
+
+    def slow(t):
+        calls.append(1)
+        time.sleep(0.05)
+        return object()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(table.derived("slow", slow))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+
+
+def test_default_variant_is_precomputed_at_load(make_city, appmod):
+    make_city("clustertown")
+    hierarchy = appmod.partitions.cache.get("clustertown").hierarchy
+    for level in hierarchy.levels.values():
+        key = (level.version, f"clusters:{clusters.CLUSTER_METHOD}:{clusters.CLUSTER_K}")
+        assert key in level._derived
+
+
+def test_district_cluster_route(client):
+    body = client.get("/district-cluster?name=강남구&peers=3").get_json()
+    listing = client.get("/clusters").get_json()
+    cluster = listing["clusters"][body["cluster"]]
+    assert body["district"] in cluster["members"]
+    assert len(body["peers"]) == min(3, cluster["size"] - 1)
+    assert set(body["peers"]) <= set(cluster["members"]) - {"강남구"}
+    assert sum(c["size"] for c in listing["clusters"]) == 25
+    assert listing["method"] == clusters.CLUSTER_METHOD and listing["k"] == clusters.CLUSTER_K
+
+
+def test_configured_variant(client, monkeypatch):
+    assert client.get("/clusters?method=hierarchical&k=3").status_code == 400
+    monkeypatch.setattr(clusters, "CLUSTER_VARIANTS", clusters.CLUSTER_VARIANTS + [("hierarchical", 3)])
+    body = client.get("/clusters?method=hierarchical&k=3").get_json()
+    assert body["method"] == "hierarchical" and body["k"] == 3
+
+
+@pytest.mark.parametrize("query, word", [
+    ("method=bad", "method"), ("k=abc", "k"), ("k=0", "k"), ("k=-2", "k"), ("k=7", "method:k"),
+    ("peers=-1", "peers"), ("peers=abc", "peers"), ("peers=0", "peers"),
+])
+def test_bad_parameters(client, query, word):
+    for path in ("/district-cluster?name=강남구&", "/clusters?"):
+        if "peers" in query and path == "/clusters?":
+            continue
+        response = client.get(path + query)
+        assert response.status_code == 400
+        error = response.get_json()["error"]
+        assert word in error and "invalid literal" not in error
+
+
+def test_unknown_district(client):
+    assert client.get("/district-cluster?name=없는구").status_code == 404
+
+
+def test_clustering_rejects_bad_k():
+    with pytest.raises(ValueError):
+        clusters.Clustering(np.random.default_rng(0).random((10, 3)), "kmeans", 1)
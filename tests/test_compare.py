@@ -0,0 +1,80 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from categories import PLAN
+
+
+KEYS = [cat.feature_key for cat in PLAN.categories]
+
+
+def compare(client, **params):
+    response = client.get("/district-compare", query_string=params)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def test_body_shape(client):
+    body = compare(client, names="강남구,중랑구,종로구")
+    assert body["categories"] == KEYS
+    assert len(body["average"]) == len(KEYS)
+    assert [d["district"] for d in body["districts"]] == ["강남구", "중랑구", "종로구"]
+    for entry in body["districts"]:
+        assert list(entry["features"]) == KEYS and list(entry["vsAverage"]) == KEYS
+    # 세 지역 → 세 쌍 (앞 지역 - 뒤 지역)
+    assert [(p["a"], p["b"]) for p in body["pairwise"]] == [("강남구", "중랑구"), ("강남구", "종로구"), ("중랑구", "종로구")]
+
+
+def test_features_agree_with_district_features(client):
+    body = compare(client, names="강남구,중랑구")
+    for entry in body["districts"]:
+        features = client.get(f"/district-features?name={entry['district']}").get_json()["features"]
+        assert entry["features"] == pytest.approx(features, abs=0.01)
+
+
+def test_deltas_against_city_average(client, appmod):
+    city = appmod.partitions.cache.get().hierarchy.level("city").scores[0]
+    body = compare(client, names="all")
+    assert body["average"] == np.round(city, 2).tolist()
+    for entry in body["districts"]:
+        for j, key in enumerate(KEYS):
+            assert entry["vsAverage"][key] == pytest.approx(entry["features"][key] - city[j], abs=0.011)
+
+
+def test_pairwise_differences(client):
+    body = compare(client, names="강남구,중랑구,종로구,마포구")
+    features = {d["district"]: d["features"] for d in body["districts"]}
+    assert len(body["pairwise"]) == 6
+    for pair, (a, b) in zip(body["pairwise"], itertools.combinations(features, 2)):
+        assert (pair["a"], pair["b"]) == (a, b)
+        for key in KEYS:
+            assert pair["diff"][key] == pytest.approx(features[a][key] - features[b][key], abs=0.011)
+
+
+def test_pairwise_cutoff(client, appmod, monkeypatch):
+    # 25 개 자치구 → 300 쌍. 상한을 넘으면 pairwise 는 조용히 빠짐
+    assert len(compare(client, names="all")["pairwise"]) == 25 * 24 // 2
+    monkeypatch.setattr(appmod, "MAX_PAIRWISE", 24)
+    body = compare(client, names="all")
+    assert "pairwise" not in body and len(body["districts"]) == 25
+    names = ",".join(d["district"] for d in body["districts"][:24])
+    assert len(compare(client, names=names)["pairwise"]) == 24 * 23 // 2
+
+
+def test_dong_level(client, dong_city):
+    body = compare(client, city="dongtown", level="dong", names="all")
+    assert len(body["districts"]) == 2 * len(dong_city)
+    assert "pairwise" in body  # 50 지역 = 상한
+
+
+@pytest.mark.parametrize("params, status", [
+    ({}, 400),
+    ({"names": " , "}, 400),
+    ({"names": "강남구,없는구"}, 404),
+    ({"names": "강남구", "level": "galaxy"}, 400),
+])
+def test_errors(client, params, status):
+    response = client.get("/district-compare", query_string=params)
+    assert response.status_code == status
+    assert response.get_json()["error"]
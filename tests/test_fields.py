@@ -0,0 +1,104 @@
+import json
+
+import pytest
+
+from categories import PLAN
+
+
+KEYS = [cat.feature_key for cat in PLAN.categories]
+
+
+def get(client, path, **params):
+    response = client.get(path, query_string=params)
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+@pytest.mark.parametrize("path", ["/district-top5", "/district-compare"])
+def test_unknown_field(client, path):
+    response = client.get(path, query_string={"mode": "friendly", "names": "강남구", "fields": "district,nope"})
+    assert response.status_code == 400
+    assert "fields" in response.get_json()["error"]
+
+
+@pytest.mark.parametrize("fields", [None, "district", "rank,info", "metricData", "district,metricData"])
+def test_top5_fields(client, fields):
+    params = {"mode": "friendly"}
+    if fields:
+        params["fields"] = fields
+    rows = get(client, "/district-top5", **params)["data"]
+    expected = set(fields.split(",")) if fields else {"district", "rank", "metricData", "info"}
+    assert len(rows) == 5
+    assert all(set(row) == expected for row in rows)
+
+
+def expand_top5(compact):
+    # 열 단위 응답 → 행 단위 응답
+    rows = []
+    for i in range(5):
+        row = {}
+        if "district" in compact:
+            row["district"] = compact["district"][i]
+        if "rank" in compact:
+            row["rank"] = compact["rank"][i]
+        if "categories" in compact:
+            row["metricData"] = [
+                {"name": name, "selectedDistrict": value, "average": average}
+                for name, value, average in zip(compact["categories"], compact["selectedDistrict"][i], compact["average"])
+            ]
+        if "info" in compact:
+            row["info"] = compact["info"][i]
+        rows.append(row)
+    return rows
+
+
+@pytest.mark.parametrize("mode, category", [("friendly", None), ("unfriendly", None), ("category", "보행환경")])
+@pytest.mark.parametrize("fields", [None, "district,rank", "metricData,district"])
+def test_top5_compact_matches_expanded(client, mode, category, fields):
+    params = {"mode": mode}
+    if category:
+        params["category"] = category
+    if fields:
+        params["fields"] = fields
+    expanded = get(client, "/district-top5", **params)["data"]
+    compact = get(client, "/district-top5", format="compact", **params)["data"]
+    assert expand_top5(compact) == expanded
+
+
+def expand_compare(compact):
+    keys = compact["categories"]
+    districts = []
+    for i, name in enumerate(compact["district"]):
+        entry = {"district": name}
+        for field in ("features", "vsAverage"):
+            if field in compact:
+                entry[field] = dict(zip(keys, compact[field][i]))
+        districts.append(entry)
+    body = {"categories": keys, "average": compact["average"], "districts": districts}
+    if "pairwise" in compact:
+        p = compact["pairwise"]
+        body["pairwise"] = [
+            {"a": compact["district"][a], "b": compact["district"][b], "diff": dict(zip(keys, d))}
+            for a, b, d in zip(p["a"], p["b"], p["diff"])
+        ]
+    return body
+
+
+@pytest.mark.parametrize("names", ["강남구,중랑구,종로구", "all"])
+@pytest.mark.parametrize("fields", [None, "features", "vsAverage,pairwise", "pairwise"])
+def test_compare_compact_matches_expanded(client, names, fields):
+    params = {"names": names}
+    if fields:
+        params["fields"] = fields
+    expanded = get(client, "/district-compare", **params)
+    compact = get(client, "/district-compare", format="compact", **params)
+    assert compact["categories"] == KEYS
+    assert expand_compare(compact) == expanded
+    # 열 단위 응답은 카테고리 이름을 반복하지 않으므로 더 작음
+    assert len(json.dumps(compact, ensure_ascii=False)) < len(json.dumps(expanded, ensure_ascii=False))
+
+
+def test_compare_fields_are_omitted(client):
+    body = get(client, "/district-compare", names="강남구,중랑구", fields="vsAverage")
+    assert "pairwise" not in body
+    assert all(set(entry) == {"district", "vsAverage"} for entry in body["districts"])
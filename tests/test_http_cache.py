@@ -0,0 +1,74 @@
+import pytest
+
+AUTH = {"Authorization": "Bearer test-token"}
+
+PATHS = [
+    "/district-summary?name=강남구",
+    "/district-top5?mode=friendly",
+    "/district-compare?names=강남구,중랑구",
+    "/safety-priority",
+    "/recommend?safety=3&walk=1",
+]
+
+
+def patch(client, column="crime_rate", value=0.123):
+    response = client.patch("/admin/districts/강남구", json={"values": {column: value}}, headers=AUTH)
+    assert response.status_code == 200, response.get_json()
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_if_none_match_gives_304(client, path):
+    first = client.get(path)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"]
+
+    again = client.get(path, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.data == b""
+    assert again.headers["ETag"] == etag
+
+    assert client.get(path, headers={"If-None-Match": '"other"'}).status_code == 200
+
+
+def test_etag_depends_on_query_not_order(client):
+    a = client.get("/recommend?safety=3&walk=1").headers["ETag"]
+    b = client.get("/recommend?walk=1&safety=3").headers["ETag"]
+    c = client.get("/recommend?safety=3&walk=2").headers["ETag"]
+    assert a == b != c
+
+
+def test_errors_are_not_cached(client):
+    response = client.get("/district-summary?name=없는구")
+    assert response.status_code == 404
+    assert "ETag" not in response.headers
+
+
+@pytest.mark.parametrize("path", PATHS)
+def test_etag_changes_after_patch(client, restore_partition, path):
+    before = client.get(path)
+    etag = before.headers["ETag"]
+    patch(client)
+
+    after = client.get(path, headers={"If-None-Match": etag})
+    assert after.status_code == 200
+    assert after.headers["ETag"] != etag
+    assert client.get(path, headers={"If-None-Match": after.headers["ETag"]}).status_code == 304
+
+
+def test_patch_changes_body_behind_new_etag(client, restore_partition):
+    before = client.get("/district-features?name=강남구").get_json()["features"]["safety"]
+    patch(client, value=0.0)
+    after = client.get("/district-features?name=강남구").get_json()["features"]["safety"]
+    assert after != before
+
+
+def test_recommend_etag_depends_only_on_its_columns(client, restore_partition):
+    # safety / walk 가중치 응답은 crime_rate, 보행 지표 열에만 의존 → 녹지 열 수정에는 304 유지
+    path = "/recommend?safety=3&walk=1"
+    etag = client.get(path).headers["ETag"]
+    patch(client, column="green_space_per_capita", value=0.5)
+    assert client.get(path, headers={"If-None-Match": etag}).status_code == 304
+
+    patch(client, column="steep_slope_count", value=0.5)
+    assert client.get(path, headers={"If-None-Match": etag}).status_code == 200
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import ingest
+from categories import INDICATOR_COLUMNS
+
+DISTRICTS = ["종로구", "중구", "용산구", "성동구"]
+
+
+@pytest.fixture
+def raw_dir(tmp_path, monkeypatch):
+    # 모든 SOURCES 에 대해 자치구마다 몇 행씩 있는 작은 원본 파일
+    monkeypatch.setattr(ingest, "CACHE_DIR", str(tmp_path / "cache"))
+    raw = tmp_path / "raw"
+    raw.mkdir()
+    pd.DataFrame({
+        "district": DISTRICTS,
+        "population": [150000, 0, 230000, 290000],
+        "area_km2": [23.9, 10.0, 21.9, 16.8],
+    }).to_csv(raw / ingest.REFERENCE_FILE, index=False)
+    for source in ingest.SOURCES.values():
+        rows = [d for i, d in enumerate(DISTRICTS) for _ in range(i + 1)]
+        frame = {source.district_col: rows}
+        if source.value:
+            frame[source.value] = np.arange(len(rows), dtype=float) + 1
+        pd.DataFrame(frame).to_csv(raw / source.file, index=False)
+    return str(raw)
+
+
+def test_zero_denominator_is_missing(raw_dir):
+    table = ingest.raw_table(raw_dir, verbose=False)
+    per_capita = [name for name, s in ingest.SOURCES.items() if s.per == "population"]
+    for name in per_capita:
+        assert np.isnan(table.at["중구", name])
+        assert np.isfinite(table[name].drop("중구")).all()
+
+    # 0 인구 자치구가 있어도 나머지 자치구는 정상적으로 정규화됨
+    normalized = ingest.min_max(table["crime_rate"])
+    assert normalized.drop("중구").max() == 1.0
+    assert normalized.drop("중구").min() == 0.0
+
+
+def test_source_definition_change_invalidates_cache(raw_dir, monkeypatch):
+    first = ingest.raw_table(raw_dir, verbose=False)
+    rebuilt = []
+    original = ingest.aggregate_source
+    monkeypatch.setattr(ingest, "aggregate_source", lambda path, source, rows: rebuilt.append(source.file) or original(path, source, rows))
+
+    assert ingest.raw_table(raw_dir, verbose=False).equals(first)
+    assert rebuilt == []
+
+    # 같은 파일이라도 집계 방식이 바뀌면 다시 집계
+    monkeypatch.setitem(ingest.SOURCES, "employ", ingest.Source("senior_jobs.csv", agg="count"))
+    changed = ingest.raw_table(raw_dir, verbose=False)
+    assert rebuilt == ["senior_jobs.csv"]
+    assert changed["employ"].tolist() == [1.0, 2.0, 3.0, 4.0]
+    assert changed[[c for c in INDICATOR_COLUMNS if c != "employ"]].equals(first.drop(columns="employ"))
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from categories import PLAN
+
+
+def _apply(state, event):
+    # templates/index.html 의 applyLive 와 같은 방식으로 클라이언트 상태(지역 → [순위, 점수])를 갱신
+    if event["type"] == "snapshot":
+        return {e["district"]: [i + 1, e["score"]] for i, e in enumerate(event["result"])}
+    for e in event["left"]:
+        state.pop(e["district"])
+    for e in event["moved"]:
+        state[e["district"]] = [e["rank"], e["score"]]
+    names = sorted(state, key=lambda name: state[name][0])
+    for name, score in zip(names, event["scores"]):
+        state[name][1] = score
+    return state
+
+
+def _ranked(state):
+    return [(name, state[name][1]) for name in sorted(state, key=lambda name: state[name][0])]
+
+
+@pytest.mark.parametrize("num", [3, 5])
+def test_replayed_deltas_match_recommend(client, num):
+    weights = {"safety": 3, "walk": 3}
+    response = client.post("/live/sessions", json={"weights": weights, "num": num})
+    assert response.status_code == 200
+    sid = response.get_json()["session"]
+    state = _apply({}, {"type": "snapshot", "result": response.get_json()["result"]})
+
+    rng = np.random.default_rng(num)
+    for step in range(300):
+        key = PLAN.keys[rng.integers(len(PLAN.keys))]
+        weights[key] = int(rng.integers(0, 6))
+        event = client.patch(f"/live/sessions/{sid}", json={"category": key, "weight": weights[key]}).get_json()
+        state = _apply(state, event)
+
+        query = "&".join(f"{k}={v}" for k, v in weights.items())
+        expected = client.get(f"/recommend?num={num}&{query}").get_json()["result"]
+        live = _ranked(state)
+        assert [name for name, _ in live] == [e["district"] for e in expected], step
+        np.testing.assert_allclose([s for _, s in live], [e["score"] for e in expected], rtol=1e-9, atol=1e-12)
+
+    assert client.delete(f"/live/sessions/{sid}").status_code == 200
+
+
+def test_score_only_change_is_pushed(client):
+    sid = client.post("/live/sessions", json={"weights": {"safety": 1}, "num": 5}).get_json()["session"]
+    event = client.patch(f"/live/sessions/{sid}", json={"category": "safety", "weight": 2}).get_json()
+    # 가중치 하나만 두 배: 순위는 그대로, 점수는 두 배
+    assert event["moved"] == [] and event["left"] == []
+    expected = client.get("/recommend?num=5&safety=2").get_json()["result"]
+    np.testing.assert_allclose(event["scores"], [e["score"] for e in expected], rtol=1e-9)
+    client.delete(f"/live/sessions/{sid}")
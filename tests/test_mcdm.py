@@ -0,0 +1,95 @@
+from urllib.parse import urlencode
+
+import numpy as np
+import pytest
+
+from categories import PLAN
+from mcdm import VIKOR_V, MCDMModel
+
+
+def reference_topsis(x, w):
+    # 교과서 식: 벡터 정규화 → 가중 → 이상점 / 반이상점 거리 → 상대 근접도
+    w = w / w.sum()
+    norms = np.sqrt((x ** 2).sum(axis=0))
+    r = np.divide(x, norms, out=np.zeros_like(x), where=norms > 0)
+    v = r * w
+    d_plus = np.sqrt(((v - v.max(axis=0)) ** 2).sum(axis=1))
+    d_minus = np.sqrt(((v - v.min(axis=0)) ** 2).sum(axis=1))
+    denom = d_plus + d_minus
+    return np.divide(d_minus, denom, out=np.zeros_like(denom), where=denom > 0)
+
+
+def reference_vikor(x, w, v=VIKOR_V):
+    # S (가중 합), R (가중 최댓값), Q = v·S' + (1-v)·R'. 점수는 1 - Q
+    w = w / w.sum()
+    best, worst = x.max(axis=0), x.min(axis=0)
+    s = np.zeros(len(x))
+    r = np.zeros(len(x))
+    for i in range(len(x)):
+        terms = [
+            w[j] * (best[j] - x[i, j]) / (best[j] - worst[j]) if best[j] > worst[j] else 0.0
+            for j in range(x.shape[1])
+        ]
+        s[i], r[i] = sum(terms), max(terms)
+    s_part = (s - s.min()) / (s.max() - s.min()) if s.max() > s.min() else np.zeros_like(s)
+    r_part = (r - r.min()) / (r.max() - r.min()) if r.max() > r.min() else np.zeros_like(r)
+    return 1.0 - (v * s_part + (1 - v) * r_part)
+
+
+@pytest.mark.parametrize("seed", range(30))
+def test_model_matches_reference(seed):
+    rng = np.random.default_rng(seed)
+    x = rng.random((int(rng.integers(2, 12)), int(rng.integers(1, 6))))
+    x[rng.random(x.shape) < 0.1] = 0.0
+    w = rng.choice([0, 1, 2, 3.5], x.shape[1]).astype(float)
+    if not w.any():
+        w[0] = 1.0
+    model = MCDMModel(x)
+    assert np.allclose(model.topsis(w), reference_topsis(x, w))
+    assert np.allclose(model.vikor(w), reference_vikor(x, w))
+
+
+def test_known_small_matrix():
+    # 3 대안 × 2 지표, 같은 가중치: 모든 지표에서 가장 좋은 행이 1, 가장 나쁜 행이 0
+    x = np.array([[1.0, 1.0], [0.5, 0.2], [0.0, 0.0]])
+    model = MCDMModel(x)
+    w = np.array([1.0, 1.0])
+    assert model.topsis(w)[[0, 2]].tolist() == [1.0, 0.0]
+    assert model.vikor(w)[[0, 2]].tolist() == [1.0, 0.0]
+
+
+def test_with_columns_matches_refit():
+    rng = np.random.default_rng(3)
+    x = rng.random((20, 5))
+    changed = x.copy()
+    changed[:, 2] = rng.random(20)
+    patched = MCDMModel(x).with_columns([2], changed)
+    fresh = MCDMModel(changed)
+    w = np.array([1.0, 0, 2.0, 1.0, 0.5])
+    assert np.array_equal(patched.topsis(w), fresh.topsis(w))
+    assert np.array_equal(patched.vikor(w), fresh.vikor(w))
+
+
+def test_negative_weights_rejected():
+    with pytest.raises(ValueError):
+        MCDMModel(np.ones((3, 2))).topsis(np.array([1.0, -1.0]))
+
+
+@pytest.mark.parametrize("method", ["topsis", "vikor"])
+def test_recommend_route(client, appmod, method):
+    params = {"safety": 3, "transport": 1, "nature": 2}
+    body = client.get("/recommend?" + urlencode(dict(params, method=method, num=5))).get_json()
+
+    table = appmod.partitions.cache.get().hierarchy.level("district")
+    weights = np.array([params.get(key, 0) for key in PLAN.keys], dtype=float)
+    x = np.nan_to_num(table.adjusted)
+    reference = (reference_topsis if method == "topsis" else reference_vikor)(x, PLAN.column_weights(weights))
+    order = np.argsort(-reference, kind="stable")[:5]
+
+    assert [r["district"] for r in body["result"]] == table.names[order].tolist()
+    assert [r["score"] for r in body["result"]] == pytest.approx(reference[order].tolist())
+
+
+def test_recommend_unknown_method(client):
+    response = client.get("/recommend?safety=1&method=ahp")
+    assert response.status_code == 400
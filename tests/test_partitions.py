@@ -0,0 +1,88 @@
+import threading
+
+import pytest
+
+import dataset
+import partitions
+
+
+@pytest.fixture
+def cities(make_city):
+    for key in ("alpha", "beta", "gamma"):
+        make_city(key)
+    return ["alpha", "beta", "gamma"]
+
+
+def test_lru_evicts_least_recently_used(cities):
+    cache = partitions.PartitionCache(max_cities=3)  # 기본 도시 + 2
+    cache.get()
+    cache.get("alpha")
+    cache.get("beta")
+    cache.get("alpha")  # alpha 가 더 최근
+    cache.get("gamma")
+    assert list(cache.resident) == [partitions.DEFAULT_CITY, "alpha", "gamma"]
+    assert cache.evictions == 1
+
+    # 내려간 도시는 다시 요청하면 새로 읽음
+    cache.get("beta")
+    assert cache.loads["beta"] == 2
+    assert "alpha" not in cache.resident
+
+
+def test_default_city_is_never_evicted(cities):
+    cache = partitions.PartitionCache(max_cities=1)
+    default = cache.get()
+    for key in cities:
+        cache.get(key)
+        # 한도가 1 이어도 기본 도시와 방금 읽은 도시는 남음
+        assert set(cache.resident) == {partitions.DEFAULT_CITY, key}
+    assert cache.get() is default
+    assert cache.loads[partitions.DEFAULT_CITY] == 1
+
+
+def test_memory_bound(cities):
+    one = partitions.Partition("alpha").nbytes()
+    assert one > 0
+    cache = partitions.PartitionCache(max_bytes=int(one * 2.5))
+    for key in cities:
+        cache.get()
+        cache.get(key)
+    # 기본 도시 + 한 도시만 한도 안에 들어감
+    assert set(cache.resident) == {partitions.DEFAULT_CITY, "gamma"}
+    assert sum(p.nbytes() for p in cache.resident.values()) <= cache.max_bytes
+    assert cache.evictions == 2
+
+
+def test_same_city_is_loaded_once_under_concurrency(cities):
+    cache = partitions.PartitionCache()
+    got = []
+    threads = [threading.Thread(target=lambda: got.append(cache.get("alpha"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert cache.loads["alpha"] == 1
+    assert all(p is got[0] for p in got)
+
+
+@pytest.mark.parametrize("key", [
+    "nowhere", "../seoul", "..", "alpha/../beta", "/etc", "a" * 65, "Alpha", "al pha", "alpha%2f..",
+])
+def test_bad_city_is_rejected(cities, key):
+    cache = partitions.PartitionCache()
+    with pytest.raises(dataset.DatasetLookupError) as e:
+        cache.get(key)
+    assert "alpha" in str(e.value)  # 선택 가능한 도시 목록
+    assert key not in cache.resident and cache.loads == {}
+
+
+def test_bad_city_route(client):
+    for key in ("../seoul", "nowhere"):
+        response = client.get("/district-summary", query_string={"name": "강남구", "city": key})
+        assert response.status_code == 400
+        assert "city" in response.get_json()["error"]
+
+
+def test_city_route_serves_that_partition(client, cities):
+    body = client.get("/district-summary", query_string={"name": "강남구", "city": "alpha"}).get_json()
+    assert body["district"] == "강남구"
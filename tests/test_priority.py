@@ -0,0 +1,33 @@
+import pytest
+
+import views
+
+
+@pytest.mark.parametrize("route", sorted(views.PRIORITY_ROUTES))
+def test_priority_uses_district_level(client, appmod, dong_city, route):
+    level = appmod.partitions.cache.get("dongtown").hierarchy.level("district")
+    assert appmod.partitions.cache.get("dongtown").hierarchy.leaf == "dong"
+
+    _, _, _, cols, mean, ascending, score = views.PRIORITY_ROUTES[route]
+    values = level.frame[cols].mean(axis=1) if mean else level.frame[cols[0]]
+    order = values.sort_values(ascending=ascending).index[:5]
+
+    body = client.get(f"{route}?city=dongtown").get_json()
+    assert [item["name"] for item in body["items"]] == level.names[order].tolist()
+    assert [item["score"] for item in body["items"]] == [score(v) for v in values[order]]
+
+
+def test_priority_agrees_with_features(client, dong_city):
+    # 녹지(단일 지표, 반전 없음): /nature-priority 1위 = /district-features 에서 nature 점수가 가장 높은 자치구
+    items = client.get("/nature-priority?city=dongtown").get_json()["items"]
+    features = {
+        name: client.get(f"/district-features?city=dongtown&name={name}").get_json()["features"]["nature"]
+        for name in dong_city["district"]
+    }
+    assert items[0]["name"] == max(features, key=features.get)
+    for item in items:
+        assert round(item["score"], 2) == pytest.approx(features[item["name"]], abs=0.01)
+
+    # final_df.csv 행 기준 순위와는 다름 (동 집계를 쓰는지 확인하는 데이터)
+    raw = dong_city.sort_values("green_space_per_capita", ascending=False)["district"][:5].tolist()
+    assert [item["name"] for item in items] != raw
@@ -0,0 +1,133 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+import fakedb
+import profiles
+
+
+class Versions:
+    # 도시 → 현재 데이터 버전. resident 에 없는 도시는 백그라운드 갱신에서 None
+    def __init__(self):
+        self.current = {"seoul": "v1", "busan": "b1"}
+        self.resident = {"seoul"}
+
+    def __call__(self, params, resident_only=False):
+        city = params.get("city", "seoul")
+        if resident_only and city not in self.resident:
+            return None
+        return self.current[city]
+
+
+@pytest.fixture
+def store():
+    db = fakedb.FakeDB()
+    versions = Versions()
+    computed = []
+
+    def compute(params):
+        computed.append(params)
+        if params.get("parent") == "gone" and versions(params) == "v2":
+            raise ValueError("없는 parent")
+        return {"result": [{"district": params.get("city", "seoul"), "score": versions(params)}]}
+
+    s = profiles.ProfileStore(db.connect, compute, versions)
+    s.db, s.versions, s.computed = db, versions, computed
+    return s
+
+
+def test_save_and_load_is_one_lookup(store):
+    saved = store.save("mine", {"weights": {"safety": 3}})
+    assert saved == {"result": [{"district": "seoul", "score": "v1"}]}
+    store.computed.clear()
+    assert store.load("mine") == saved
+    assert store.computed == []  # 같은 버전이면 다시 계산하지 않음
+    assert store.load("missing") is None
+    assert store.stats()["hits"] == 1 and store.stats()["misses"] == 1
+
+
+def test_stale_read_recomputes_without_writing(store):
+    store.save("mine", {"weights": {"safety": 3}})
+    store.versions.current["seoul"] = "v2"
+    store._refresh_wanted.clear()
+    store.schedule_refresh = lambda: None  # 백그라운드 갱신은 아래 테스트에서 직접
+    assert store.load("mine")["result"][0]["score"] == "v2"
+    row = store.db.rows("SELECT data_version FROM weight_profiles WHERE name = 'mine'")[0]
+    assert row["data_version"] == "v1"
+    assert store.stats()["stale_reads"] == 1
+
+
+def test_refresh_all_updates_stale_resident_rows(store):
+    for i in range(7):
+        store.save(f"p{i}", {"weights": {"safety": i + 1}})
+    store.save("busan", {"weights": {"safety": 1}, "city": "busan"})
+    store.save("broken", {"weights": {"safety": 1}, "parent": "gone"})  # 새 데이터에서는 계산이 안 되는 프로필
+    store.versions.current["seoul"] = "v2"
+    store.versions.current["busan"] = "b2"
+
+    assert store.refresh_all(batch=3) == 8
+
+    rows = {r["name"]: r for r in store.db.rows("SELECT name, result, data_version FROM weight_profiles")}
+    assert all(rows[f"p{i}"]["data_version"] == "v2" for i in range(7))
+    assert json.loads(rows["broken"]["result"]) == {"error": "없는 parent"}
+    assert rows["busan"]["data_version"] == "b1"  # 메모리에 없는 도시는 건너뜀
+    assert store.refresh_all() == 0
+
+
+def test_db_down_raises_unavailable_and_recovers(store):
+    store.save("mine", {"weights": {"safety": 3}})
+    store.db.down = True
+    with pytest.raises(profiles.ProfileUnavailable):
+        store.load("mine")
+    with pytest.raises(profiles.ProfileUnavailable):
+        store.save("other", {"weights": {"safety": 1}})
+    with pytest.raises(profiles.ProfileUnavailable):
+        store.delete("mine")
+    assert store.stats()["db_errors"] == 3
+
+    store.db.down = False
+    assert store.load("mine")["result"][0]["score"] == "v1"
+    assert store.delete("mine") is True
+
+
+def test_routes_return_503_when_db_is_down(client, fake_db):
+    body = {"name": "route-test", "weights": {"safety": 3}, "num": 3}
+    response = client.post("/profiles", json=body)
+    assert response.status_code == 200
+    assert client.get("/profiles/route-test").get_json()["result"] == response.get_json()["result"]
+
+    fake_db.down = True
+    assert client.get("/profiles/route-test").status_code == 503
+    assert client.post("/profiles", json=body).status_code == 503
+
+    fake_db.down = False
+    assert client.get("/profiles/route-test").status_code == 200
+    assert client.delete("/profiles/route-test").status_code == 200
+    assert client.get("/profiles/route-test").status_code == 404
+
+
+def test_stale_read_of_uncomputable_profile(store):
+    store.save("broken", {"weights": {"safety": 1}, "parent": "gone"})
+    store.versions.current["seoul"] = "v2"
+    store.schedule_refresh = lambda: None
+    assert store.load("broken") == {"error": "없는 parent"}
+
+
+def test_route_returns_409_when_parent_disappears(client, appmod, fake_db, dong_city):
+    # 행정동 데이터가 있는 도시에서 강남구 하위 동으로 저장 → 강남구가 빠진 데이터로 다시 읽힘
+    body = {"name": "gone-parent", "weights": {"safety": 3}, "level": "dong", "parent": "강남구", "city": "dongtown"}
+    assert client.post("/profiles", json=body).status_code == 200
+
+    path = os.path.join(appmod.partitions.CITY_DATA_DIR, "dongtown", "final_dong_df.csv")
+    dong = pd.read_csv(path, encoding="utf-8")
+    dong[dong["district"] != "강남구"].to_csv(path, index=False, encoding="utf-8")
+    cache = appmod.partitions.cache
+    with cache._lock:
+        cache.resident.pop("dongtown", None)
+
+    response = client.get("/profiles/gone-parent")
+    assert response.status_code == 409
+    assert "강남구" in response.get_json()["error"]
+    client.delete("/profiles/gone-parent")
@@ -0,0 +1,128 @@
+import json
+import math
+import os
+
+import pymysql
+import pytest
+
+import querylog
+
+
+class FakeLogDB:
+    # recommend_queries 만 흉내: level 이 "bad" 인 행은 strict mode 의 Data too long 처럼 실패
+    def __init__(self):
+        self.rows = []
+        self.down = False
+
+    def connect(self):
+        if self.down:
+            raise pymysql.err.OperationalError(2003, "Can't connect to MySQL server (fake)")
+        return self
+
+    def cursor(self):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, args=()):
+        pass
+
+    def executemany(self, sql, rows):
+        if self.down:
+            raise pymysql.err.OperationalError(2013, "Lost connection (fake)")
+        if any(row[1] == "bad" for row in rows):
+            raise pymysql.err.DataError(1406, "Data too long for column 'level'")
+        self.rows.extend(rows)
+
+    def commit(self):
+        pass
+
+    def ping(self, reconnect=True):
+        if self.down:
+            raise pymysql.err.OperationalError(2003, "Can't connect to MySQL server (fake)")
+
+
+@pytest.fixture
+def db():
+    return FakeLogDB()
+
+
+@pytest.fixture
+def log(db, tmp_path):
+    return querylog.QueryLog(db.connect, batch_rows=4, spill_path=str(tmp_path / "spill.jsonl"),
+                             quarantine_path=str(tmp_path / "quarantine.jsonl"))
+
+
+def _lines(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _flush(log):
+    log._write(log._drain(1000))
+
+
+def test_log_clamps_fields(log):
+    log.log("x" * 40, "p" * 100, 99999, 10 ** 12, {"safety": float("nan"), "walk": 2})
+    row = log._drain(1)[0]
+    level, parent, year, num = row[1:5]
+    weights = dict(zip(querylog.PLAN.keys, row[5:]))
+    assert len(level) == querylog.LEVEL_MAX and len(parent) == querylog.PARENT_MAX
+    assert year is None and num == querylog.NUM_MAX
+    assert weights["safety"] is None and weights["walk"] == 2.0
+    assert not any(isinstance(v, float) and math.isnan(v) for v in row)
+
+
+def test_bad_row_is_quarantined_not_respilled(db, log):
+    for level in ["district", "bad", "district", "dong"]:
+        log.log(level, None, None, 5, {"safety": 1})
+    _flush(log)
+    assert [row[1] for row in db.rows] == ["district", "district", "dong"]
+    assert [row[1] for row in _lines(log.quarantine_path)] == ["bad"]
+    assert _lines(log.spill_path) == []
+    assert log.stats()["quarantined"] == 1 and log.stats()["written"] == 3
+
+
+def test_spill_replay_skips_bad_rows(db, log):
+    db.down = True
+    for level in ["district", "bad", "dong", "district", "city"]:
+        log.log(level, None, None, 5, {"safety": 1})
+    _flush(log)
+    assert len(_lines(log.spill_path)) == 5 and db.rows == []
+
+    # DB 가 돌아오면 다음 쓰기 후 spill 을 다시 넣음: 값이 잘못된 행만 quarantine, spill 은 비워짐
+    db.down = False
+    log.log("district", None, None, 5, {"walk": 1})
+    _flush(log)
+    assert len(db.rows) == 5
+    assert [row[1] for row in _lines(log.quarantine_path)] == ["bad"]
+    assert not os.path.exists(log.spill_path)
+
+    log.log("district", None, None, 5, {"walk": 2})
+    _flush(log)
+    assert len(db.rows) == 6 and log.stats()["quarantined"] == 1
+
+
+def test_connection_error_midway_spills_rest(db, log):
+    for level in ["district", "bad", "dong"]:
+        log.log(level, None, None, 5, {"safety": 1})
+    batch = log._drain(10)
+
+    # 한 행씩 다시 넣는 도중 연결이 끊기면 남은 행은 quarantine 이 아니라 spill
+    original = db.executemany
+
+    def flaky(sql, rows):
+        if len(rows) == 1 and rows[0][1] == "dong":
+            raise pymysql.err.OperationalError(2013, "Lost connection (fake)")
+        return original(sql, rows)
+
+    db.executemany = flaky
+    assert log._insert_rows(batch) is None
+    assert [row[1] for row in _lines(log.spill_path)] == ["dong"]
+    assert [row[1] for row in _lines(log.quarantine_path)] == ["bad"]
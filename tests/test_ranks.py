@@ -0,0 +1,23 @@
+import pytest
+
+
+@pytest.mark.parametrize("path", ["/district-summary", "/district-features"])
+@pytest.mark.parametrize("value, on", [
+    ("1", True), ("true", True), ("yes", True), ("True", True),
+    ("0", False), ("false", False), ("no", False), ("", False),
+])
+def test_ranks_flag(client, path, value, on):
+    body = client.get(path, query_string={"name": "강남구", "ranks": value}).get_json()
+    assert ("ranks" in body) == on
+
+
+def test_rank_keys_match_feature_keys(client):
+    body = client.get("/district-features?name=강남구&ranks=1").get_json()
+    assert list(body["ranks"]) == list(body["features"]) + ["overall"]
+    assert "walkenv" in body["ranks"] and "employment" in body["ranks"]
+
+
+def test_district_rank_uses_feature_keys(client):
+    body = client.get("/district-rank?name=강남구&category=walkenv").get_json()
+    assert list(body["ranks"]) == ["walkenv"]
+    assert 1 <= body["ranks"]["walkenv"]["rank"] <= body["total"]
@@ -0,0 +1,50 @@
+import json
+import os
+import subprocess
+import sys
+
+from conftest import ROOT
+
+
+def _build(out):
+    # DB 가 없어도 CSV 만으로 생성되고 app 을 import 하지 않는지 (별도 프로세스, pymysql.connect 는 실패)
+    script = (
+        "import sys, pymysql\n"
+        "def refuse(**kwargs):\n"
+        "    raise RuntimeError('snapshot must not connect to MySQL')\n"
+        "pymysql.connect = refuse\n"
+        "import snapshot\n"
+        f"snapshot.build({out!r}, workers=2)\n"
+        "assert 'app' not in sys.modules\n"
+    )
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    subprocess.run([sys.executable, "-c", script], cwd=ROOT, env=env, check=True, capture_output=True)
+
+
+def test_snapshot_matches_live_routes(client, tmp_path):
+    out = str(tmp_path / "snapshots")
+    _build(out)
+    with open(os.path.join(out, "manifest.json"), encoding="utf-8") as f:
+        index = json.load(f)
+    version = index["current"]["seoul"]
+    with open(os.path.join(out, version, "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    assert manifest["failed"] == {}
+    assert len(manifest["files"]) > 50
+
+    for key, entry in manifest["files"].items():
+        response = client.get(key)
+        assert response.status_code == 200, key
+        with open(os.path.join(out, version, entry["file"]), "rb") as f:
+            assert f.read() == response.get_data(), key
+        assert entry["etag"] == response.headers["ETag"], key
+
+
+def test_top5_errors(client):
+    assert client.get("/district-top5?mode=bad").get_json()["error"].startswith("mode")
+    assert client.get("/district-top5?mode=category&category=x&fields=y").get_json()["error"].startswith("카테고리명")
+    response = client.get("/district-top5?mode=friendly&fields=rank,nope")
+    assert response.status_code == 400 and response.get_json()["error"].startswith("fields")
+    assert client.get("/district-top5?mode=friendly&level=nope").status_code == 400
+
+
@@ -0,0 +1,72 @@
+import pandas as pd
+import pytest
+
+from names import topic
+
+# 원래 /district-summary 구현 (행 단위 계산, 문구 포함)을 그대로 옮긴 기준값
+CATEGORY_COLUMNS = {
+    "safety": ["crime_rate"],
+    "walkenv": ["senior_pedestrian_accidents", "steep_slope_count"],
+    "relation": ["senior_center"],
+    "welfare": ["welfare_facilities", "sports_center"],
+    "culture": ["cultural_facilities"],
+    "transport": ["subway_station_count", "bus_stop_density"],
+    "medical": ["medical_corporations_count", "emergency_room_count"],
+    "employment": ["employ"],
+    "air": ["pm2_5_level"],
+    "nature": ["green_space_per_capita"],
+}
+CATEGORY_LABELS = {
+    "safety": "치안이 가장 좋은",
+    "walkenv": "보행환경이 가장 좋은",
+    "relation": "경로당이 가장 많은",
+    "welfare": "복지시설이 가장 많은",
+    "culture": "문화시설이 가장 많은",
+    "transport": "대중교통이 가장 편리한",
+    "medical": "의료 접근성이 가장 좋은",
+    "employment": "노인 일자리가 가장 많은",
+    "air": "대기환경이 가장 좋은",
+    "nature": "자연환경이 가장 좋은",
+}
+INVERTED = ["safety", "walkenv", "air"]
+
+
+def baseline_summary(df, name):
+    row = df[df["district"] == name].iloc[0]
+    max_diff, main = -float("inf"), None
+    for cat, cols in CATEGORY_COLUMNS.items():
+        val = row[cols].mean()
+        comp = df[df["district"] != name][cols]
+        if cat in INVERTED:
+            val, comp = 1 - val, 1 - comp
+        diff = val - comp.mean(axis=1).mean()
+        if diff > max_diff:
+            max_diff, main = diff, cat
+    return f"{name}는 {CATEGORY_LABELS[main]} 자치구입니다."
+
+
+DF = pd.read_csv("final_df.csv", encoding="utf-8")
+
+
+@pytest.mark.parametrize("name", DF["district"].tolist())
+def test_summary_wording_matches_baseline(client, name):
+    response = client.get("/district-summary", query_string={"name": name})
+    assert response.get_json()["summary"] == baseline_summary(DF, name)
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("강남구", "강남구는"), ("신사동", "신사동은"), ("강남구 신사동", "강남구 신사동은"),
+    ("중구", "중구는"), ("서울특별시", "서울특별시는"), ("달서구 본리", "달서구 본리는"),
+    ("Gangnam", "Gangnam은(는)"),
+])
+def test_topic_particle(name, expected):
+    assert topic(name) == expected
+
+
+def test_dong_wording(client, dong_city):
+    # 받침이 있는 동 이름에는 "은"
+    response = client.get("/district-summary", query_string={"city": "dongtown", "level": "dong", "name": "강남구 가동"})
+    assert response.get_json()["summary"].startswith("강남구 가동은 ")
+    body = client.get("/district-top5?city=dongtown&level=dong&mode=friendly").get_json()
+    for entry in body["data"]:
+        assert entry["info"].startswith(entry["district"] + "은 ")
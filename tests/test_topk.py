@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+from topk import TopKIndex, full_scan, top_k
+
+
+def random_case(rng):
+    n = int(rng.integers(1, 3000))
+    width = int(rng.integers(1, 15))
+    if rng.random() < 0.5:
+        # 값이 몇 개뿐인 열 → 동점이 많음
+        values = rng.integers(0, 4, (n, width)) / 3
+    else:
+        values = rng.random((n, width))
+    weights = np.zeros(width)
+    active = rng.choice(width, int(rng.integers(1, width + 1)), replace=False)
+    # 정수 가중치(동점 유지)와 음수 가중치 섞기
+    weights[active] = rng.choice([-3, -1, 1, 2, 5, -0.5, 0.25], len(active))
+    # 대부분 작은 k (임계값에서 멈추는 경로), 가끔 n 이상
+    k = int(rng.integers(1, 10)) if rng.random() < 0.8 else int(rng.integers(1, n + 3))
+    return values, weights, k
+
+
+@pytest.mark.parametrize("seed", range(300))
+def test_threshold_algorithm_matches_full_scan(seed):
+    rng = np.random.default_rng(seed)
+    values, weights, k = random_case(rng)
+    expected = full_scan(values, weights, k)
+    got = TopKIndex(values).query(weights, k)
+    assert np.array_equal(expected[0], got[0])
+    assert np.array_equal(expected[1], got[1])
+
+
+def test_all_tied_rows_keep_row_order():
+    values = np.ones((50, 3))
+    weights = np.array([1.0, -2.0, 0.0])
+    order, scores = TopKIndex(values).query(weights, 5)
+    assert order.tolist() == [0, 1, 2, 3, 4]
+    assert np.array_equal(scores, full_scan(values, weights, 5)[1])
+
+
+def test_with_columns_matches_fresh_index():
+    rng = np.random.default_rng(1)
+    values = rng.integers(0, 5, (200, 6)) / 4
+    index = TopKIndex(values)
+    changed = values.copy()
+    changed[:, [1, 4]] = rng.integers(0, 5, (200, 2)) / 4
+    patched = index.with_columns([1, 4], changed)
+    assert np.array_equal(patched.order, TopKIndex(changed).order)
+    weights = np.array([0, 2, 0, 0, -1, 0], dtype=float)
+    assert all(np.array_equal(a, b) for a, b in zip(patched.query(weights, 7), full_scan(changed, weights, 7)))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_top_k_matches_stable_sort(seed):
+    rng = np.random.default_rng(seed)
+    scores = rng.integers(0, 5, int(rng.integers(1, 100))).astype(float)
+    k = int(rng.integers(0, len(scores) + 2))
+    order = np.argsort(-scores, kind="stable")[:k]
+    got = top_k(scores, k)
+    assert np.array_equal(got[0], order)
+    assert np.array_equal(got[1], scores[order])
+
+
+def test_parent_table_is_cached_per_version(appmod):
+    hierarchy = appmod.partitions.cache.get().hierarchy
+    parent = hierarchy.city_name
+    table = hierarchy.table("district", parent)
+    assert hierarchy.table("district", parent) is table
+    index = table.topk_index()
+    assert hierarchy.table("district", parent).topk_index() is index
+
+    # 지표가 바뀐 계층에서는 새 버전의 부분 테이블
+    changed = hierarchy.replace_columns({0: np.full(len(hierarchy.level(hierarchy.leaf)), 0.5)})
+    other = changed.table("district", parent)
+    assert other is not table
+    assert np.array_equal(other.adjusted, changed.level("district").adjusted)
@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+
+from categories import INDICATOR_COLUMNS
+from history import History
+
+
+@pytest.fixture
+def history(appmod):
+    # 2020 → 2021: 세 곳은 치안 점수 상승, 두 곳은 하락, 나머지는 그대로
+    p = appmod.partitions.cache.get()
+    base = p.hierarchy.level("district").frame[["district"] + INDICATOR_COLUMNS].copy()
+    base["year"] = 2020
+    later = base.copy()
+    later["year"] = 2021
+    names = list(base["district"])
+    later.loc[later["district"].isin(names[:3]), "crime_rate"] *= 0.5
+    later.loc[later["district"].isin(names[3:5]), "crime_rate"] += 0.2
+    saved = p.history
+    p.history = History(pd.concat([base, later], ignore_index=True))
+    yield p.history
+    p.history = saved
+
+
+def test_movers_split_by_sign(client, history):
+    body = client.get("/trend-movers?category=safety&num=25").get_json()
+    assert len(body["improvers"]) == 3
+    assert len(body["decliners"]) == 2
+    assert all(item["change"] > 0 for item in body["improvers"])
+    assert all(item["change"] < 0 for item in body["decliners"])
+
+
+def test_movers_num_limits_each_side(client, history):
+    body = client.get("/trend-movers?category=safety&num=1").get_json()
+    assert len(body["improvers"]) == 1
+    assert len(body["decliners"]) == 1
+
+
+@pytest.mark.parametrize("num", ["x", "0", "-3", "1.5"])
+def test_movers_bad_num(client, history, num):
+    response = client.get(f"/trend-movers?category=safety&num={num}")
+    assert response.status_code == 400
+    assert "num" in response.get_json()["error"]
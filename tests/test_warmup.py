@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def logged(appmod, monkeypatch):
+    # 질의 로그는 기록만, 빈도 집계는 테스트마다 새로 (다른 테스트의 요청으로 밀려나지 않도록)
+    rows = []
+    monkeypatch.setattr(appmod.query_log, "log", lambda *args: rows.append(args))
+    monkeypatch.setattr(appmod.warmup, "hitters", appmod.warmup.HeavyHitters(appmod.warmup.WARM_CAPACITY))
+    return rows
+
+
+def _count(appmod, key):
+    entry = appmod.warmup.hitters.counts.get(key)
+    return 0 if entry is None else entry[0]
+
+
+def test_rejected_requests_are_not_logged(client, logged):
+    assert client.get("/recommend?safety=1&year=abc").status_code == 400
+    assert client.get("/recommend?safety=1&level=" + "x" * 40).status_code == 400
+    assert client.get("/recommend?safety=1&num=x").status_code == 400
+    assert logged == []
+
+
+def test_cache_hits_and_not_modified_are_logged(appmod, client, logged):
+    key = "/recommend?num=3&safety=2&walk=1"
+    first = client.get(key)
+    assert first.status_code == 200
+    assert client.get(key).status_code == 200  # 응답 캐시 적중
+    assert client.get(key, headers={"If-None-Match": first.headers["ETag"]}).status_code == 304
+    assert len(logged) == 3
+    level, parent, year, num, weights = logged[0]
+    assert (level, parent, year, num, weights) == ("district", None, None, 3, {"safety": 2.0, "walk": 1.0})
+    assert _count(appmod, key) >= 3
+
+
+def test_warmup_header_only_from_internal_calls(appmod, client, logged):
+    key = "/recommend?num=4&safety=5"
+    before = _count(appmod, key)
+    client.get(key, headers={"X-Warmup": "1"})
+    assert _count(appmod, key) == before + 1
+    assert len(logged) == 1
+
+    client.get(key, headers=appmod.warmup.internal_headers())
+    assert _count(appmod, key) == before + 1
+    assert len(logged) == 1
+
+
+def test_district_top5_counts_not_modified(appmod, client, logged):
+    key = "/district-top5?mode=friendly"
+    etag = client.get(key).headers["ETag"]
+    before = _count(appmod, key)
+    assert client.get(key, headers={"If-None-Match": etag}).status_code == 304
+    assert _count(appmod, key) == before + 1
+    assert client.get("/district-top5?mode=bad").status_code == 400
+    assert _count(appmod, "/district-top5?mode=bad") == 0
+
+
+
+def scan_minimum(counts):
+    # 비교용: 전체 키를 훑어서 찾은 가장 적은 count 와 그 키들 (원래 구현의 교체 대상)
+    floor = min(entry[0] for entry in counts.values())
+    return floor, {k for k, entry in counts.items() if entry[0] == floor}
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_heavy_hitters_evicts_a_minimum(appmod, seed):
+    rng = np.random.default_rng(seed)
+    sketch = appmod.warmup.HeavyHitters(20)
+    truth = {}
+    for _ in range(3000):
+        # 몇 개의 자주 나오는 키 + 긴 꼬리
+        key = f"hot{rng.integers(5)}" if rng.random() < 0.5 else f"cold{rng.integers(400)}"
+        amount = int(rng.integers(1, 3))
+        truth[key] = truth.get(key, 0) + amount
+
+        full = key not in sketch.counts and len(sketch.counts) == 20
+        if full:
+            floor, victims = scan_minimum(sketch.counts)
+        before = set(sketch.counts)
+        sketch.add(key, amount)
+        if full:
+            evicted = before - set(sketch.counts)
+            assert len(evicted) == 1 and evicted.pop() in victims
+            assert sketch.counts[key] == [floor + amount, floor]
+
+    # Space-Saving 보장: 합계 보존, count - error <= 실제 빈도 <= count, 자주 나오는 키는 모두 남음
+    assert sum(entry[0] for entry in sketch.counts.values()) == sum(truth.values())
+    for key, (count, error) in sketch.counts.items():
+        assert count - error <= truth[key] <= count
+    assert {f"hot{i}" for i in range(5)} <= set(sketch.counts)
+    assert len(sketch._heap) <= 4 * 20  # 지난 항목은 주기적으로 정리됨
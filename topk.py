@@ -0,0 +1,160 @@
+import argparse
+import os
+import time
+
+import numpy as np
+
+
+# 가중합 상위 k 개 조회용 인덱스 (Fagin 의 Threshold Algorithm)
+#
+# 지표(반전 적용 후)마다 내림차순 정렬된 행 목록을 미리 만들어 두고, 질의 때는 가중치가 있는
+# 목록들을 위에서부터 같은 깊이만큼 읽는다. 지금까지 본 행들 중 k 번째 점수가
+# "아직 안 본 행이 가질 수 있는 최대 점수(threshold)" 보다 커지면 멈춘다.
+# 행이 많고 k 가 작을수록 전체 스캔보다 유리하고, 작은 테이블은 전체 스캔이 더 빠르다.
+
+# 인덱스를 쓰는 조건 (python topk.py 벤치마크 기준, k=5)
+#   가중치 1개: 약 2천 행부터, 3개: 약 1만 행부터 인덱스가 빠름. 14개 모두: 항상 전체 스캔이 빠름
+TOPK_MIN_ROWS = int(os.getenv("TOPK_MIN_ROWS", 2000))
+TOPK_MAX_ACTIVE = int(os.getenv("TOPK_MAX_ACTIVE", 4))
+
+
+def weighted_scores(values, weights):
+    # 전체 스캔과 인덱스 조회가 같은 식으로 점수를 계산해야 결과(동점 포함)가 정확히 일치함
+    # (가중치가 0 이 아닌 열만, 행마다 같은 순서로 합산 → 부분 집합으로 계산해도 비트 단위로 같은 값)
+    return (values * weights).sum(axis=1)
+
+
+def full_scan(values, weights, k):
+    active = np.flatnonzero(weights)
+    scores = weighted_scores(values[:, active], weights[active])
+    order = np.argsort(-scores, kind="stable")[:k]
+    return order, scores[order]
+
+
+def top_k(scores, k):
+    # 점수 배열에서 상위 k 개 (stable argsort 와 같은 순서). 전체 정렬 대신 k 번째 값 이상만 정렬
+    n = len(scores)
+    if k <= 0 or k >= n:
+        order = np.argsort(-scores, kind="stable")[:k]
+        return order, scores[order]
+    kth = np.partition(scores, n - k)[n - k]
+    rows = np.flatnonzero(scores >= kth)
+    best = rows[np.lexsort((rows, -scores[rows]))][:k]
+    return best, scores[best]
+
+
+class TopKIndex:
+    def __init__(self, values):
+        # values: (N, K) 반전 적용 + NaN → 0 처리된 지표
+        self.values = np.ascontiguousarray(values, dtype=float)
+        self.order = np.argsort(-self.values, axis=0, kind="stable")  # 열마다 내림차순 행 번호
+        self.last_depth = 0  # 마지막 질의에서 읽은 깊이 (벤치마크용)
+
+    def __len__(self):
+        return len(self.values)
+
+    def with_columns(self, columns, values):
+        # 지표 열 일부만 바뀐 경우 그 열의 정렬 목록만 다시 만듦 (열마다 독립인 stable 정렬)
+        index = TopKIndex.__new__(TopKIndex)
+        index.values = np.ascontiguousarray(values, dtype=float)
+        index.order = self.order.copy()
+        index.order[:, columns] = np.argsort(-index.values[:, columns], axis=0, kind="stable")
+        index.last_depth = 0
+        return index
+
+    def _block(self, col, descending, start, end):
+        # col 목록의 start ~ end 깊이 (음수 가중치는 오름차순 목록을 사용)
+        if descending:
+            return self.order[start:end, col]
+        n = len(self.values)
+        return self.order[n - end:n - start, col][::-1]
+
+    def search(self, weights, k):
+        # 테이블 크기 / 가중치 개수로 인덱스 조회와 전체 스캔 중 선택 (결과는 같음)
+        n_active = np.count_nonzero(weights)
+        if len(self.values) < TOPK_MIN_ROWS or n_active > TOPK_MAX_ACTIVE:
+            return full_scan(self.values, weights, k)
+        return self.query(weights, k)
+
+    def query(self, weights, k):
+        n = len(self.values)
+        k = min(k, n)
+        active = np.flatnonzero(weights)
+        if k <= 0 or len(active) == 0:
+            return full_scan(self.values, weights, k)
+
+        w = weights[active]
+        descending = w > 0
+        seen = np.zeros(n, dtype=bool)
+        rows_parts, score_parts = [], []
+        n_seen = 0
+        depth, step = 0, max(k, 16)
+        frontier = np.zeros(len(active))
+        # 너무 깊이 내려가면(가중치가 많은 열에 퍼진 경우) 전체 스캔이 더 싸므로 포기
+        max_depth = max(n // 4, k)
+
+        while depth < n:
+            if depth >= max_depth:
+                self.last_depth = n
+                return full_scan(self.values, weights, k)
+            end = min(n, depth + step)
+            blocks = [self._block(c, descending[a], depth, end) for a, c in enumerate(active)]
+            block_rows = np.unique(np.concatenate(blocks))
+            new = block_rows[~seen[block_rows]]
+            seen[new] = True
+            if len(new):
+                rows_parts.append(new)
+                score_parts.append(weighted_scores(self.values[new][:, active], w))
+                n_seen += len(new)
+
+            # 각 목록의 현재 깊이 값으로 만든 가상의 행 = 안 본 행의 점수 상한
+            for a, (c, block) in enumerate(zip(active, blocks)):
+                frontier[a] = self.values[block[-1], c]
+            threshold = weighted_scores(frontier[None, :], w)[0]
+
+            depth = end
+            if n_seen >= k:
+                scores = np.concatenate(score_parts)
+                kth = np.partition(scores, n_seen - k)[n_seen - k]
+                if kth > threshold:
+                    break
+            step *= 2
+
+        self.last_depth = depth
+        rows = np.concatenate(rows_parts)
+        scores = np.concatenate(score_parts)
+        # 점수 내림차순, 동점이면 행 번호 순 (전체 스캔의 stable argsort 와 같은 순서)
+        best = np.lexsort((rows, -scores))[:k]
+        return rows[best], scores[best]
+
+
+def benchmark(sizes, width=14, k=5, repeat=20, seed=0):
+    rng = np.random.default_rng(seed)
+    print(f"{'rows':>9} {'active':>6} {'scan ms':>9} {'TA ms':>9} {'depth':>8}")
+    for n in sizes:
+        values = rng.random((n, width))
+        index = TopKIndex(values)
+        for n_active in (1, 3, width):
+            weights = np.zeros(width)
+            weights[rng.choice(width, n_active, replace=False)] = rng.integers(1, 6, n_active)
+
+            started = time.perf_counter()
+            for _ in range(repeat):
+                expected = full_scan(values, weights, k)
+            scan_ms = (time.perf_counter() - started) / repeat * 1000
+
+            started = time.perf_counter()
+            for _ in range(repeat):
+                got = index.query(weights, k)
+            ta_ms = (time.perf_counter() - started) / repeat * 1000
+
+            assert np.array_equal(expected[0], got[0]) and np.array_equal(expected[1], got[1])
+            print(f"{n:>9} {n_active:>6} {scan_ms:>9.3f} {ta_ms:>9.3f} {index.last_depth:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Threshold Algorithm vs 전체 스캔 벤치마크")
+    parser.add_argument("--sizes", default="25,425,2000,10000,100000,1000000")
+    parser.add_argument("-k", type=int, default=5)
+    args = parser.parse_args()
+    benchmark([int(s) for s in args.sizes.split(",")], k=args.k)
@@ -0,0 +1,218 @@
+import numpy as np
+
+import dataset
+from names import topic
+from categories import PLAN
+
+
+# 읽기 전용 라우트의 응답 body(dict)를 만드는 함수들
+#
+# Flask 요청 / DB 연결 / 백그라운드 스레드에 의존하지 않으므로 app.py 의 라우트와
+# snapshot.py(정적 JSON 생성, app 을 import 하지 않음)가 같은 코드로 같은 body 를 만든다.
+# 잘못된 파라미터는 ViewError (라우트에서 400)
+
+
+class ViewError(ValueError):
+    pass
+
+
+# *-priority 라우트: (제목, 단위, category, 지표 열, 열 평균 여부, 오름차순 여부, 점수 표시)
+PRIORITY_ROUTES = {
+    "/safety-priority": ("안전한 동네 TOP 5", "범죄율 + 노인 보행자 사고 (낮을수록 안전)", "safety",
+                         ["crime_rate", "senior_pedestrian_accidents"], True, True, lambda v: round(v, 3)),
+    "/walkability-priority": ("보행 환경이 좋은 동네 TOP 5", "급경사지 개수 (낮을수록 보행에 유리)", "walk",
+                              ["steep_slope_count"], False, True, lambda v: v),
+    "/transport-priority": ("대중교통 접근성이 좋은 동네 TOP 5", "지하철역 수 + 버스 정류장 밀도 평균", "transport",
+                            ["subway_station_count", "bus_stop_density"], True, False, lambda v: round(v, 3)),
+    "/medical-priority": ("의료 접근성이 좋은 동네 TOP 5", "의료법인 수 + 응급실 수 평균", "medical",
+                          ["medical_corporations_count", "emergency_room_count"], True, False, lambda v: round(v, 3)),
+    "/social-priority": ("친목 활동하기 좋은 동네 TOP 5", "경로당 수", "social",
+                         ["senior_center"], False, False, int),
+    "/culture-welfare-priority": ("취미·문화생활 하기 좋은 동네 TOP 5", "복지시설 + 문화시설 평균", "culture",
+                                  ["welfare_facilities", "cultural_facilities"], True, False, lambda v: round(v, 3)),
+    "/walk-sports-priority": ("산책·운동하기 좋은 동네 TOP 5", "체육시설 수", "activity",
+                              ["sports_center"], True, False, lambda v: round(v, 3)),
+    "/nature-priority": ("자연환경이 좋은 동네 TOP 5", "1인당 녹지면적", "nature",
+                         ["green_space_per_capita"], False, False, lambda v: round(v, 3)),
+}
+
+
+def priority_body(hierarchy, route):
+    # 다른 자치구 라우트와 같은 값을 쓰도록 계층의 자치구 레벨에서 (행정동 데이터가 있으면 동 집계)
+    title, unit, category, cols, mean, ascending, score = PRIORITY_ROUTES[route]
+    df_subset = hierarchy.level("district").frame[["district"] + cols].copy()
+    df_subset["score"] = df_subset[cols].mean(axis=1) if mean else df_subset[cols[0]]
+
+    result = (
+        df_subset[["district", "score"]]
+        .sort_values(by="score", ascending=ascending)
+        .head(5)
+        .to_dict(orient="records")
+    )
+    return {
+        "title": title,
+        "unit": unit,
+        "category": category,
+        "items": [
+            {"rank": i + 1, "name": row["district"], "score": score(row["score"])}
+            for i, row in enumerate(result)
+        ]
+    }
+
+
+def split_fields(value):
+    # fields= 파라미터 → 필드 이름 집합 (없으면 None = 전체)
+    if not value:
+        return None
+    return {f.strip() for f in value.split(",") if f.strip()}
+
+
+TOP5_FIELDS = ["district", "rank", "metricData", "info"]
+TOP5_MODES = ["friendly", "unfriendly", "category"]
+
+
+def top5_body(table, mode, category_name=None, fields=None, compact=False):
+    # fields: 응답에 넣을 필드 (None 이면 전체). compact: 열 단위 응답
+    if mode not in TOP5_MODES:
+        raise ViewError("mode 파라미터가 필요하며 'friendly', 'unfriendly', 'category' 중 하나여야 합니다.")
+
+    scores = table.scores
+    categories = PLAN.categories
+
+    if mode == "friendly" or mode == "unfriendly":
+        total_score = table.total_scores()
+        if mode == "friendly":
+            total_score = -total_score
+        order = np.argsort(total_score, kind="stable")[:5]
+        metric_cats = list(range(len(categories)))
+    else:
+        j = PLAN.index(category_name) if category_name else None
+        if j is None:
+            raise ViewError("카테고리명이 필요하거나 유효하지 않습니다.")
+        order = np.argsort(-scores[:, j], kind="stable")[:5]
+        metric_cats = [j]
+
+    fields = set(TOP5_FIELDS) if fields is None else fields
+    if not fields <= set(TOP5_FIELDS):
+        raise ViewError(f"fields 는 {', '.join(TOP5_FIELDS)} 중에서 선택해야 합니다.")
+    with_metrics = "metricData" in fields
+    with_info = "info" in fields and mode != "category"
+
+    # 전체 평균 (metricData / info 를 요청한 경우에만)
+    if with_metrics or with_info:
+        avg_scores = table.derived("avg_scores", lambda t: np.round(np.nanmean(t.scores, axis=0), 3))
+
+    # info 문구: 평균 대비 가장 두드러진(friendly) / 가장 부족한(unfriendly) 카테고리
+    info = []
+    if with_info:
+        diff = scores[order] - avg_scores
+        if mode == "friendly":
+            info = [
+                f"{topic(table.names[i])} {categories[j].label} 동네입니다."
+                for i, j in zip(order, np.nanargmax(diff, axis=1))
+            ]
+        else:
+            info = [
+                f"{topic(table.names[i])} {categories[j].weak_label} 동네입니다."
+                for i, j in zip(order, np.nanargmin(diff, axis=1))
+            ]
+
+    if compact:
+        # 열 단위 응답: 카테고리 이름과 평균은 한 번만, 점수는 2차원 배열
+        result = {}
+        if "district" in fields:
+            result["district"] = table.names[order].tolist()
+        if "rank" in fields:
+            result["rank"] = list(range(1, len(order) + 1))
+        if with_metrics:
+            result["categories"] = [categories[j].ko for j in metric_cats]
+            result["average"] = avg_scores[metric_cats].tolist()
+            result["selectedDistrict"] = np.round(scores[np.ix_(order, metric_cats)], 3).tolist()
+        if with_info:
+            result["info"] = info
+    else:
+        # 결과 포맷 구성
+        result = []
+        for rank, i in enumerate(order, start=1):
+            entry = {}
+            if "district" in fields:
+                entry["district"] = table.names[i]
+            if "rank" in fields:
+                entry["rank"] = rank
+            if with_metrics:
+                row = scores[i]
+                entry["metricData"] = [
+                    {
+                        "name": categories[j].ko,
+                        "selectedDistrict": round(float(row[j]), 3),
+                        "average": float(avg_scores[j])
+                    } for j in metric_cats
+                ]
+            if with_info:
+                entry["info"] = info[rank - 1]
+            result.append(entry)
+
+    return {"data": result}
+
+
+# 순위 / 백분위: dataset version 별로 미리 계산된 표에서 한 행만 읽음.
+# 키는 features 와 같은 이름 (walkenv, employment, ...) + overall
+def rank_fields(table, pos, columns=None):
+    rank, percentile = table.ranks()
+    keys = [cat.feature_key for cat in PLAN.categories] + ["overall"]
+    if columns is None:
+        columns = range(len(keys))
+    return {
+        keys[j]: {
+            "rank": None if np.isnan(rank[pos, j]) else int(rank[pos, j]),
+            "percentile": None if np.isnan(percentile[pos, j]) else round(float(percentile[pos, j]), 1)
+        }
+        for j in columns
+    }
+
+
+# 한 레벨 전체의 소개 문장: 나머지 지역 평균(leave-one-out) 대비 가장 높은 카테고리.
+# 레벨 테이블에 dataset version 별로 캐시
+def level_summaries(table):
+    def build(table):
+        diff = table.scores - table.loo_means()
+        # 비교할 다른 지역이 없으면(예: 시 레벨) 자기 점수가 가장 높은 카테고리
+        alone = np.isnan(diff).all(axis=1)
+        diff[alone] = table.scores[alone]
+        main = np.nanargmax(diff, axis=1)
+        unit = dataset.LEVEL_LABELS[table.name]
+        return [
+            f"{topic(name)} {PLAN.categories[j].summary_label} {unit}입니다."
+            for name, j in zip(table.names, main)
+        ]
+    return table.derived("summaries", build)
+
+
+def summary_body(table, pos, ranks=False):
+    body = {
+        "district": table.names[pos],
+        "summary": level_summaries(table)[pos]
+    }
+    if ranks:
+        body["ranks"] = rank_fields(table, pos)
+    return body
+
+
+def features_body(hierarchy, level, pos, ranks=False):
+    table = hierarchy.level(level)
+    features = {
+        cat.feature_key: float(v)
+        for cat, v in zip(PLAN.categories, table.scores[pos])
+    }
+
+    body = {
+        "district": table.names[pos],
+        "features": {k: round(v, 2) for k, v in features.items()}
+    }
+    if level != hierarchy.leaf:
+        # 상위 레벨은 하위 단위들의 인구 가중 평균
+        body["count"] = int(table.frame["count"].iat[pos])
+        body["population"] = float(table.frame["population"].iat[pos])
+    if ranks:
+        body["ranks"] = rank_fields(table, pos)
+    return body
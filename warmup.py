@@ -0,0 +1,235 @@
+import atexit
+import json
+import heapq
+import hmac
+import itertools
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import make_response, request
+
+
+# 자주 들어오는 질의를 세어 두었다가, 재시작(배포 / 데이터 교체) 직후 응답 캐시를 미리 채운다.
+#
+# - 질의 빈도: Space-Saving heavy hitters (고정 크기 dict, 새 키가 오면 가장 적은 키를 교체)
+# - 빈도 목록은 WARM_KEYS_PATH 에 주기적으로 / 종료 시 저장하고, 다음 시작 때 절반으로 줄여서 이어 씀
+# - 시작하면 상위 WARM_TOP_N 개 질의를 앱에 직접 보내 캐시를 채운 뒤 ready. 그 전까지 /ready 는 503
+# - 워밍업 요청은 프로세스마다 새로 만든 토큰을 X-Warmup 헤더로 보냄 (외부 요청이 흉내 내서 집계를 피할 수 없음)
+
+WARM_KEYS_PATH = os.getenv("WARM_KEYS_PATH", "warm_keys.json")
+WARM_TOP_N = int(os.getenv("WARM_TOP_N", 50))
+WARM_CAPACITY = int(os.getenv("WARM_CAPACITY", 512))
+WARM_CACHE_SIZE = int(os.getenv("WARM_CACHE_SIZE", 256))
+WARM_SAVE_INTERVAL = float(os.getenv("WARM_SAVE_INTERVAL", 60))
+WARMUP_HEADER = "X-Warmup"
+_token = secrets.token_hex(16)
+
+
+class HeavyHitters:
+    # Space-Saving: 빈도가 capacity 안에 드는 키는 count - error 이상 실제로 들어왔음이 보장됨.
+    # 가장 적은 키는 min-heap 으로 찾음 (count 가 바뀔 때마다 새 항목을 넣고, 현재 count 와 다른 항목은
+    # 꺼낼 때 버림). 새 키 하나의 비용이 O(log capacity) 라 요청 경로에서 전체 키를 훑지 않음
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.counts = {}  # key → [count, error]
+        self._heap = []  # (count, 순번, key). 지난 count 의 항목이 섞여 있음
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def _push(self, key, count):
+        heapq.heappush(self._heap, (count, next(self._seq), key))
+        if len(self._heap) > 4 * max(self.capacity, 16):
+            # 지난 항목이 쌓이면 현재 값으로 다시 만듦 (상각 O(1))
+            self._heap = [(entry[0], next(self._seq), k) for k, entry in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self):
+        while True:
+            count, _, key = heapq.heappop(self._heap)
+            entry = self.counts.get(key)
+            if entry is not None and entry[0] == count:
+                del self.counts[key]
+                return count
+
+    def add(self, key, amount=1):
+        with self._lock:
+            entry = self.counts.get(key)
+            if entry is not None:
+                entry[0] += amount
+                self._push(key, entry[0])
+            elif len(self.counts) < self.capacity:
+                self.counts[key] = [amount, 0]
+                self._push(key, amount)
+            else:
+                floor = self._pop_min()
+                self.counts[key] = [floor + amount, floor]
+                self._push(key, floor + amount)
+
+    def top(self, n):
+        with self._lock:
+            items = sorted(self.counts.items(), key=lambda kv: (-kv[1][0], kv[0]))
+        return [(key, count) for key, (count, error) in items[:n]]
+
+
+class ResponseCache:
+    # (data version, 경로, 쿼리) → 응답 body. 크기 제한 LRU
+    def __init__(self, size):
+        self.size = size
+        self.entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        with self._lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+
+hitters = HeavyHitters(WARM_CAPACITY)
+cache = ResponseCache(WARM_CACHE_SIZE)
+
+_version = None
+_ready = threading.Event()
+_state = {"warmed": 0, "failed": 0, "warmup_ms": None}
+
+
+def request_key():
+    # http_cache.make_etag 와 같은 정규화 (파라미터 순서 무관)
+    query = urlencode(sorted(request.args.items(multi=True)))
+    return f"{request.path}?{query}" if query else request.path
+
+
+def internal_headers():
+    # 이 프로세스 안에서 앱을 직접 호출할 때(워밍업 / 스냅샷) 붙이는 헤더
+    return {WARMUP_HEADER: _token}
+
+
+def is_warmup_request():
+    return hmac.compare_digest(request.headers.get(WARMUP_HEADER, "").encode("utf-8"), _token.encode("utf-8"))
+
+
+def track(on_request=None):
+    # 질의 빈도 집계. http_cache.conditional 바깥에 두어 304 응답도 셈.
+    # 성공한 응답(200 / 304)만 세고, on_request 도 그때만 호출 (예: 질의 로그). 워밍업 요청은 제외
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            response = make_response(view(*args, **kwargs))
+            if response.status_code in (200, 304) and not is_warmup_request():
+                hitters.add(request_key())
+                if on_request is not None:
+                    on_request()
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def cached():
+    # 같은 데이터 버전의 같은 질의는 캐시된 응답을 돌려줌 (오류 응답은 캐시하지 않음)
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache_key = (_version(), request_key())
+            entry = cache.get(cache_key)
+            if entry is None:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+                entry = (response.get_data(), response.headers["Content-Type"])
+                cache.put(cache_key, entry)
+            body, content_type = entry
+            response = make_response(body)
+            response.headers["Content-Type"] = content_type
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def load_keys(path=WARM_KEYS_PATH):
+    if not os.path.exists(path):
+        return []
+    try:
+        with open(path, encoding="utf-8") as f:
+            return [(key, int(count)) for key, count in json.load(f)]
+    except (OSError, ValueError, TypeError):
+        return []
+
+
+def save_keys(path=WARM_KEYS_PATH):
+    # 여러 worker 가 동시에 써도 깨진 파일이 남지 않도록 임시 파일에 쓰고 교체
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(hitters.top(WARM_CAPACITY), f, ensure_ascii=False)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def warm(app, keys):
+    # 앱의 라우트를 그대로 호출해서 캐시를 채움 (관리 / 캐시 / 직렬화 경로가 실제 요청과 같음)
+    started = time.perf_counter()
+    client = app.test_client()
+    for key in keys:
+        try:
+            status = client.get(key, headers=internal_headers()).status_code
+        except Exception:
+            status = 500
+        _state["warmed" if status == 200 else "failed"] += 1
+    _state["warmup_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+
+def start(app, version):
+    # 이전 실행의 빈도를 이어받고(오래된 인기도는 절반으로), 상위 질의로 캐시를 채운 뒤 ready
+    global _version
+    _version = version
+    previous = load_keys()
+    for key, count in previous:
+        hitters.add(key, max(1, count // 2))
+
+    def run():
+        warm(app, [key for key, _ in previous[:WARM_TOP_N]])
+        _ready.set()
+        while True:
+            time.sleep(WARM_SAVE_INTERVAL)
+            save_keys()
+
+    threading.Thread(target=run, name="warmup", daemon=True).start()
+    atexit.register(save_keys)
+
+
+def ready():
+    return _ready.is_set()
+
+
+def stats():
+    return dict(
+        _state,
+        ready=ready(),
+        cache_entries=len(cache.entries),
+        cache_hits=cache.hits,
+        cache_misses=cache.misses,
+        hottest=hitters.top(10),
+    )